@@ -0,0 +1,396 @@
+"""Векторизованное вычисление программ DSL над массивами NumPy.
+
+``Interpreter.evaluate_batch`` вычисляет одну и ту же программу для многих
+наборов входных значений. Если программа состоит только из присваиваний,
+арифметики, сравнений, логических операций, условных выражений и встроенных
+математических функций, она вычисляется сразу над целыми столбцами
+(``VectorEvaluator``): ``a if c else b`` превращается в ``np.where``.
+Иначе (циклы, print, управление точностью, функции хоста) программа
+выполняется интерпретатором отдельно для каждой строки.
+
+Векторизованный путь считает во ``float64`` и округляет входные значения и
+каждый промежуточный результат до текущей точности, как числовой бэкенд
+(для ``DecimalBackend`` - половина вверх). Строки, в которых результат мог
+разойтись с построчным вычислением (inf/nan - деление на ноль или ошибка
+области определения; значения, для которых float64 не хранит все знаки
+точности; значения в пределах погрешности float64 от середины между
+соседними округлёнными), пересчитываются интерпретатором. Поэтому ошибки DSL
+сообщаются так же, как при построчном вычислении.
+
+NumPy - необязательная зависимость: модуль импортирует её только при вызове.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from lark import Token, Tree
+
+
+PATH_VECTORIZED = "vectorized"
+PATH_ROWS = "rows"
+
+# Наибольшая точность, при которой float64 хранит все знаки после запятой
+FLOAT_DIGITS = 15
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """Результат ``Interpreter.evaluate_batch``.
+
+    Attributes:
+        values: Массив результатов по строкам: ``float64`` (или ``bool``)
+            для векторизованного пути, ``object`` с числами бэкенда для
+            построчного
+        path: ``"vectorized"`` или ``"rows"``
+        reason: Почему программа не была векторизована (для ``"rows"``)
+        recomputed: Сколько строк векторизованного пути пересчитано построчно
+    """
+
+    values: Any
+    path: str
+    reason: Optional[str] = None
+    recomputed: int = 0
+
+
+class NotVectorizable(Exception):
+    """Программу нельзя вычислить над массивами; сообщение - причина."""
+
+
+def require_numpy() -> Any:
+    """Импортировать NumPy или сообщить, что он нужен.
+
+    Raises:
+        ImportError: Если NumPy не установлен
+    """
+    try:
+        import numpy  # pylint: disable=import-outside-toplevel
+    except ImportError as exc:
+        raise ImportError("evaluate_batch requires numpy: pip install numpy") from exc
+    return numpy
+
+
+def as_columns(np: Any, inputs: Mapping[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """Проверить входные столбцы и привести их к одномерным массивам.
+
+    Args:
+        np: Модуль NumPy
+        inputs: Имя переменной -> одномерный массив значений
+
+    Returns:
+        Пара (столбцы, число строк)
+
+    Raises:
+        ValueError: Если столбцов нет, они не одномерны или разной длины
+    """
+    if not inputs:
+        raise ValueError("evaluate_batch needs at least one input column")
+    columns: Dict[str, Any] = {}
+    size: Optional[int] = None
+    for name, values in inputs.items():
+        column = np.asarray(values)
+        if column.ndim != 1:
+            raise ValueError(f"Input column {name} must be one-dimensional")
+        if size is None:
+            size = len(column)
+        elif len(column) != size:
+            raise ValueError(
+                f"Input column {name} has {len(column)} rows, expected {size}"
+            )
+        columns[name] = column
+    assert size is not None
+    return columns, size
+
+
+class VectorEvaluator:
+    """Вычисление синтаксического дерева DSL над столбцами ``float64``.
+
+    Поддерживает подмножество языка без циклов, print и побочных эффектов.
+    На неподдерживаемой конструкции бросает ``NotVectorizable``.
+    """
+
+    def __init__(
+        self,
+        np: Any,
+        columns: Mapping[str, Any],
+        scalars: Mapping[str, float],
+        precision: int,
+        size: int,
+        half_up: bool = True,
+    ) -> None:
+        """Создать вычислитель.
+
+        Args:
+            np: Модуль NumPy
+            columns: Входные столбцы
+            scalars: Скалярные переменные окружения интерпретатора
+            precision: Текущая точность (знаков после запятой)
+            size: Число строк
+            half_up: Округлять половину вверх (как ``DecimalBackend``), а не
+                к чётному (как ``FloatBackend``)
+        """
+        self._np = np
+        self._env: Dict[str, Any] = dict(scalars)
+        self._precision = precision
+        self._scale = 10.0 ** precision
+        self._half_up = half_up
+        self._size = size
+        # Значения больше этого порога float64 хранит без части знаков точности
+        self._limit = 2.0 ** 53 / self._scale
+        self._suspect = np.zeros(size, dtype=bool)
+        with np.errstate(all="ignore"):
+            for name, column in columns.items():
+                # Построчный путь тоже округляет входные значения до точности
+                self._env[name] = self._checked(column.astype(np.float64))
+
+    def run(self, tree: Tree) -> Tuple[Any, Any]:
+        """Вычислить программу.
+
+        Returns:
+            Пара (массив результатов длины size или None, маска строк,
+            которые нужно пересчитать построчно)
+
+        Raises:
+            NotVectorizable: Если программа содержит неподдерживаемые конструкции
+        """
+        np = self._np
+        with np.errstate(all="ignore"):
+            value = self._eval(tree)
+        if value is None:
+            return None, self._suspect
+        if not isinstance(value, np.ndarray) or value.shape != (self._size,):
+            value = np.full(self._size, value)
+        return value, self._suspect
+
+    # -- обход дерева ---------------------------------------------------------
+
+    def _eval(self, node: Any) -> Any:
+        if not isinstance(node, Tree):
+            raise NotVectorizable(f"unsupported token: {node!r}")
+        method = getattr(self, f"_eval_{node.data}", None)
+        if method is None:
+            raise NotVectorizable(f"{node.data} is not vectorizable")
+        return method(node)
+
+    def _eval_sequence(self, node: Tree) -> Any:
+        result = None
+        for child in node.children:
+            if isinstance(child, Token) and child.type == "SEP":
+                continue
+            result = self._eval(child)
+        return result
+
+    _eval_start = _eval_sequence
+    _eval_statement_list = _eval_sequence
+    _eval_block = _eval_sequence
+
+    def _eval_statement(self, node: Tree) -> Any:
+        return self._eval(node.children[0])
+
+    def _eval_atom(self, node: Tree) -> Any:
+        return self._eval(node.children[0])
+
+    def _eval_assignment(self, node: Tree) -> None:
+        name = node.children[0].value
+        op_token = node.children[1].children[0]
+        value = self._numeric(self._eval(node.children[2]))
+        op = op_token.value
+        if op == "=":
+            self._env[name] = value
+            return None
+        current = self._numeric(self._lookup(name))
+        if op == "+=":
+            self._env[name] = self._checked(current + value)
+        elif op == "-=":
+            self._env[name] = self._checked(current - value)
+        elif op == "/=":
+            self._env[name] = self._checked(current / value)
+        elif op == "mod=":
+            self._env[name] = self._checked(self._mod(current, value))
+        else:
+            raise NotVectorizable(f"assignment operator {op} is not vectorizable")
+        return None
+
+    def _eval_conditional_expr(self, node: Tree) -> Any:
+        children = [
+            child for child in node.children
+            if not (isinstance(child, Token) and child.type == "SEP")
+        ]
+        if len(children) == 1:
+            return self._eval(children[0])
+        condition = self._boolean(self._eval(children[1]))
+        return self._np.where(condition, self._eval(children[0]), self._eval(children[2]))
+
+    def _eval_or_expr(self, node: Tree) -> Any:
+        result = self._boolean(self._eval(node.children[0]))
+        for i in range(2, len(node.children), 2):
+            result = self._np.logical_or(result, self._boolean(self._eval(node.children[i])))
+        return result
+
+    def _eval_and_expr(self, node: Tree) -> Any:
+        result = self._boolean(self._eval(node.children[0]))
+        for i in range(2, len(node.children), 2):
+            result = self._np.logical_and(result, self._boolean(self._eval(node.children[i])))
+        return result
+
+    def _eval_not_expr(self, node: Tree) -> Any:
+        if len(node.children) == 1:
+            return self._eval(node.children[0])
+        return self._np.logical_not(self._boolean(self._eval(node.children[1])))
+
+    def _eval_comparison(self, node: Tree) -> Any:
+        children = node.children
+        if len(children) == 1:
+            return self._eval(children[0])
+        result: Any = True
+        left = self._numeric(self._eval(children[0]))
+        for i in range(1, len(children), 2):
+            op = children[i].value
+            right = self._numeric(self._eval(children[i + 1]))
+            if op == "==":
+                current = left == right
+            elif op == "!=":
+                current = left != right
+            elif op == "<":
+                current = left < right
+            elif op == "<=":
+                current = left <= right
+            elif op == ">":
+                current = left > right
+            else:
+                current = left >= right
+            result = self._np.logical_and(result, current)
+            left = right
+        return result
+
+    def _eval_sum(self, node: Tree) -> Any:
+        value = self._numeric(self._eval(node.children[0]))
+        for i in range(1, len(node.children), 2):
+            right = self._numeric(self._eval(node.children[i + 1]))
+            if node.children[i].value == "+":
+                value = self._checked(value + right)
+            else:
+                value = self._checked(value - right)
+        return value
+
+    def _eval_product(self, node: Tree) -> Any:
+        value = self._numeric(self._eval(node.children[0]))
+        for i in range(1, len(node.children), 2):
+            right = self._numeric(self._eval(node.children[i + 1]))
+            op = node.children[i].value
+            if op == "*":
+                value = self._checked(value * right)
+            elif op == "/":
+                value = self._checked(value / right)
+            else:
+                value = self._checked(self._mod(value, right))
+        return value
+
+    def _eval_power(self, node: Tree) -> Any:
+        base = self._numeric(self._eval(node.children[0]))
+        if len(node.children) == 1:
+            return base
+        exponent = self._numeric(self._eval(node.children[2]))
+        return self._checked(self._np.power(base, exponent))
+
+    def _eval_unary(self, node: Tree) -> Any:
+        if len(node.children) == 1:
+            return self._eval(node.children[0])
+        value = self._numeric(self._eval(node.children[1]))
+        if node.children[0].value == "+":
+            return value
+        # + 0.0 убирает отрицательный ноль: в DSL -0 печатается как 0
+        return -value + 0.0
+
+    def _eval_number(self, node: Tree) -> Any:
+        return self._round(float(node.children[0].value))
+
+    def _eval_var(self, node: Tree) -> Any:
+        return self._lookup(node.children[0].value)
+
+    def _eval_resolved_call(self, node: Tree) -> Any:
+        site = node.children[0]
+        spec = site.spec
+        np = self._np
+        supported = spec.method == "nrt" or spec.method in _VECTOR_FUNCTIONS
+        if not supported or len(site.args) != spec.arity:
+            raise NotVectorizable(f"function {spec.name} is not vectorizable")
+        args = [self._numeric(self._eval(arg)) for arg in site.args]
+        if spec.method == "nrt":
+            value, degree = args
+            odd = (degree == np.floor(degree)) & (np.mod(degree, 2) == 1)
+            root = np.power(np.abs(value), 1.0 / degree)
+            result = np.where(value < 0, -root, root)
+            invalid = (degree == 0) | ((value < 0) & ~odd)
+            return self._checked(np.where(invalid, np.nan, result))
+        return self._checked(_VECTOR_FUNCTIONS[spec.method](np, args[0]))
+
+    # -- вспомогательные ------------------------------------------------------
+
+    def _lookup(self, name: str) -> Any:
+        if name in self._env:
+            return self._env[name]
+        if name == "pi":
+            return self._round(self._np.pi)
+        if name == "e":
+            return self._round(self._np.e)
+        raise NotVectorizable(f"unknown variable {name}")
+
+    def _numeric(self, value: Any) -> Any:
+        np = self._np
+        if value is None or isinstance(value, (bool, np.bool_)) or (
+            isinstance(value, np.ndarray) and value.dtype == np.bool_
+        ):
+            raise NotVectorizable("boolean value used as a number")
+        return value
+
+    def _boolean(self, value: Any) -> Any:
+        np = self._np
+        if isinstance(value, (bool, np.bool_)) or (
+            isinstance(value, np.ndarray) and value.dtype == np.bool_
+        ):
+            return value
+        raise NotVectorizable("condition is not boolean")
+
+    def _mod(self, left: Any, right: Any) -> Any:
+        np = self._np
+        modulus = np.abs(right)
+        # mod 0 - ошибка в DSL: nan пометит строку для пересчёта
+        return np.where(modulus == 0, np.nan, np.mod(left, modulus))
+
+    def _round(self, value: Any) -> Any:
+        np = self._np
+        if not self._half_up:
+            return np.round(value, self._precision)
+        return np.sign(value) * np.floor(np.abs(value) * self._scale + 0.5) / self._scale
+
+    def _near_half(self, value: Any) -> Any:
+        """Значения, которые отличаются от середины между округлёнными соседями
+        только на погрешность float64: десятичное округление может пойти в
+        другую сторону (например, 1.005 хранится как 1.00499...)."""
+        np = self._np
+        scaled = np.abs(value) * self._scale
+        distance = np.abs(scaled - np.floor(scaled) - 0.5)
+        return (distance != 0) & (distance <= 16 * np.spacing(scaled))
+
+    def _checked(self, value: Any) -> Any:
+        """Округлить результат и пометить строки, где float64 ненадёжен."""
+        np = self._np
+        bad = self._near_half(value) if self._half_up else False
+        value = self._round(value)
+        bad = bad | ~np.isfinite(value) | (np.abs(value) > self._limit)
+        self._suspect |= np.broadcast_to(bad, self._suspect.shape)
+        return value
+
+
+_VECTOR_FUNCTIONS = {
+    "ln": lambda np, x: np.log(x),
+    "log2": lambda np, x: np.log2(x),
+    "log10": lambda np, x: np.log10(x),
+    "sin": lambda np, x: np.sin(x),
+    "cos": lambda np, x: np.cos(x),
+    "tg": lambda np, x: np.tan(x),
+    "ctg": lambda np, x: 1.0 / np.tan(x),
+    "sqrt": lambda np, x: np.sqrt(x),
+}
@@ -0,0 +1,61 @@
+"""Сравнение производительности числовых бэкендов.
+
+Запуск:
+    python benchmarks/bench_backends.py
+    python benchmarks/bench_backends.py --iterations 20000 --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from interpreter import Interpreter  # noqa: E402
+from numeric import DecimalBackend, FloatBackend  # noqa: E402
+
+
+SCRIPT = """
+s = 0
+for i in 1 .. n (
+    s += sin(i) * i / 3 + sqrt(i) - i mod 7
+)
+s
+"""
+
+BACKENDS = {
+    "decimal": DecimalBackend,
+    "float": FloatBackend,
+}
+
+
+def run(backend_name: str, iterations: int, repeat: int) -> float:
+    """Вернуть лучшее время выполнения скрипта (в секундах)."""
+    best = float("inf")
+    for _ in range(repeat):
+        interp = Interpreter(
+            initial_env={"n": iterations}, backend=BACKENDS[backend_name]()
+        )
+        start = time.perf_counter()
+        interp.execute(SCRIPT)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark numeric backends.")
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'backend':<10} {'seconds':>10} {'iter/s':>12}")
+    for name in BACKENDS:
+        seconds = run(name, args.iterations, args.repeat)
+        print(f"{name:<10} {seconds:>10.4f} {args.iterations / seconds:>12.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
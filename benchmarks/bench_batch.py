@@ -0,0 +1,58 @@
+"""Сравнение векторизованного и построчного пакетного вычисления.
+
+Запуск:
+    python benchmarks/bench_batch.py
+    python benchmarks/bench_batch.py --rows 1000000 --sample 2000
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+
+from interpreter import Interpreter  # noqa: E402
+
+
+SCRIPT = """
+r = sqrt(x * x + y * y)
+r * sin(x) if r < 2 else ln(r) + y mod 3
+"""
+
+# Блок точности не векторизуется: тот же скрипт выполняется построчно
+ROWS_SCRIPT = f"with precision 10 ({SCRIPT})"
+
+
+def run(source: str, rows: int) -> tuple[str, float]:
+    """Вернуть путь вычисления и время в секундах."""
+    rng = np.random.default_rng(0)
+    inputs = {"x": rng.random(rows) * 3, "y": rng.random(rows) * 3}
+    interp = Interpreter()
+    start = time.perf_counter()
+    result = interp.evaluate_batch(source, inputs)
+    return result.path, time.perf_counter() - start
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark evaluate_batch.")
+    parser.add_argument("--rows", type=int, default=10**6)
+    parser.add_argument(
+        "--sample", type=int, default=2000,
+        help="rows for the per-row path",
+    )
+    args = parser.parse_args(argv)
+
+    print(f"{'path':<12} {'rows':>10} {'seconds':>10} {'rows/s':>12}")
+    path, seconds = run(SCRIPT, args.rows)
+    print(f"{path:<12} {args.rows:>10} {seconds:>10.3f} {args.rows / seconds:>12.0f}")
+    path, seconds = run(ROWS_SCRIPT, args.sample)
+    print(f"{path:<12} {args.sample:>10} {seconds:>10.3f} {args.sample / seconds:>12.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,70 @@
+"""Форматирование очень больших чисел: строка целиком против вывода частями.
+
+Для чисел из 10^3..10^7 цифр сравниваются ``format`` (одна строка),
+``bigformat.format_chunks`` в десятичной и шестнадцатеричной записи и
+переводы ``int`` <-> ``Decimal`` (встроенные - только до 10^5 цифр: они
+квадратичны).
+
+Запуск:
+    python benchmarks/bench_bigformat.py --max-exponent 6
+"""
+from __future__ import annotations
+
+import argparse
+from decimal import MAX_EMAX, MAX_PREC, Context, Decimal
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bigformat import decimal_to_int, format_chunks, int_to_decimal  # noqa: E402
+
+# Встроенные переводы дольше этого размера не измеряются
+_BUILTIN_LIMIT = 10**5
+_EXACT = Context(prec=MAX_PREC, Emax=MAX_EMAX)
+
+
+def measure(action) -> float:
+    started = time.perf_counter()
+    action()
+    return time.perf_counter() - started
+
+
+def _drain(chunks) -> None:
+    for _ in chunks:
+        pass
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark big number formatting.")
+    parser.add_argument("--min-exponent", type=int, default=3)
+    parser.add_argument("--max-exponent", type=int, default=7)
+    parser.add_argument("--places", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'digits':>10} {'format':>9} {'chunks':>9} {'hex':>9} "
+        f"{'int->dec':>9} {'dec->int':>9} {'Decimal()':>9} {'int()':>9}"
+    )
+    for exponent in range(args.min_exponent, args.max_exponent + 1):
+        digits = 10**exponent
+        # Степень в Decimal (быстрое умножение libmpdec), log10(7) ~ 0.845
+        value = _EXACT.power(Decimal(7), int(digits / 0.845098))
+        number = decimal_to_int(value)
+        row = [
+            measure(lambda: format(value, f".{args.places}f")),
+            measure(lambda: _drain(format_chunks(value, args.places))),
+            measure(lambda: _drain(format_chunks(value, args.places, "hex"))),
+            measure(lambda: int_to_decimal(number)),
+            measure(lambda: decimal_to_int(value)),
+        ]
+        if digits <= _BUILTIN_LIMIT:
+            row += [measure(lambda: Decimal(number)), measure(lambda: int(value))]
+        cells = " ".join(f"{seconds:9.3f}" for seconds in row)
+        print(f"{value.adjusted() + 1:>10} {cells}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,50 @@
+"""Пропускная способность Interpreter.execute_many в зависимости от числа потоков.
+
+На обычной сборке CPython рост ограничен GIL; на free-threaded сборке
+(python3.13t и новее) пропускная способность растёт с числом потоков.
+
+Запуск:
+    python benchmarks/bench_execute_many.py --scripts 64 --workers 1 2 4 8
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from interpreter import Interpreter  # noqa: E402
+
+
+SCRIPT = """
+s = 0
+for i in 1 .. 300 (
+    s += i * i / 7 mod 13
+)
+s
+"""
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Interpreter.execute_many.")
+    parser.add_argument("--scripts", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args(argv)
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"GIL enabled: {gil}")
+    print(f"{'workers':>8} {'seconds':>10} {'scripts/s':>10}")
+    sources = [SCRIPT] * args.scripts
+    Interpreter()  # прогрев: построение парсера
+    for workers in args.workers:
+        start = time.perf_counter()
+        Interpreter.execute_many(sources, max_workers=workers)
+        seconds = time.perf_counter() - start
+        print(f"{workers:>8} {seconds:>10.3f} {args.scripts / seconds:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
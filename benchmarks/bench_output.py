@@ -0,0 +1,56 @@
+"""Вывод print в цикле: встроенный print против буферизованного StreamSink.
+
+Запуск:
+    python benchmarks/bench_output.py --lines 100000
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from interpreter import Interpreter  # noqa: E402
+from output import FLUSH_ALWAYS, FLUSH_LINE, FLUSH_SIZE, ListSink, NullSink, StreamSink  # noqa: E402
+
+
+def measure(lines: int, make_output) -> float:
+    source = f'for i in 1 .. {lines} (print("row", i))'
+    with open(os.devnull, "w", encoding="utf-8", buffering=1) as stream:
+        output = make_output(stream)
+        interpreter = Interpreter(output=output)
+        started = time.perf_counter()
+        if output is None:
+            with contextlib.redirect_stdout(stream):
+                interpreter.execute(source)
+        else:
+            interpreter.execute(source)
+        return time.perf_counter() - started
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark print output sinks.")
+    parser.add_argument("--lines", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    variants = {
+        "stdout (redirect_stdout)": lambda stream: None,
+        "StreamSink always": lambda stream: StreamSink(stream, policy=FLUSH_ALWAYS),
+        "StreamSink line": lambda stream: StreamSink(stream, policy=FLUSH_LINE),
+        "StreamSink size": lambda stream: StreamSink(stream, policy=FLUSH_SIZE),
+        "ListSink": lambda stream: ListSink(),
+        "NullSink": lambda stream: NullSink(),
+    }
+    print(f"{'sink':<26} {'seconds':>9} {'lines/s':>12}")
+    for name, make_output in variants.items():
+        seconds = measure(args.lines, make_output)
+        print(f"{name:<26} {seconds:9.3f} {args.lines / seconds:12.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,60 @@
+"""Пакетный запуск файлов: процесс CLI на файл против ``cli.py run-many``.
+
+Запуск:
+    python benchmarks/bench_run_many.py --scripts 20 --jobs 1 2
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+CLI = str(ROOT / "cli.py")
+
+
+def make_scripts(directory: Path, count: int) -> list[Path]:
+    """Создать скрипты разной длины (длина цикла растёт с номером)."""
+    paths = []
+    for index in range(count):
+        path = directory / f"script_{index:04d}.clc"
+        path.write_text(
+            f"s = 0\nfor i in 1 .. {50 * (index + 1)} (s += i * i / 7 mod 13)\ns\n",
+            encoding="utf-8",
+        )
+        paths.append(path)
+    return paths
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark cli.py run-many.")
+    parser.add_argument("--scripts", type=int, default=20)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2])
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        paths = make_scripts(directory, args.scripts)
+
+        start = time.perf_counter()
+        for path in paths:
+            subprocess.run([sys.executable, CLI, str(path)], check=True, capture_output=True)
+        print(f"{'process per file':>20} {time.perf_counter() - start:>10.3f}s")
+
+        for jobs in args.jobs:
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, CLI, "run-many", tmp, "--jobs", str(jobs)],
+                check=True,
+                capture_output=True,
+            )
+            label = f"run-many --jobs {jobs}"
+            print(f"{label:>20} {time.perf_counter() - start:>10.3f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
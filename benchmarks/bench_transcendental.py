@@ -0,0 +1,75 @@
+"""Пропускная способность математических функций DecimalBackend в зависимости от точности.
+
+При точности до 15 знаков функции считаются через float, выше - функциями
+произвольной точности из decmath. Константы приведения кэшируются, поэтому
+перед замером каждая функция вызывается один раз.
+
+Запуск:
+    python benchmarks/bench_transcendental.py
+    python benchmarks/bench_transcendental.py --precisions 10 100 1000 10000 --seconds 0.5
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from numeric import DecimalBackend  # noqa: E402
+
+
+ARGUMENT = Decimal("1.2345678901234567890123456789")
+
+FUNCTIONS = {
+    "ln": lambda b: b.ln(ARGUMENT),
+    "log2": lambda b: b.log2(ARGUMENT),
+    "log10": lambda b: b.log10(ARGUMENT),
+    "sin": lambda b: b.sin(ARGUMENT),
+    "cos": lambda b: b.cos(ARGUMENT),
+    "tg": lambda b: b.tg(ARGUMENT),
+    "ctg": lambda b: b.ctg(ARGUMENT),
+    "sqrt": lambda b: b.sqrt(ARGUMENT),
+    "nrt": lambda b: b.nrt(ARGUMENT, Decimal(3)),
+    "pow": lambda b: b.pow(ARGUMENT, Decimal("2.5")),
+}
+
+
+def calls_per_second(func, backend: DecimalBackend, seconds: float) -> float:
+    """Вызывать func, пока не пройдёт seconds, и вернуть число вызовов в секунду."""
+    func(backend)  # прогрев кэша констант
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < seconds:
+        func(backend)
+        calls += 1
+        elapsed = time.perf_counter() - start
+    return calls / elapsed
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark transcendental functions.")
+    parser.add_argument(
+        "--precisions", type=int, nargs="+", default=[10, 15, 16, 50, 100, 1000, 10000]
+    )
+    parser.add_argument("--functions", nargs="+", default=list(FUNCTIONS))
+    parser.add_argument("--seconds", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    print(f"{'precision':>9} " + " ".join(f"{name:>10}" for name in args.functions))
+    for precision in args.precisions:
+        backend = DecimalBackend(precision=precision)
+        rates = [
+            calls_per_second(FUNCTIONS[name], backend, args.seconds)
+            for name in args.functions
+        ]
+        print(f"{precision:>9} " + " ".join(f"{rate:>10.1f}" for rate in rates))
+    print("(calls per second)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,130 @@
+"""Нагрузочный тест сервера ``cli.py serve`` против холодного запуска CLI.
+
+Запускает сервер, отправляет запросы из нескольких клиентских потоков
+и выводит p50/p99 задержки и пропускную способность; затем выполняет
+тот же скрипт отдельными процессами ``cli.py``.
+
+Запуск:
+    python benchmarks/load_test.py --requests 500 --clients 8 --jobs 2
+"""
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import http.client
+import json
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+CLI = str(ROOT / "cli.py")
+
+SCRIPT = """
+s = 0
+for i in 1 .. n (
+    s += sqrt(i) * x mod 7
+)
+s
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/health")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def report(label: str, latencies: list[float], seconds: float) -> None:
+    print(
+        f"{label:>8} {len(latencies):>8} {percentile(latencies, 0.5) * 1000:>9.2f} "
+        f"{percentile(latencies, 0.99) * 1000:>9.2f} {len(latencies) / seconds:>10.1f}"
+    )
+
+
+def run_server_load(port: int, requests: int, clients: int) -> None:
+    def client(count: int) -> list[float]:
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        latencies = []
+        for index in range(count):
+            body = json.dumps({"script": SCRIPT, "overrides": {"n": 50, "x": index}})
+            start = time.perf_counter()
+            connection.request("POST", "/eval", body, {"Content-Type": "application/json"})
+            response = connection.getresponse()
+            payload = json.loads(response.read())
+            latencies.append(time.perf_counter() - start)
+            if payload.get("error"):
+                raise RuntimeError(payload["error"])
+        return latencies
+
+    per_client = [requests // clients] * clients
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        latencies = [lat for chunk in executor.map(client, per_client) for lat in chunk]
+    report("server", latencies, time.perf_counter() - start)
+
+
+def run_cold_cli(requests: int) -> None:
+    with tempfile.NamedTemporaryFile("w", suffix=".clc", delete=False) as stream:
+        stream.write(SCRIPT)
+    latencies = []
+    start = time.perf_counter()
+    for index in range(requests):
+        begin = time.perf_counter()
+        subprocess.run(
+            [sys.executable, CLI, stream.name, "n=50", f"x={index}"],
+            check=True,
+            capture_output=True,
+        )
+        latencies.append(time.perf_counter() - begin)
+    report("cold cli", latencies, time.perf_counter() - start)
+    Path(stream.name).unlink()
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Load test for cli.py serve.")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--jobs", type=int, default=2)
+    parser.add_argument("--cold-requests", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, CLI, "serve", "--port", str(port), "--jobs", str(args.jobs)],
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(port)
+        print(f"{'mode':>8} {'requests':>8} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>10}")
+        run_server_load(port, args.requests, args.clients)
+    finally:
+        server.terminate()
+        server.wait()
+    run_cold_cli(args.cold_requests)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
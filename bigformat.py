@@ -0,0 +1,194 @@
+"""Быстрое преобразование и потоковый вывод очень больших чисел.
+
+Значения ``DecimalBackend`` хранятся как ``Decimal``, поэтому вывод в
+десятичной системе не требует перевода между системами счисления, но
+строка из миллионов цифр целиком занимает память ещё раз, а при записи в
+поток - и третий. ``format_chunks`` выдаёт такую запись частями: число
+рекурсивно делится пополам по степеням десяти (сдвиг порядка ``Decimal``),
+и каждая часть форматируется отдельно.
+
+Переводы ``int`` <-> ``Decimal`` во встроенной реализации квадратичны
+(число из миллиона цифр переводится десятки секунд), а ``str(int)``
+ограничен ``sys.set_int_max_str_digits``. ``int_to_decimal`` и
+``decimal_to_int`` используют «разделяй и властвуй» по степеням двойки:
+умножение и деление больших ``Decimal`` в libmpdec быстрые, а сборка
+``int`` из половин - это сдвиги. Ограничение на длину строки не действует.
+
+Шестнадцатеричный и двоичный вывод (``radix="hex"``/``"bin"``) строится из
+байтов ``int`` и тоже выдаётся частями.
+
+Пример:
+    for chunk in format_chunks(Decimal(3) ** 100000, 0):
+        stream.write(chunk)
+"""
+
+from __future__ import annotations
+
+from decimal import MAX_EMAX, MAX_PREC, MIN_EMIN, ROUND_DOWN, ROUND_HALF_UP, Context, Decimal
+from typing import Dict, Iterator
+
+# Системы счисления вывода
+RADIXES = ("dec", "hex", "bin")
+# Наибольший размер части вывода (в цифрах)
+CHUNK_DIGITS = 1 << 13
+# Числа не длиннее этого переводятся встроенными средствами
+_LEAF_BITS = 1 << 12
+_SMALL_DIGITS = 1 << 10
+# Верхняя оценка log2(10)
+_BITS_PER_DIGIT = 3.3219280949
+
+_EXACT = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)
+_BITS = {"hex": 4, "bin": 1}
+_PREFIX = {"hex": "0x", "bin": "0b"}
+
+
+def _power_of_two(bits: int, cache: Dict[int, Decimal]) -> Decimal:
+    """``2 ** bits`` как ``Decimal`` (с кэшем на время одного перевода)."""
+    result = cache.get(bits)
+    if result is None:
+        if bits <= _LEAF_BITS:
+            result = Decimal(1 << bits)
+        else:
+            half = bits >> 1
+            result = _EXACT.multiply(_power_of_two(half, cache), _power_of_two(bits - half, cache))
+        cache[bits] = result
+    return result
+
+
+def int_to_decimal(value: int) -> Decimal:
+    """Перевести ``int`` в ``Decimal`` за время, близкое к умножению.
+
+    Args:
+        value: Целое число любой длины
+
+    Returns:
+        Точное значение ``Decimal``
+    """
+    cache: Dict[int, Decimal] = {}
+
+    def convert(number: int, bits: int) -> Decimal:
+        if bits <= _LEAF_BITS:
+            return Decimal(number)
+        half = bits >> 1
+        high = number >> half
+        low = number - (high << half)
+        return _EXACT.add(
+            _EXACT.multiply(convert(high, bits - half), _power_of_two(half, cache)),
+            convert(low, half),
+        )
+
+    result = convert(abs(value), abs(value).bit_length())
+    return result.copy_negate() if value < 0 else result
+
+
+def decimal_to_int(value: Decimal) -> int:
+    """Перевести целую часть ``Decimal`` в ``int`` (с отбрасыванием дробной).
+
+    Args:
+        value: Конечное значение ``Decimal``
+
+    Returns:
+        Целая часть числа
+
+    Raises:
+        ValueError: Если значение - бесконечность или NaN
+    """
+    if not value.is_finite():
+        raise ValueError(f"Cannot convert {value} to integer")
+    if value.adjusted() < _SMALL_DIGITS:
+        return int(value)
+    cache: Dict[int, Decimal] = {}
+
+    def convert(number: Decimal, bits: int) -> int:
+        if bits <= _LEAF_BITS:
+            return int(number)
+        half = bits >> 1
+        high, low = _EXACT.divmod(number, _power_of_two(half, cache))
+        return (convert(high, bits - half) << half) | convert(low, half)
+
+    number = value.copy_abs().to_integral_value(rounding=ROUND_DOWN, context=_EXACT)
+    result = convert(number, int((number.adjusted() + 1) * _BITS_PER_DIGIT) + 1)
+    return -result if value < 0 else result
+
+
+def _split(number: Decimal, digits: int) -> tuple[Decimal, Decimal]:
+    """Разделить неотрицательное целое на старшие цифры и младшие ``digits`` цифр."""
+    high = number.scaleb(-digits, _EXACT).to_integral_value(rounding=ROUND_DOWN, context=_EXACT)
+    return high, _EXACT.subtract(number, high.scaleb(digits, _EXACT))
+
+
+def _digit_chunks(number: Decimal, width: int, pad: bool, chunk: int) -> Iterator[str]:
+    """Цифры неотрицательного целого частями не длиннее ``chunk``.
+
+    Args:
+        number: Неотрицательное целое ``Decimal``
+        width: Число цифр (с ведущими нулями, если pad)
+        pad: Дополнять ли ведущими нулями до width
+        chunk: Наибольшая длина части
+    """
+    if width <= chunk:
+        text = format(number, "f")
+        yield text.zfill(width) if pad else text
+        return
+    half = width >> 1
+    high, low = _split(number, half)
+    yield from _digit_chunks(high, width - half, pad, chunk)
+    yield from _digit_chunks(low, half, True, chunk)
+
+
+def _radix_chunks(number: int, radix: str, chunk: int) -> Iterator[str]:
+    """Цифры неотрицательного ``int`` в системе ``hex``/``bin`` частями."""
+    if number == 0:
+        yield "0"
+        return
+    data = number.to_bytes((number.bit_length() + 7) // 8, "big")
+    step = max(1, chunk * _BITS[radix] // 8)
+    for start in range(0, len(data), step):
+        piece = data[start : start + step]
+        if radix == "hex":
+            text = piece.hex()
+        else:
+            text = format(int.from_bytes(piece, "big"), f"0{8 * len(piece)}b")
+        yield text.lstrip("0") if start == 0 else text
+
+
+def format_chunks(
+    value: Decimal, places: int, radix: str = "dec", chunk: int = CHUNK_DIGITS
+) -> Iterator[str]:
+    """Запись числа частями; после объединения совпадает с ``format(value, ".{places}f")``.
+
+    В системах ``hex`` и ``bin`` выводятся только целые значения (с
+    префиксом ``0x``/``0b``); дробные значения выводятся в десятичной.
+
+    Args:
+        value: Конечное значение ``Decimal``
+        places: Знаков после запятой (значение округляется с ``ROUND_HALF_UP``)
+        radix: Система счисления: ``"dec"``, ``"hex"`` или ``"bin"``
+        chunk: Наибольшая длина части в цифрах
+
+    Yields:
+        Части записи числа
+
+    Raises:
+        ValueError: Неизвестная система счисления или бесконечное значение
+    """
+    if radix not in RADIXES:
+        raise ValueError(f"Unknown radix: {radix}")
+    if not value.is_finite():
+        raise ValueError(f"Cannot format {value}")
+    value = value.quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP, context=_EXACT)
+    integral = value == value.to_integral_value(context=_EXACT)
+    sign = "-" if value.is_signed() else ""
+    if radix != "dec" and integral:
+        number = decimal_to_int(value)
+        yield ("-" if number < 0 else "") + _PREFIX[radix]
+        yield from _radix_chunks(abs(number), radix, chunk)
+        return
+    coefficient = value.copy_abs().scaleb(places, _EXACT)
+    whole, fraction = _split(coefficient, places)
+    if sign:
+        yield sign
+    yield from _digit_chunks(whole, whole.adjusted() + 1 if whole else 1, False, chunk)
+    if places > 0:
+        yield "."
+        yield from _digit_chunks(fraction, places, True, chunk)
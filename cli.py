@@ -2,16 +2,45 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
+import csv
+import itertools
+import json
+import os
 import re
 import sys
+import time
 from decimal import Decimal, InvalidOperation
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Iterator, Optional, TextIO
 
+from bigformat import RADIXES
 from interpreter import DSLError, Interpreter
+from parallel import FileResult, RunResult, run_files, run_many
+from pipeline import JsonlSession
+from output import FLUSH_LINE, FLUSH_POLICIES, FLUSH_SIZE, StreamSink
+from program import Program, Snapshot
+from resultcache import CACHE_DIR_ENV, ResultCache, cacheable
+from server import EvaluationService, make_server
+from tracing import (
+    TRACE_FORMATS,
+    BinaryTraceSink,
+    FilterTraceSink,
+    JsonlTraceSink,
+    RingTraceSink,
+    TextTraceSink,
+    TraceSink,
+)
 
 
 _NAME_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+# Буфер файлового ввода-вывода и размер порции строк при записи CSV
+_IO_BUFFER = 1 << 20
+_WRITE_CHUNK = 1024
+# Наибольшая задержка буферизованного вывода print долгой программы (секунды)
+_FLUSH_INTERVAL = 0.5
+_LINES_RE = re.compile(r"^\s*(?P<first>\d+)\s*(?:\.\.\s*(?P<last>\d+))?\s*$")
+_SWEEP_RE = re.compile(r"^\s*(?P<start>\S+?)\s*\.\.\s*(?P<end>\S+?)(?:\s+by\s+(?P<step>\S+))?\s*$")
 
 
 def _parse_assignment(text: str) -> tuple[str, Any]:
@@ -37,6 +66,410 @@ def _parse_assignments(items: list[str]) -> Dict[str, Any]:
     return env
 
 
+def _parse_decimal(name: str, raw_value: str) -> Decimal:
+    try:
+        return Decimal(raw_value)
+    except InvalidOperation as exc:
+        raise ValueError(f"Invalid numeric value for {name}: {raw_value}") from exc
+
+
+def _parse_sweep(text: str) -> tuple[str, list[Decimal]]:
+    """Разобрать диапазон ``NAME=START..END [by STEP]`` в список значений.
+
+    Семантика как у цикла for: конец включается, шаг по умолчанию 1.
+    """
+    if "=" not in text:
+        raise ValueError("Expected NAME=START..END [by STEP]")
+    name, raw_range = text.split("=", 1)
+    name = name.strip()
+    if not name or not _NAME_RE.match(name):
+        raise ValueError(f"Invalid variable name: {name}")
+    match = _SWEEP_RE.match(raw_range)
+    if match is None:
+        raise ValueError(f"Invalid sweep range for {name}: {raw_range}")
+    start = _parse_decimal(name, match["start"])
+    end = _parse_decimal(name, match["end"])
+    step = _parse_decimal(name, match["step"]) if match["step"] else Decimal(1)
+    if step == 0:
+        raise ValueError(f"Sweep step for {name} cannot be zero")
+    values = []
+    value = start
+    while (value <= end) if step > 0 else (value >= end):
+        values.append(value)
+        value += step
+    if not values:
+        raise ValueError(f"Sweep range for {name} is empty: {raw_range}")
+    return name, values
+
+
+def _split_sweep_args(items: list[str]) -> tuple[str, list[str]]:
+    """Отделить ``NAME=START..END [by STEP]`` от следующих за ним аргументов.
+
+    ``--sweep`` принимает несколько слов, чтобы поддержать ``by STEP`` без
+    кавычек; слова после диапазона - это обычные переопределения NAME=VALUE.
+    """
+    size = 3 if len(items) >= 3 and items[1] == "by" else 1
+    return " ".join(items[:size]), items[size:]
+
+
+def _select_columns(names: list[str], select: list[str]) -> list[str]:
+    """Имена столбцов для переменных --select.
+
+    Имя, совпадающее с входным столбцом, служебным столбцом или другим
+    выбранным именем, получает префикс ``final_``: иначе заголовок CSV
+    содержал бы повторы, а запись JSONL теряла бы входное значение.
+    """
+    taken = {*names, "result", "error", "output"}
+    columns = []
+    for name in select:
+        while name in taken:
+            name = f"final_{name}"
+        taken.add(name)
+        columns.append(name)
+    return columns
+
+
+def _write_results(
+    stream: TextIO,
+    fmt: str,
+    names: list[str],
+    select: list[str],
+    points: Iterator[Iterable[Any]],
+    results: Iterator[RunResult],
+) -> int:
+    """Записать результаты по мере поступления; вернуть число ошибок.
+
+    Строки CSV записываются порциями по ``_WRITE_CHUNK``.
+    """
+    errors = 0
+    columns = _select_columns(names, select)
+    writer = csv.writer(stream) if fmt == "csv" else None
+    if writer is not None:
+        writer.writerow([*names, "result", *columns, "error", "output"])
+    pending: list[list[str]] = []
+    for point, result in zip(points, results):
+        if result.error is not None:
+            errors += 1
+        values = [str(value) for value in point]
+        variables = list(result.variables) or [None] * len(select)
+        if writer is not None:
+            pending.append([
+                *values,
+                result.value or "",
+                *(value or "" for value in variables),
+                result.error or "",
+                result.output,
+            ])
+            if len(pending) >= _WRITE_CHUNK:
+                writer.writerows(pending)
+                pending.clear()
+        else:
+            record: Dict[str, Any] = dict(zip(names, values))
+            record["result"] = result.value
+            record.update(zip(columns, variables))
+            record.update(error=result.error, output=result.output)
+            stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+    if writer is not None:
+        writer.writerows(pending)
+    return errors
+
+
+def _load_prelude(path: Optional[str]) -> Optional[Snapshot]:
+    """Выполнить прелюдию --prelude один раз и вернуть снимок её состояния.
+
+    Raises:
+        ValueError: Файл не найден
+        DSLError: Ошибка выполнения прелюдии
+    """
+    if path is None:
+        return None
+    prelude_path = Path(path)
+    if not prelude_path.exists():
+        raise ValueError(f"Prelude not found: {prelude_path}")
+    source = prelude_path.read_text(encoding="utf-8")
+    return Snapshot.capture(Program.compile(source, path=str(prelude_path)))
+
+
+def _use_cache(args: argparse.Namespace, program: str, prelude: Optional[Snapshot]) -> bool:
+    """Кэш результатов: включён, не отключён и применим к этому запуску.
+
+    Трассировка, прелюдия и import делают результат зависящим не только от
+    скрипта и переменных, поэтому такие запуски выполняются всегда. Кэш
+    хранит десятичную запись результата, поэтому вывод в другой системе
+    счисления его не использует.
+    """
+    return (
+        bool(args.cache_dir)
+        and not args.no_cache
+        and not args.trace
+        and args.radix == "dec"
+        and prelude is None
+        and cacheable(program)
+    )
+
+
+def _parse_line_range(text: str) -> tuple[int, int]:
+    """Разобрать диапазон строк ``A..B`` или одну строку ``A`` для --trace-lines."""
+    match = _LINES_RE.match(text)
+    if match is None:
+        raise argparse.ArgumentTypeError(f"Invalid line range: {text}")
+    first = int(match.group("first"))
+    last = int(match.group("last") or first)
+    if first > last:
+        raise argparse.ArgumentTypeError(f"Empty line range: {text}")
+    return first, last
+
+
+def _make_tracer(
+    args: argparse.Namespace, output: StreamSink, stack: contextlib.ExitStack
+) -> bool | TraceSink:
+    """Приёмник трассировки по параметрам --trace-*.
+
+    Текстовая и JSONL-трассировка без файла идут в поток вывода программы
+    вместе с print; двоичная без файла - в двоичный stdout. С --trace-last
+    события копятся в кольцевом буфере и выводятся только при ошибке;
+    --trace-every, --trace-lines и --trace-loop отбирают события до буфера.
+    """
+    if not args.trace:
+        return False
+    fmt = args.trace_format or "text"
+    sampled = args.trace_every > 1 or bool(args.trace_lines) or bool(args.trace_loop)
+    partial = args.trace_last is not None or sampled
+    sink: TraceSink
+    if fmt == "binary":
+        if args.trace_file:
+            sink = BinaryTraceSink(stack.enter_context(open(args.trace_file, "wb")))
+        else:
+            sink = BinaryTraceSink(sys.stdout.buffer)
+    else:
+        target = output
+        if args.trace_file:
+            stream = stack.enter_context(
+                open(args.trace_file, "w", encoding="utf-8", buffering=_IO_BUFFER)
+            )
+            target = StreamSink(stream)
+        if fmt == "jsonl":
+            sink = JsonlTraceSink(target)
+        else:
+            # Строка ошибки нужна, только если показана часть трассировки
+            sink = TextTraceSink(target, errors=partial)
+    if args.trace_last is not None:
+        sink = RingTraceSink(args.trace_last, sink)
+    if sampled:
+        sink = FilterTraceSink(
+            sink, args.trace_every, args.trace_lines, args.trace_loop or None
+        )
+    return sink
+
+
+def _run_sweep(
+    args: argparse.Namespace,
+    program: str,
+    overrides: Dict[str, Any],
+    prelude: Optional[Snapshot],
+) -> int:
+    """Выполнить скрипт для всех точек декартовой сетки --sweep."""
+    try:
+        sweeps = [_parse_sweep(spec) for spec in args.sweep]
+    except ValueError as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+    names = [name for name, _ in sweeps]
+    grid = [values for _, values in sweeps]
+    points = itertools.product(*grid)
+    results = run_many(
+        program,
+        (dict(zip(names, point)) for point in itertools.product(*grid)),
+        base_env=overrides,
+        jobs=args.jobs,
+        select=args.select,
+        prelude=prelude,
+        path=args.script,
+    )
+    with _open_output(args.output) as stream:
+        errors = _write_results(stream, args.format, names, args.select, points, results)
+    return 1 if errors else 0
+
+
+def _run_input(
+    args: argparse.Namespace,
+    program: str,
+    overrides: Dict[str, Any],
+    prelude: Optional[Snapshot],
+) -> int:
+    """Выполнить скрипт для каждой строки CSV-файла --input.
+
+    Файл читается потоково: в памяти только строки, ожидающие результата.
+    """
+    input_path = Path(args.input)
+    if not input_path.exists():
+        print(f"Input not found: {input_path}", file=sys.stderr)
+        return 2
+    with input_path.open(newline="", encoding="utf-8", buffering=_IO_BUFFER) as source:
+        reader = csv.reader(source)
+        names = next(reader, None)
+        if not names:
+            print(f"Input has no header: {input_path}", file=sys.stderr)
+            return 2
+        for name in names:
+            if not _NAME_RE.match(name):
+                print(f"Invalid variable name in input header: {name}", file=sys.stderr)
+                return 2
+        rows, points = itertools.tee(reader)
+        results = run_many(
+            program,
+            (dict(zip(names, row)) for row in rows),
+            base_env=overrides,
+            jobs=args.jobs,
+            chunk_size=args.chunk_size,
+            select=args.select,
+            prelude=prelude,
+            path=args.script,
+        )
+        with _open_output(args.output) as stream:
+            errors = _write_results(stream, args.format, names, args.select, points, results)
+    return 1 if errors else 0
+
+
+def _run_jsonl(base_env: Dict[str, Any], prelude: Optional[Snapshot]) -> int:
+    """Обработать запросы JSON Lines из stdin; код 1, если были ошибки."""
+    session = JsonlSession(base_env=base_env, prelude=prelude)
+    errors = session.serve(sys.stdin.buffer, sys.stdout.buffer)
+    return 1 if errors else 0
+
+
+@contextlib.contextmanager
+def _open_output(path: Optional[str]) -> Iterator[TextIO]:
+    """Открыть файл результатов с большим буфером (``-`` или None - stdout)."""
+    if path is None or path == "-":
+        yield sys.stdout
+        sys.stdout.flush()
+        return
+    with open(path, "w", newline="", encoding="utf-8", buffering=_IO_BUFFER) as stream:
+        yield stream
+
+
+def _write_report(stream: TextIO, fmt: str, results: list[FileResult], elapsed: float) -> None:
+    """Записать сводный отчёт о выполнении файлов (упорядочен по пути)."""
+    failed = [result for result in results if not result.ok]
+    if fmt == "json":
+        report = {
+            "total": len(results),
+            "failed": len(failed),
+            "seconds": round(elapsed, 6),
+            "scripts": [
+                {
+                    "path": result.path,
+                    "result": result.value,
+                    "error": result.error,
+                    "output": result.output,
+                    "seconds": round(result.seconds, 6),
+                }
+                for result in results
+            ],
+        }
+        stream.write(json.dumps(report, ensure_ascii=False, indent=2) + "\n")
+        return
+    for result in results:
+        status = "ok" if result.ok else "FAIL"
+        detail = result.value if result.ok else result.error
+        stream.write(f"{status:4} {result.seconds:8.3f}s {result.path}")
+        stream.write(f": {detail}\n" if detail is not None else "\n")
+    stream.write(
+        f"{len(results)} scripts, {len(results) - len(failed)} ok, "
+        f"{len(failed)} failed in {elapsed:.3f}s\n"
+    )
+
+
+def run_many_main(argv: list[str]) -> int:
+    """Подкоманда ``run-many``: выполнить все скрипты каталога.
+
+    Каждый скрипт выполняется в свежем интерпретаторе; разбор и выполнение
+    идут в тёплых рабочих процессах, самые большие файлы - первыми.
+    Код возврата 1, если хотя бы один скрипт завершился ошибкой.
+
+    Аргументы:
+        argv: Аргументы после ``run-many``.
+
+    Примеры использования:
+        python cli.py run-many scripts/ --jobs 8
+        python cli.py run-many scripts/ --pattern "**/*.clc" --format json --report report.json
+    """
+    parser = argparse.ArgumentParser(prog="cli.py run-many", description="Run many DSL scripts.")
+    parser.add_argument("directory", help="Directory with .clc scripts")
+    parser.add_argument("--pattern", default="*.clc", help="Glob pattern for scripts (default: *.clc)")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (default: number of CPUs)",
+    )
+    parser.add_argument("--format", choices=("text", "json"), default="text", help="Report format")
+    parser.add_argument("--report", help="Report file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    directory = Path(args.directory)
+    if not directory.is_dir():
+        print(f"Directory not found: {directory}", file=sys.stderr)
+        return 2
+    paths = [str(path) for path in directory.glob(args.pattern) if path.is_file()]
+    if not paths:
+        print(f"No scripts matching {args.pattern} in {directory}", file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+    results = sorted(run_files(paths, jobs=args.jobs), key=lambda result: result.path)
+    elapsed = time.perf_counter() - started
+    with _open_output(args.report) as stream:
+        _write_report(stream, args.format, results, elapsed)
+    return 1 if any(not result.ok for result in results) else 0
+
+
+def serve_main(argv: list[str]) -> int:
+    """Подкоманда ``serve``: сервер вычислений на localhost или Unix-сокете.
+
+    Аргументы:
+        argv: Аргументы после ``serve``.
+
+    Примеры использования:
+        python cli.py serve --port 8765 --jobs 4
+        python cli.py serve --unix /tmp/calc.sock --cache-size 256 --timeout 2
+    """
+    parser = argparse.ArgumentParser(prog="cli.py serve", description="Serve DSL evaluations.")
+    parser.add_argument("--host", default="127.0.0.1", help="HTTP host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="HTTP port (default: 8765)")
+    parser.add_argument("--unix", metavar="PATH", help="Listen on a Unix socket instead of HTTP")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--cache-size", type=int, default=128, help="Compiled programs kept in the LRU cache"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=5.0, help="Per-request time limit in seconds"
+    )
+    args = parser.parse_args(argv)
+    if args.jobs < 1 or args.cache_size < 1 or args.timeout <= 0:
+        parser.error("--jobs, --cache-size and --timeout must be positive")
+
+    with EvaluationService(args.jobs, args.cache_size, args.timeout) as service:
+        server = make_server(service, args.host, args.port, args.unix)
+        where = args.unix or "http://{}:{}".format(*server.server_address[:2])
+        print(f"Serving on {where}", file=sys.stderr, flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if args.unix:
+                Path(args.unix).unlink(missing_ok=True)
+    return 0
+
+
 def main(argv: list[str]) -> int:
     """Главная функция для запуска из командной строки.
     Программа принимает путь к скрипту и переопределения переменных в виде NAME=VALUE.
@@ -50,33 +483,216 @@ def main(argv: list[str]) -> int:
         python cli.py script.clc
         python cli.py script.clc x=10 y=20
         python cli.py script.clc x=10 y=20 --trace
+        python cli.py script.clc --trace-format jsonl --trace-file trace.jsonl
+        python cli.py long.clc --trace-last 200 --trace-every 1000
+        python cli.py script.clc --sweep x=1..1000 --sweep y=0.1..1 by 0.1 --jobs 4
+        python cli.py script.clc --input rows.csv --output out.csv --select a,b
+        python cli.py --jsonl < requests.jsonl > results.jsonl
+        python cli.py script.clc --prelude lib.clc --input rows.csv
+        python cli.py script.clc x=10 --cache-dir ~/.cache/calc-dsl
+        python cli.py factorial.clc n=100000 --radix hex
+        python cli.py run-many scripts/ --jobs 8
+        python cli.py serve --port 8765
     """
+    if argv and argv[0] == "run-many":
+        return run_many_main(argv[1:])
+    if argv and argv[0] == "serve":
+        return serve_main(argv[1:])
     parser = argparse.ArgumentParser(description="Run DSL scripts.")
-    parser.add_argument("script", help="Path to .clc script")
+    parser.add_argument("script", nargs="?", help="Path to .clc script")
     parser.add_argument("vars", nargs="*", help="Variable overrides: name=value")
     parser.add_argument("--trace", action="store_true", help="Enable trace mode for debugging")
-    args = parser.parse_args(argv)
+    parser.add_argument(
+        "--trace-format",
+        choices=TRACE_FORMATS,
+        default=None,
+        help="Trace as text lines, JSON Lines events or compact binary records "
+        "(implies --trace; default: text)",
+    )
+    parser.add_argument(
+        "--trace-file",
+        metavar="FILE",
+        help="Write the trace to FILE instead of stdout (implies --trace)",
+    )
+    parser.add_argument(
+        "--trace-last",
+        type=int,
+        metavar="N",
+        help="Keep only the last N trace events and write them if the script fails "
+        "(implies --trace)",
+    )
+    parser.add_argument(
+        "--trace-every",
+        type=int,
+        default=1,
+        metavar="K",
+        help="Trace only every Kth iteration of each loop (implies --trace)",
+    )
+    parser.add_argument(
+        "--trace-lines",
+        type=_parse_line_range,
+        metavar="A..B",
+        help="Trace only events of source lines A..B (implies --trace)",
+    )
+    parser.add_argument(
+        "--trace-loop",
+        type=lambda text: [name.strip() for name in text.split(",") if name.strip()],
+        default=[],
+        metavar="VAR[,VAR...]",
+        help="Trace only inside loops over these variables (implies --trace)",
+    )
+    parser.add_argument(
+        "--prelude",
+        metavar="FILE",
+        help="Script executed once; every run starts from a copy of its variables",
+    )
+    parser.add_argument(
+        "--flush",
+        choices=FLUSH_POLICIES,
+        default=None,
+        help="When print output is written: every print, every line, or when the "
+        "buffer fills (default: size, or line with --trace)",
+    )
+    parser.add_argument(
+        "--radix",
+        choices=RADIXES,
+        default="dec",
+        help="Number system of the printed result: decimal, hex or binary digits "
+        "(hex and binary apply to integer results; default: dec)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=os.environ.get(CACHE_DIR_ENV),
+        metavar="DIR",
+        help=f"Reuse results of identical runs stored in DIR (default: ${CACHE_DIR_ENV})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the result cache",
+    )
+    parser.add_argument(
+        "--jsonl",
+        action="store_true",
+        help="Read JSON requests from stdin, write JSON results to stdout (one per line)",
+    )
+    parser.add_argument(
+        "--sweep",
+        action="append",
+        nargs="+",
+        metavar="NAME=START..END [by STEP]",
+        help="Run the script over a range of values (repeat for a Cartesian grid)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for --sweep and --input (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--input",
+        help="CSV file: each row is one run, columns are variable overrides",
+    )
+    parser.add_argument("--output", help="Results file for --sweep/--input (default: stdout)")
+    parser.add_argument(
+        "--select",
+        type=lambda text: [name.strip() for name in text.split(",") if name.strip()],
+        default=[],
+        metavar="NAME[,NAME...]",
+        help="Variables whose final values are written next to the result",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=256,
+        help="Rows per worker task for --input",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("csv", "jsonl"),
+        default="csv",
+        help="Output format for --sweep/--input results",
+    )
+    args = parser.parse_intermixed_args(argv)
+    args.trace = (
+        args.trace
+        or args.trace_format is not None
+        or args.trace_file is not None
+        or args.trace_last is not None
+        or args.trace_every != 1
+        or args.trace_lines is not None
+        or bool(args.trace_loop)
+    )
+    if args.trace_last is not None and args.trace_last <= 0:
+        parser.error("--trace-last must be positive")
+    if args.trace_every <= 0:
+        parser.error("--trace-every must be positive")
+    if args.jsonl and (args.script or args.sweep or args.input or args.trace):
+        parser.error("--jsonl takes scripts from requests and cannot be combined")
+    if not args.jsonl and args.script is None:
+        parser.error("the following arguments are required: script")
+    if args.sweep and args.input:
+        parser.error("--sweep cannot be used with --input")
+    if (args.sweep or args.input) and args.trace:
+        parser.error("--trace cannot be used with --sweep or --input")
+    if (args.sweep or args.input or args.jsonl) and args.radix != "dec":
+        parser.error("--radix applies to a single run only")
+    if args.sweep:
+        specs = []
+        for items in args.sweep:
+            spec, extra = _split_sweep_args(items)
+            specs.append(spec)
+            args.vars.extend(extra)
+        args.sweep = specs
 
-    script_path = Path(args.script)
-    if not script_path.exists():
+    script_path = Path(args.script or "")
+    if not args.jsonl and not script_path.exists():
         print(f"Script not found: {script_path}", file=sys.stderr)
         return 2
 
     try:
         overrides = _parse_assignments(args.vars)
+        prelude = _load_prelude(args.prelude)
     except ValueError as exc:
         print(str(exc), file=sys.stderr)
         return 2
-
-    interpreter = Interpreter(initial_env=overrides, trace=args.trace)
-    try:
-        program = script_path.read_text(encoding="utf-8")
-        result = interpreter.execute(program)
-        if result is not None:
-            print(interpreter.format_value(result))
     except DSLError as exc:
-        print(str(exc), file=sys.stderr)
+        print(f"Prelude failed: {exc}", file=sys.stderr)
         return 1
+
+    if args.jsonl:
+        return _run_jsonl(overrides, prelude)
+    program = script_path.read_text(encoding="utf-8")
+    if args.sweep:
+        return _run_sweep(args, program, overrides, prelude)
+    if args.input:
+        return _run_input(args, program, overrides, prelude)
+
+    if _use_cache(args, program, prelude):
+        try:
+            cached = ResultCache(args.cache_dir).execute(program, overrides)
+        except DSLError as exc:
+            print(str(exc), file=sys.stderr)
+            return 1
+        sys.stdout.write(cached.output)
+        if cached.value is not None:
+            print(cached.value)
+        return 0
+    policy = args.flush or (FLUSH_LINE if args.trace else FLUSH_SIZE)
+    output = StreamSink(sys.stdout, policy=policy, interval=_FLUSH_INTERVAL)
+    with contextlib.ExitStack() as stack:
+        trace = _make_tracer(args, output, stack)
+        if prelude is not None:
+            interpreter = Interpreter(state=prelude.fork(overrides), trace=trace, output=output)
+        else:
+            interpreter = Interpreter(initial_env=overrides, trace=trace, output=output)
+        try:
+            result = interpreter.execute(program, script_path)
+            if result is not None:
+                interpreter.write_value(result, args.radix)
+        except DSLError as exc:
+            print(str(exc), file=sys.stderr)
+            return 1
     return 0
 
 
@@ -0,0 +1,155 @@
+"""Кооперативное выполнение синхронного вычислителя в asyncio.
+
+Интерпретатор рекурсивен и синхронен, поэтому не может сам уступать
+управление циклу событий. Здесь он выполняется на собственном стеке
+вспомогательного потока, но в режиме поочерёдности: пока работает
+вычислитель, цикл событий ждёт, и наоборот. Каждые ``yield_every`` шагов
+(итераций циклов и операторов верхнего уровня) вычислитель
+останавливается и отдаёт управление циклу событий, поэтому задержка других
+корутин ограничена стоимостью одной порции шагов.
+
+``run_offloaded`` выполняет вычислитель в пуле потоков параллельно с циклом
+событий (для тяжёлых скриптов); отмена в обоих режимах кооперативная:
+вычислитель прерывается на ближайшем шаге.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+import threading
+from typing import Any, Callable, Optional
+
+# Функция шага: вызывается вычислителем на каждой итерации цикла
+StepHook = Callable[[], None]
+
+
+class ExecutionCancelled(BaseException):
+    """Выполнение прервано отменой задачи asyncio.
+
+    Наследует BaseException, чтобы обработчики ошибок DSL его не перехватили.
+    """
+
+
+class _Slicer:
+    """Поочерёдное выполнение вычислителя и цикла событий."""
+
+    def __init__(self, yield_every: int) -> None:
+        self._every = yield_every
+        self._steps = 0
+        self._resume = threading.Event()
+        self._paused = threading.Event()
+        self.cancelled = False
+        self.done = False
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+    def step(self) -> None:
+        """Шаг вычислителя: каждые ``yield_every`` шагов уступить циклу событий."""
+        self._steps += 1
+        if self._steps < self._every:
+            return
+        self._steps = 0
+        self._resume.clear()
+        self._paused.set()
+        self._resume.wait()
+        if self.cancelled:
+            raise ExecutionCancelled()
+
+    def run(self, func: Callable[[StepHook], Any]) -> None:
+        """Тело вспомогательного потока."""
+        self._resume.wait()
+        try:
+            self.result = func(self.step)
+        except BaseException as exc:  # pylint: disable=broad-exception-caught
+            self.error = exc
+        finally:
+            self.done = True
+            self._paused.set()
+
+    def run_slice(self) -> None:
+        """Дать вычислителю выполнить одну порцию шагов (блокирует цикл событий)."""
+        self._paused.clear()
+        self._resume.set()
+        self._paused.wait()
+
+    def cancel(self) -> None:
+        """Прервать вычислитель на ближайшем шаге и дождаться его остановки."""
+        self.cancelled = True
+        self.run_slice()
+
+
+async def run_sliced(func: Callable[[StepHook], Any], yield_every: int = 1000) -> Any:
+    """Выполнить ``func(step)`` порциями, уступая циклу событий между ними.
+
+    Args:
+        func: Вычислитель; должен вызывать ``step()`` на каждом шаге
+        yield_every: Число шагов в одной порции
+
+    Returns:
+        Результат func
+
+    Raises:
+        asyncio.CancelledError: Задача отменена; вычислитель остановлен
+            до возврата
+        ValueError: yield_every меньше 1
+    """
+    if yield_every < 1:
+        raise ValueError("yield_every must be >= 1")
+    slicer = _Slicer(yield_every)
+    worker = threading.Thread(target=slicer.run, args=(func,), daemon=True)
+    worker.start()
+    try:
+        while True:
+            slicer.run_slice()
+            if slicer.done:
+                break
+            await asyncio.sleep(0)
+    except asyncio.CancelledError:
+        if not slicer.done:
+            slicer.cancel()
+        raise
+    finally:
+        worker.join()
+    if slicer.error is not None:
+        raise slicer.error
+    return slicer.result
+
+
+async def run_offloaded(
+    func: Callable[[StepHook], Any], executor: Optional[Executor] = None
+) -> Any:
+    """Выполнить ``func(step)`` в потоке, не блокируя цикл событий.
+
+    Args:
+        func: Вычислитель; должен вызывать ``step()`` на каждом шаге
+        executor: Пул потоков (по умолчанию - временный пул из одного потока)
+
+    Returns:
+        Результат func
+
+    Raises:
+        asyncio.CancelledError: Задача отменена; вычислитель остановлен
+            до возврата
+    """
+    cancelled = threading.Event()
+
+    def step() -> None:
+        if cancelled.is_set():
+            raise ExecutionCancelled()
+
+    own_executor = ThreadPoolExecutor(max_workers=1) if executor is None else None
+    future = (executor or own_executor).submit(func, step)
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        cancelled.set()
+        # Дождаться остановки вычислителя: после возврата его состояние не меняется
+        try:
+            await asyncio.shield(asyncio.wrap_future(future))
+        except BaseException:  # pylint: disable=broad-exception-caught
+            pass  # исход уже не важен: задача отменена
+        raise
+    finally:
+        if own_executor is not None:
+            own_executor.shutdown(wait=False)
@@ -0,0 +1,413 @@
+"""Математические функции произвольной точности для ``decimal.Decimal``.
+
+Функции принимают число ``places`` - сколько знаков после запятой должно
+быть верными в результате - и сами выбирают рабочую точность (количество
+значащих цифр) с запасом ``GUARD_DIGITS``. Результат не округляется до
+``places``: это делает вызывающий (числовой бэкенд).
+
+До ``FAST_DIGITS`` значащих цифр используются встроенные
+``Decimal.ln``/``log10``/``sqrt``/``power``. На больших точностях они
+становятся слишком медленными (ln на 10 000 цифр считается секунды), поэтому
+там ln вычисляется через AGM, exp - рядом Тейлора с делением аргумента,
+а квадратный корень - через ``math.isqrt``.
+
+Синус и косинус считаются рядом Тейлора после приведения аргумента к
+``[-pi/4, pi/4]`` и деления его на ``2**k``. Константы приведения
+ln 2 и ln 10 кэшируются по точности. pi (формула Чудновских) и e вычисляются
+двоичным разбиением и хранятся в общем для процесса кэше: самое точное из
+вычисленных значений округляется для запросов с меньшей точностью.
+
+Ошибки сообщаются так же, как в числовых бэкендах: ``ValueError`` для
+ошибок области определения и ``ZeroDivisionError`` для деления на ноль.
+"""
+
+from __future__ import annotations
+
+from decimal import MAX_EMAX, MAX_PREC, MIN_EMIN, Context, Decimal, localcontext
+import functools
+import math
+import threading
+from typing import Callable
+
+
+GUARD_DIGITS = 10
+FAST_DIGITS = 400
+
+# Контекст для точного изменения показателя степени (scaleb без округления)
+_EXACT = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)
+
+
+def _context(prec: int) -> Context:
+    """Рабочий контекст с заданным числом значащих цифр."""
+    return Context(prec=prec, Emax=MAX_EMAX, Emin=MIN_EMIN)
+
+
+def _int_digits(value: Decimal) -> int:
+    """Количество цифр целой части (0 для |value| < 1)."""
+    return max(0, value.adjusted() + 1)
+
+
+def _log10_estimate(value: Decimal) -> float:
+    """Приближённый десятичный логарифм положительного числа любой величины."""
+    exponent = value.adjusted()
+    return exponent + math.log10(float(value.scaleb(-exponent, _EXACT)))
+
+
+# ---------------------------------------------------------------------------
+# Константы
+# ---------------------------------------------------------------------------
+
+
+# Наиболее точные из уже вычисленных значений констант:
+# имя -> (число верных значащих цифр, значение). Общий для всего процесса:
+# значение, вычисленное с большей точностью, обслуживает запросы с меньшей.
+_CONSTANTS: dict[str, tuple[int, Decimal]] = {}
+_CONSTANTS_LOCK = threading.Lock()
+
+
+def _constant(name: str, prec: int, compute: Callable[[int], int]) -> Decimal:
+    """Константа с ``prec`` значащими цифрами из общего кэша.
+
+    Args:
+        name: Имя константы (ключ кэша)
+        prec: Требуемое число значащих цифр
+        compute: Функция ``digits -> int``, возвращающая ``константа * 10**digits``
+
+    Returns:
+        Значение, округлённое до ``prec`` значащих цифр
+    """
+    cached = _CONSTANTS.get(name)
+    if cached is None or cached[0] < prec:
+        digits = prec + GUARD_DIGITS
+        value = Decimal(compute(digits)).scaleb(-digits, _EXACT)
+        with _CONSTANTS_LOCK:
+            cached = _CONSTANTS.get(name)
+            if cached is None or cached[0] < prec:
+                cached = (digits, value)
+                _CONSTANTS[name] = cached
+    return _context(prec).plus(cached[1])
+
+
+def _chudnovsky(digits: int) -> int:
+    """``pi * 10**digits`` по формуле Чудновских с двоичным разбиением."""
+    c3_over_24 = 640320 ** 3 // 24
+
+    def split(a: int, b: int) -> tuple[int, int, int]:
+        if b - a == 1:
+            if a == 0:
+                p = q = 1
+            else:
+                p = (6 * a - 5) * (2 * a - 1) * (6 * a - 1)
+                q = a * a * a * c3_over_24
+            t = p * (13591409 + 545140134 * a)
+            return p, q, -t if a % 2 else t
+        m = (a + b) // 2
+        p1, q1, t1 = split(a, m)
+        p2, q2, t2 = split(m, b)
+        return p1 * p2, q1 * q2, q2 * t1 + p1 * t2
+
+    # Каждый член ряда добавляет около 14.18 десятичных цифр
+    terms = int(digits / 14.18) + 2
+    _, q, t = split(0, terms)
+    sqrt_c = math.isqrt(10005 * 10 ** (2 * digits))
+    return q * 426880 * sqrt_c // t
+
+
+def _e_series(digits: int) -> int:
+    """``e * 10**digits`` как сумма ``1/k!`` с двоичным разбиением."""
+
+    def split(a: int, b: int) -> tuple[int, int]:
+        # Сумма 1/((a+1)(a+2)...k) для k из (a, b] в виде дроби p/q
+        if b - a == 1:
+            return 1, b
+        m = (a + b) // 2
+        p1, q1 = split(a, m)
+        p2, q2 = split(m, b)
+        return p1 * q2 + p2, q1 * q2
+
+    terms = 2
+    while math.lgamma(terms + 1) < digits * math.log(10):
+        terms *= 2
+    p, q = split(0, terms)
+    scale = 10 ** digits
+    return scale + p * scale // q
+
+
+def _pi(prec: int) -> Decimal:
+    """pi с ``prec`` значащими цифрами."""
+    return _constant("pi", prec, _chudnovsky)
+
+
+def _e(prec: int) -> Decimal:
+    """e с ``prec`` значащими цифрами."""
+    return _constant("e", prec, _e_series)
+
+
+@functools.lru_cache(maxsize=32)
+def _ln2(prec: int) -> Decimal:
+    """ln 2 с ``prec`` значащими цифрами."""
+    if prec < FAST_DIGITS:
+        return _context(prec).ln(Decimal(2))
+    # ln(2**m) = m * ln 2 при 2**m > 10**(prec/2)
+    m = math.ceil((prec / 2 + 1) * math.log2(10))
+    wp = prec + len(str(m)) + 2
+    return _context(prec).divide(_agm_ln(_context(wp).power(2, m), wp), m)
+
+
+@functools.lru_cache(maxsize=32)
+def _ln10(prec: int) -> Decimal:
+    """ln 10 с ``prec`` значащими цифрами."""
+    return _ln(Decimal(10), prec)
+
+
+def pi(places: int) -> Decimal:
+    """Число pi с ``places`` верными знаками после запятой."""
+    return _pi(places + 1 + GUARD_DIGITS)
+
+
+def e(places: int) -> Decimal:
+    """Число e с ``places`` верными знаками после запятой."""
+    return _e(places + 1 + GUARD_DIGITS)
+
+
+# ---------------------------------------------------------------------------
+# Базовые операции с выбором алгоритма по точности
+# ---------------------------------------------------------------------------
+
+
+def _sqrt(value: Decimal, prec: int) -> Decimal:
+    """Квадратный корень неотрицательного числа с ``prec`` значащими цифрами."""
+    if prec < FAST_DIGITS or value == 0:
+        return _context(prec).sqrt(value)
+    # value * 10**(2k) - целое не менее чем из 2*prec цифр
+    k = prec - value.adjusted() // 2 + 1
+    root = math.isqrt(int(value.scaleb(2 * k, _EXACT)))
+    return Decimal(root).scaleb(-k, _EXACT)
+
+
+def _agm_ln(s: Decimal, prec: int) -> Decimal:
+    """``pi / (2 * AGM(1, 4/s))`` - это ln(s) с точностью ``prec`` при ``s > 10**(prec/2)``."""
+    with localcontext(_context(prec)):
+        a = Decimal(1)
+        b = 4 / s
+        tolerance = Decimal(1).scaleb(-prec + 2)
+        while abs(a - b) > tolerance:
+            a, b = (a + b) / 2, _sqrt(a * b, prec)
+        return _pi(prec) / (2 * a)
+
+
+def _ln(value: Decimal, prec: int) -> Decimal:
+    """Натуральный логарифм положительного числа с ``prec`` значащими цифрами."""
+    if prec < FAST_DIGITS:
+        return _context(prec).ln(value)
+    # ln(value) = ln(value * 2**m) - m * ln 2; вычитание теряет len(str(m)) цифр
+    m = math.ceil((prec / 2 + 1 - _log10_estimate(value)) * math.log2(10))
+    wp = prec + len(str(abs(m))) + 2
+    with localcontext(_context(wp)):
+        return _agm_ln(value * Decimal(2) ** m, wp) - m * _ln2(wp)
+
+
+def _exp(value: Decimal, prec: int) -> Decimal:
+    """Экспонента с ``prec`` значащими цифрами."""
+    if prec < FAST_DIGITS:
+        return _context(prec).exp(value)
+    # exp(x) = 2**n * exp(r), |r| <= ln2/2; exp(r) = exp(r / 2**k) ** (2**k)
+    n = int(_context(prec).divide(value, _ln2(prec)).to_integral_value())
+    k = int(math.sqrt(prec))
+    wp = prec + len(str(abs(n))) + k // 3 + 5
+    with localcontext(_context(wp)):
+        t = (value - n * _ln2(wp)) / Decimal(2) ** k
+        term = Decimal(1)
+        total = term
+        i = 0
+        while True:
+            i += 1
+            term = term * t / i
+            new_total = total + term
+            if new_total == total:
+                break
+            total = new_total
+        for _ in range(k):
+            total = total * total
+        return total * Decimal(2) ** n
+
+
+# ---------------------------------------------------------------------------
+# Логарифмы, корни, степени
+# ---------------------------------------------------------------------------
+
+
+def _ln_prec(value: Decimal, places: int) -> int:
+    """Рабочая точность для логарифма: |ln x| растёт с порядком x."""
+    return places + GUARD_DIGITS + len(str(abs(value.adjusted())))
+
+
+def ln(value: Decimal, places: int) -> Decimal:
+    """Натуральный логарифм."""
+    if value <= 0:
+        raise ValueError("math domain error")
+    return _ln(value, _ln_prec(value, places))
+
+
+def log10(value: Decimal, places: int) -> Decimal:
+    """Десятичный логарифм."""
+    if value <= 0:
+        raise ValueError("math domain error")
+    prec = _ln_prec(value, places)
+    if prec < FAST_DIGITS:
+        return _context(prec).log10(value)
+    return _context(prec).divide(_ln(value, prec), _ln10(prec))
+
+
+def log2(value: Decimal, places: int) -> Decimal:
+    """Двоичный логарифм: ``ln(x) / ln(2)``."""
+    if value <= 0:
+        raise ValueError("math domain error")
+    prec = _ln_prec(value, places)
+    return _context(prec).divide(_ln(value, prec), _ln2(prec))
+
+
+def sqrt(value: Decimal, places: int) -> Decimal:
+    """Квадратный корень."""
+    if value < 0:
+        raise ValueError("sqrt domain error")
+    return _sqrt(value, places + GUARD_DIGITS + max(0, value.adjusted() // 2 + 1))
+
+
+def _exp_ln(magnitude: Decimal, factor: Decimal, places: int) -> Decimal:
+    """``magnitude ** factor`` для ``magnitude > 0``."""
+    log10_result = float(factor) * _log10_estimate(magnitude)
+    result_digits = max(0, int(log10_result) + 1)
+    # Абсолютная погрешность factor * ln(magnitude) переходит
+    # в относительную погрешность результата: нужен запас цифр
+    exponent_digits = len(str(int(abs(log10_result)) + 1))
+    prec = places + GUARD_DIGITS + result_digits + exponent_digits
+    ctx = _context(prec)
+    if prec < FAST_DIGITS:
+        return ctx.power(magnitude, factor)
+    return _exp(ctx.multiply(factor, _ln(magnitude, prec)), prec)
+
+
+def power(base: Decimal, exponent: Decimal, places: int) -> Decimal:
+    """Степень с дробным показателем: ``base ** exponent`` для ``base >= 0``."""
+    if base == 0:
+        if exponent > 0:
+            return Decimal(0)
+        raise ZeroDivisionError("division by zero")
+    if base < 0:
+        raise ValueError("math domain error")
+    return _exp_ln(base, exponent, places)
+
+
+def nrt(value: Decimal, degree: Decimal, places: int) -> Decimal:
+    """Корень степени ``degree``; для нечётной целой степени допускает ``value < 0``."""
+    if degree == 0:
+        raise ZeroDivisionError("nrt division by zero")
+    is_int = degree == degree.to_integral_value()
+    if value < 0 and not (is_int and int(degree) % 2 == 1):
+        raise ValueError("nrt domain error")
+    magnitude = value.copy_abs()
+    if magnitude == 0:
+        if degree > 0:
+            return Decimal(0)
+        raise ZeroDivisionError("nrt division by zero")
+    inverse_prec = places + 2 * GUARD_DIGITS + len(str(abs(magnitude.adjusted())))
+    inverse = _context(inverse_prec).divide(Decimal(1), degree)
+    result = _exp_ln(magnitude, inverse, places)
+    return result.copy_negate() if value < 0 else result
+
+
+# ---------------------------------------------------------------------------
+# Тригонометрия
+# ---------------------------------------------------------------------------
+
+
+def _reduce(value: Decimal, prec: int) -> tuple[Decimal, int]:
+    """Привести аргумент к ``r`` из ``[-pi/4, pi/4]``: ``value = r + k * pi/2``.
+
+    Returns:
+        Пара (r, k mod 4)
+    """
+    extra = _int_digits(value)
+    with localcontext(_context(prec + extra)):
+        half_pi = _pi(prec + extra) / 2
+        k = (value / half_pi).to_integral_value()
+        r = value - k * half_pi
+    return r, int(k) % 4
+
+
+def _versine(r: Decimal, prec: int) -> Decimal:
+    """``1 - cos(r)`` для ``|r| <= pi/4`` без потери точности при малых r.
+
+    Аргумент делится на ``2**k``, ряд считается для малого аргумента,
+    затем k раз применяется ``v(2t) = 2 v(t) (2 - v(t))``.
+    """
+    k = int(math.sqrt(prec)) // 2
+    with localcontext(_context(prec + k // 3 + 3)):
+        t = r / Decimal(2) ** k
+        t2 = t * t
+        term = t2 / 2
+        total = term
+        n = 2
+        while True:
+            n += 2
+            term = -term * t2 / ((n - 1) * n)
+            new_total = total + term
+            if new_total == total:
+                break
+            total = new_total
+        for _ in range(k):
+            total = 2 * total * (2 - total)
+        return total
+
+
+def _sin_cos(value: Decimal, prec: int) -> tuple[Decimal, Decimal]:
+    """Одновременно вычислить sin и cos с ``prec`` значащими цифрами."""
+    r, quadrant = _reduce(value, prec)
+    versine = _versine(r, prec)
+    with localcontext(_context(prec)):
+        c = 1 - versine
+        s = _sqrt(versine * (2 - versine), prec).copy_sign(r)
+    if quadrant == 0:
+        return s, c
+    if quadrant == 1:
+        return c, s.copy_negate()
+    if quadrant == 2:
+        return s.copy_negate(), c.copy_negate()
+    return c.copy_negate(), s
+
+
+def sin(value: Decimal, places: int) -> Decimal:
+    """Синус."""
+    return _sin_cos(value, places + GUARD_DIGITS)[0]
+
+
+def cos(value: Decimal, places: int) -> Decimal:
+    """Косинус."""
+    return _sin_cos(value, places + GUARD_DIGITS)[1]
+
+
+def tg(value: Decimal, places: int) -> Decimal:
+    """Тангенс."""
+    return _ratio(value, places, inverse=False)
+
+
+def ctg(value: Decimal, places: int) -> Decimal:
+    """Котангенс."""
+    if value == 0:
+        raise ZeroDivisionError("ctg division by zero")
+    return _ratio(value, places, inverse=True)
+
+
+def _ratio(value: Decimal, places: int, inverse: bool) -> Decimal:
+    """sin/cos (или cos/sin) с учётом малого знаменателя."""
+    prec = places + GUARD_DIGITS
+    s, c = _sin_cos(value, prec)
+    denominator = s if inverse else c
+    # Малый знаменатель даёт большой результат: нужны дополнительные цифры
+    extra = max(0, -denominator.adjusted())
+    if extra:
+        prec += 2 * extra
+        s, c = _sin_cos(value, prec)
+    numerator, denominator = (c, s) if inverse else (s, c)
+    return _context(prec).divide(numerator, denominator)
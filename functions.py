@@ -0,0 +1,218 @@
+"""Реестр функций, вызываемых из DSL.
+
+Каждая функция описывается ``FunctionSpec``: имя, реализация, число
+аргументов, чистота и числовой домен. Интерпретатор разрешает имя функции
+в спецификацию один раз для каждого места вызова (при компиляции дерева),
+а не при каждом вызове.
+
+Реализация функции в спецификации всегда вызывается как
+``func(backend, *args)`` с числами бэкенда интерпретатора и возвращает
+число бэкенда. Функции хоста, зарегистрированные через
+``FunctionRegistry.register``, оборачиваются так, чтобы им не нужно было
+знать о бэкенде.
+
+Ошибки функции сообщают так же, как числовые бэкенды: ``ZeroDivisionError``
+для деления на ноль и ``ValueError`` / ``OverflowError`` для ошибок области
+определения. Интерпретатор превращает их в ``DSLError`` с позицией вызова.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import functools
+from typing import Any, Callable, Dict, Iterator, Optional
+import uuid
+
+from numeric import NumericBackend
+
+
+# Числа бэкенда передаются функции как есть
+DOMAIN_BACKEND = "backend"
+# Аргументы преобразуются во float (math, NumPy), результат - обратно в число бэкенда
+DOMAIN_FLOAT = "float"
+
+DOMAINS = (DOMAIN_BACKEND, DOMAIN_FLOAT)
+
+
+@dataclass(frozen=True)
+class FunctionSpec:
+    """Описание функции DSL.
+
+    Attributes:
+        name: Имя функции в DSL
+        func: Реализация ``func(backend, *args)``
+        arity: Число аргументов
+        pure: Результат зависит только от аргументов и точности: вызовы можно
+            кэшировать и сворачивать для константных аргументов
+        domain: Числовой домен исходной реализации (``"backend"`` или ``"float"``)
+        method: Имя метода бэкенда, если функция - это просто его вызов
+    """
+
+    name: str
+    func: Callable[..., Any]
+    arity: int
+    pure: bool = True
+    domain: str = DOMAIN_BACKEND
+    method: Optional[str] = None
+
+    def bind(self, backend: NumericBackend) -> Callable[..., Any]:
+        """Вернуть реализацию для конкретного бэкенда: ``call(*args)``."""
+        if self.method is not None:
+            return getattr(backend, self.method)
+        return functools.partial(self.func, backend)
+
+
+class FunctionRegistry:
+    """Отображение имени функции в её ``FunctionSpec``."""
+
+    def __init__(
+        self, specs: Optional[Dict[str, FunctionSpec]] = None, version: Optional[str] = None
+    ) -> None:
+        self._specs: Dict[str, FunctionSpec] = dict(specs or {})
+        self._version = version or uuid.uuid4().hex
+
+    @property
+    def version(self) -> str:
+        """Метка набора функций.
+
+        Копия реестра получает метку оригинала, любое изменение - новую,
+        поэтому равные метки означают одинаковые функции. Строка, а не
+        счётчик: метка сохраняется при передаче реестра в другой процесс
+        и не совпадает с метками, созданными там.
+        """
+        return self._version
+
+    def add(self, spec: FunctionSpec) -> None:
+        """Добавить (или заменить) функцию с готовой спецификацией."""
+        self._specs[spec.name] = spec
+        self._version = uuid.uuid4().hex
+
+    def register(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        arity: int,
+        pure: bool = True,
+        domain: str = DOMAIN_FLOAT,
+    ) -> FunctionSpec:
+        """Зарегистрировать функцию хоста (Python или NumPy).
+
+        Функция вызывается как ``func(*args)``. В домене ``"float"``
+        аргументы передаются как ``float``, в домене ``"backend"`` - числами
+        бэкенда. Результат (в том числе скаляр NumPy) преобразуется в число
+        бэкенда и округляется до текущей точности.
+
+        Args:
+            name: Имя функции в DSL
+            func: Реализация
+            arity: Число аргументов
+            pure: Функция детерминирована и не имеет побочных эффектов
+            domain: Числовой домен аргументов
+
+        Returns:
+            Созданная спецификация
+
+        Raises:
+            ValueError: Если домен неизвестен или arity отрицательно
+        """
+        if domain not in DOMAINS:
+            raise ValueError(f"Unknown function domain: {domain}")
+        if arity < 0:
+            raise ValueError("arity must be >= 0")
+        spec = FunctionSpec(
+            name=name,
+            func=_HostFunction(name, func, domain),
+            arity=arity,
+            pure=pure,
+            domain=domain,
+        )
+        self.add(spec)
+        return spec
+
+    def unregister(self, name: str) -> None:
+        """Удалить функцию; неизвестное имя игнорируется."""
+        if self._specs.pop(name, None) is not None:
+            self._version = uuid.uuid4().hex
+
+    def get(self, name: str) -> Optional[FunctionSpec]:
+        """Спецификация функции или None, если функция не зарегистрирована."""
+        return self._specs.get(name)
+
+    def copy(self) -> "FunctionRegistry":
+        """Независимая копия реестра."""
+        return FunctionRegistry(self._specs, self._version)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._specs
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._specs)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+
+class _HostFunction:
+    """Функция хоста в виде реализации ``(backend, *args)``.
+
+    Класс, а не замыкание: спецификация сериализуется (pickle) вместе
+    с программой, если сериализуется сама функция хоста.
+    """
+
+    def __init__(self, name: str, func: Callable[..., Any], domain: str) -> None:
+        self._name = name
+        self._func = func
+        self._to_float = domain == DOMAIN_FLOAT
+
+    def __call__(self, backend: NumericBackend, *args: Any) -> Any:
+        if self._to_float:
+            args = tuple(float(arg) for arg in args)
+        result = self._func(*args)
+        # Скаляры NumPy (np.float64, np.int64) - без импорта numpy
+        if hasattr(result, "item"):
+            result = result.item()
+        if isinstance(result, bool):
+            raise ValueError(f"{self._name} returned non-numeric value")
+        try:
+            return backend.round(backend.coerce(result))
+        except TypeError as exc:
+            raise ValueError(f"{self._name} returned non-numeric value") from exc
+
+
+# ---------------------------------------------------------------------------
+# Встроенные функции
+# ---------------------------------------------------------------------------
+
+
+def _set_precision(backend: NumericBackend, value: Any) -> Any:
+    """Установить точность; вернуть старое значение."""
+    if not backend.is_int(value) or value < 0:
+        raise ValueError("set_precision expects integer >= 0")
+    if value > backend.max_precision:
+        raise ValueError(f"set_precision expects integer <= {backend.max_precision}")
+    old_precision = backend.precision
+    backend.precision = backend.to_int(value)
+    return backend.coerce(old_precision)
+
+
+def _get_precision(backend: NumericBackend) -> Any:
+    return backend.round(backend.coerce(backend.precision))
+
+
+def _call_method(name: str, backend: NumericBackend, *args: Any) -> Any:
+    return getattr(backend, name)(*args)
+
+
+def _backend_method(name: str, arity: int) -> FunctionSpec:
+    """Спецификация чистой функции, реализованной методом бэкенда."""
+    func = functools.partial(_call_method, name)
+    return FunctionSpec(name=name, func=func, arity=arity, method=name)
+
+
+BUILTINS = FunctionRegistry()
+BUILTINS.add(FunctionSpec("set_precision", _set_precision, arity=1, pure=False))
+BUILTINS.add(FunctionSpec("get_precision", _get_precision, arity=0, pure=False))
+for _name in ("ln", "log2", "log10", "sin", "cos", "tg", "ctg", "sqrt"):
+    BUILTINS.add(_backend_method(_name, 1))
+BUILTINS.add(_backend_method("nrt", 2))
+del _name
@@ -0,0 +1,258 @@
+"""Повторное выполнение программы с пересчётом только изменившегося.
+
+Интерактивный инструмент «что, если» выполняет один и тот же скрипт много
+раз, меняя одну-две переменные. ``IncrementalRunner`` разбивает программу
+на операторы верхнего уровня и для каждого заранее строит множества
+читаемых и записываемых переменных - граф зависимостей по данным. При
+повторном запуске оператор выполняется, только если изменилось хотя бы одно
+из значений, которые он читает (или точность); иначе его записи, вывод
+``print`` и результат берутся из предыдущего запуска.
+
+Сравниваются значения, а не только имена: если пересчитанный оператор дал
+то же значение, что и раньше, зависящие от него операторы не пересчитываются.
+
+Оператор выполняется всегда, если вызывает функцию хоста, объявленную
+нечистой, или неизвестную функцию, а также ``import`` (модули и так
+кэшируются, а изменение файла модуля должно быть видно). Точность - неявный
+вход каждого оператора: ``set_precision`` меняет её для всех следующих.
+
+Пример:
+    runner = IncrementalRunner("area = w * h\\ncost = area * price")
+    runner.run({"w": Decimal(3), "h": Decimal(4), "price": Decimal(10)})
+    runner.run({"w": Decimal(3), "h": Decimal(4), "price": Decimal(12)})
+    runner.stats                # IncrementalStats(executed=1, reused=1)
+"""
+
+from __future__ import annotations
+
+import copy
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterator, List, Mapping, Optional, Tuple
+
+from lark import Tree
+
+from functions import FunctionRegistry
+from interpreter import ExecutionState, Interpreter
+from numeric import DecimalBackend, NumericBackend
+from output import ListSink, OutputSink, stdout_sink
+from program import Program
+
+# Встроенные функции, которые не чисты (зависят от точности или меняют её),
+# но детерминированы: точность и так учитывается как вход оператора
+_PRECISION_FUNCTIONS = frozenset({"set_precision", "get_precision"})
+
+# Отсутствующая переменная (отличается от любого значения)
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class IncrementalStats:
+    """Сколько операторов последнего запуска выполнено и сколько взято из кэша.
+
+    Attributes:
+        executed: Выполненные операторы
+        reused: Операторы, результат которых взят из предыдущего запуска
+    """
+
+    executed: int
+    reused: int
+
+
+@dataclass(frozen=True)
+class _Statement:
+    """Оператор верхнего уровня и его зависимости.
+
+    Attributes:
+        tree: Поддерево оператора
+        reads: Переменные, значения которых оператор может прочитать
+        writes: Переменные, которые оператор может изменить
+        volatile: Выполнять всегда (нечистая или неизвестная функция, import)
+    """
+
+    tree: Tree
+    reads: FrozenSet[str]
+    writes: FrozenSet[str]
+    volatile: bool
+
+
+@dataclass
+class _Record:
+    """Результат выполнения оператора: входы, записи, вывод."""
+
+    inputs: Dict[str, Any]
+    precision: int
+    writes: Dict[str, Any]
+    precision_after: int
+    output: str
+    result: Any
+
+
+def _children(node: Tree) -> Iterator[Any]:
+    if node.data == "resolved_call":
+        yield from node.children[0].args
+    else:
+        yield from node.children
+
+
+def _analyze(tree: Tree) -> _Statement:
+    """Найти переменные, которые оператор читает и пишет."""
+    reads: set[str] = set()
+    writes: set[str] = set()
+    volatile = False
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if node.data == "var":
+            reads.add(node.children[0].value)
+        elif node.data == "assignment":
+            writes.add(node.children[0].value)
+            if node.children[1].children[0].value != "=":
+                reads.add(node.children[0].value)
+        elif node.data == "for_expr":
+            # Цикл читает прежнее значение переменной: после цикла оно либо
+            # восстанавливается, либо переменная удаляется
+            reads.add(node.children[0].value)
+            writes.add(node.children[0].value)
+        elif node.data == "resolved_call":
+            spec = node.children[0].spec
+            volatile |= not spec.pure and spec.name not in _PRECISION_FUNCTIONS
+        elif node.data in ("func_call", "import_stmt"):
+            volatile = True
+        stack.extend(child for child in _children(node) if isinstance(child, Tree))
+    return _Statement(tree, frozenset(reads), frozenset(writes), volatile)
+
+
+def _same(left: Any, right: Any) -> bool:
+    """Значения неразличимы для программы (``1.0`` и ``1`` различаются)."""
+    if left is right:
+        return True
+    if left is _MISSING or right is _MISSING or type(left) is not type(right):
+        return False
+    try:
+        return bool(left == right) and repr(left) == repr(right)
+    except Exception:  # pylint: disable=broad-except
+        return False
+
+
+class IncrementalRunner:
+    """Программа, повторные запуски которой пересчитывают только изменившееся."""
+
+    def __init__(
+        self,
+        source: str,
+        functions: Optional[FunctionRegistry] = None,
+        backend: Optional[NumericBackend] = None,
+        path: Optional[str] = None,
+        output: Optional[OutputSink] = None,
+    ) -> None:
+        """Скомпилировать программу и построить граф зависимостей операторов.
+
+        Args:
+            source: Исходный код программы
+            functions: Реестр функций (по умолчанию встроенный)
+            backend: Бэкенд с начальной точностью (по умолчанию DecimalBackend);
+                каждый запуск работает с его копией
+            path: Путь файла программы (для ``import``)
+            output: Приёмник вывода print (по умолчанию - sys.stdout)
+
+        Raises:
+            lark.exceptions.LarkError: Синтаксическая ошибка
+        """
+        self._program = Program.compile(source, functions, path)
+        self._backend = backend if backend is not None else DecimalBackend()
+        self._output = output if output is not None else stdout_sink()
+        tree = self._program.tree
+        nodes = tree.children if tree.data == "statement_list" else [tree]
+        self._statements = [_analyze(node) for node in nodes if isinstance(node, Tree)]
+        self._records: List[Optional[_Record]] = [None] * len(self._statements)
+        self._state: Optional[ExecutionState] = None
+        self.stats = IncrementalStats(0, 0)
+
+    @property
+    def state(self) -> Optional[ExecutionState]:
+        """Состояние после последнего запуска (None до первого запуска)."""
+        return self._state
+
+    def dependencies(self) -> List[Tuple[FrozenSet[str], FrozenSet[str]]]:
+        """Граф зависимостей: (читаемые, записываемые) переменные каждого оператора."""
+        return [(statement.reads, statement.writes) for statement in self._statements]
+
+    def run(self, env: Optional[Mapping[str, Any]] = None) -> Any:
+        """Выполнить программу, переиспользуя результаты предыдущего запуска.
+
+        Вывод ``print`` пишется в приёмник и для взятых из кэша
+        операторов, поэтому вывод совпадает с выводом полного выполнения.
+
+        Args:
+            env: Начальные значения переменных этого запуска
+
+        Returns:
+            Результат последнего оператора или None
+
+        Raises:
+            DSLError: Ошибка выполнения; результаты операторов до ошибки
+                сохраняются для следующего запуска
+        """
+        state = ExecutionState(env=dict(env or {}), backend=copy.copy(self._backend))
+        capture = ListSink()
+        interpreter = Interpreter(functions=self._program.functions, state=state, output=capture)
+        self._state = state
+        executed = reused = 0
+        result = None
+        try:
+            for index, statement in enumerate(self._statements):
+                record = self._records[index]
+                if record is not None and not statement.volatile and self._valid(record, state):
+                    for name, value in record.writes.items():
+                        if value is _MISSING:
+                            state.env.pop(name, None)
+                        else:
+                            state.env[name] = value
+                    state.backend.precision = record.precision_after
+                    if record.output:
+                        self._output.write(record.output)
+                    result = record.result
+                    reused += 1
+                else:
+                    self._records[index] = None
+                    result = self._execute(index, statement, interpreter, state, capture)
+                    executed += 1
+        finally:
+            self.stats = IncrementalStats(executed, reused)
+            self._output.flush()
+        return result
+
+    @staticmethod
+    def _valid(record: _Record, state: ExecutionState) -> bool:
+        if record.precision != state.precision:
+            return False
+        env = state.env
+        return all(_same(env.get(name, _MISSING), value) for name, value in record.inputs.items())
+
+    def _execute(
+        self,
+        index: int,
+        statement: _Statement,
+        interpreter: Interpreter,
+        state: ExecutionState,
+        capture: ListSink,
+    ) -> Any:
+        env = state.env
+        inputs = {name: env.get(name, _MISSING) for name in statement.reads | statement.writes}
+        precision = state.precision
+        try:
+            result = interpreter.run(statement.tree, "", self._program.path)
+        finally:
+            output = capture.getvalue()
+            capture.clear()
+            if output:
+                self._output.write(output)
+        self._records[index] = _Record(
+            inputs=inputs,
+            precision=precision,
+            writes={name: env.get(name, _MISSING) for name in statement.writes},
+            precision_after=state.precision,
+            output=output,
+            result=result,
+        )
+        return result
@@ -2,14 +2,32 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from decimal import Decimal, ROUND_FLOOR, ROUND_HALF_UP, getcontext
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 import ast
-import math
+import copy
+from decimal import Decimal
+import functools
+import os
+import re
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
 
 from lark import Lark, Token, Tree
+from lark.exceptions import LarkError
+
+import batch
+from batch import BatchResult
+import bigformat
+import cooperative
+from cooperative import ExecutionCancelled, StepHook
+from functions import BUILTINS, DOMAIN_FLOAT, FunctionRegistry, FunctionSpec
+from memo import CallMemo, MemoStats
+import modules
+from numeric import DecimalBackend, NumericBackend
+from output import OutputSink, stdout_sink
+import tracing
+from tracing import TextTraceSink, TraceEvent, TraceSink
 
 
 class DSLError(Exception):
@@ -95,20 +113,192 @@ class LoopNotFoundError(DSLError):
 class PowerValue:
     """Значение степени для оптимизации модульного возведения в степень.
 
-    Хранит основание, показатель степени и вычисленное значение.
+    Хранит основание, показатель степени и вычисленное значение
+    (числа текущего числового бэкенда).
     Используется для оптимизации выражений вида a**b mod p через pow(a, b, p).
     """
 
-    base: Decimal
-    exponent: Decimal
-    value: Decimal
+    base: Any
+    exponent: Any
+    value: Any
+
+
+def _plain(value: Any) -> Any:
+    """Значение без обёртки PowerValue (для результатов и вывода)."""
+    return value.value if isinstance(value, PowerValue) else value
+
+
+@dataclass
+class _CallSite:
+    """Место вызова функции, разрешённое при компиляции.
+
+    ``bound`` - пара (бэкенд, реализация, привязанная к нему): дерево может
+    выполняться разными интерпретаторами, привязка обновляется при смене
+    бэкенда. ``folded`` - кэш результатов по (бэкенд, точность) для вызова
+    чистой функции с литеральными аргументами, иначе None.
+
+    Кэши не сохраняются при сериализации (pickle): привязка ссылается на
+    бэкенд конкретного интерпретатора.
+    """
+
+    token: Token
+    spec: FunctionSpec
+    args: list
+    folded: Optional[Dict[tuple, Any]] = None
+    bound: Optional[tuple] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        state["bound"] = None
+        if state["folded"] is not None:
+            state["folded"] = {}
+        return state
+
+
+@dataclass
+class ExecutionState:
+    """Изменяемое состояние одного выполнения программы.
+
+    Скомпилированная программа (``program.Program``) не меняется при
+    выполнении; всё, что меняется, хранится здесь. Состояние не
+    разделяется между одновременными выполнениями.
+
+    Attributes:
+        env: Переменные (имя -> значение)
+        backend: Числовой бэкенд; хранит текущую точность
+        loop_stack: Стек переменных активных циклов
+    """
+
+    env: Dict[str, Any] = field(default_factory=dict)
+    backend: NumericBackend = field(default_factory=DecimalBackend)
+    loop_stack: list[str] = field(default_factory=list)
+
+    @property
+    def precision(self) -> int:
+        """Текущая точность вычислений."""
+        return self.backend.precision
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Значение переменной (``pi`` и ``e`` - с текущей точностью) или default."""
+        if name in self.env:
+            return self.env[name]
+        if name in BUILTIN_CONSTANTS:
+            return self.backend.constant(name)
+        return default
+
+    def format(self, value: Any) -> str:
+        """Форматировать значение с текущей точностью."""
+        return self.backend.format(value)
+
+
+# Константы, которые бэкенд вычисляет при обращении с текущей точностью
+BUILTIN_CONSTANTS = ("pi", "e")
+
+
+@dataclass(frozen=True)
+class StatementResult:
+    """Результат оператора верхнего уровня (см. ``Interpreter.execute_iter``).
+
+    Attributes:
+        line: Строка, с которой начинается оператор
+        kind: Вид оператора: ``"assignment"``, ``"print"``, ``"for"``,
+            ``"block"``, ``"precision"``, ``"import"`` или ``"expression"``
+        value: Значение оператора; для присваивания - новое значение
+            переменной, для print и import - None
+    """
+
+    line: int
+    kind: str
+    value: Any
+
+
+# Вид оператора по узлу дерева; остальные узлы - "expression"
+_STATEMENT_KINDS = {
+    "assignment": "assignment",
+    "print_call": "print",
+    "for_expr": "for",
+    "block": "block",
+    "precision_block": "precision",
+    "import_stmt": "import",
+}
+
+# Строки, комментарии и скобки: всё, что влияет на границы операторов
+_CHUNK_TOKEN = re.compile(r'"(?:\\.|[^"\\])*"|#|[()]')
+_TRAILING_ELSE = re.compile(r"\belse\s*$")
+
+
+def _statement_chunks(lines: Iterable[str]) -> Iterator[tuple[str, int]]:
+    """Разбить поток строк на фрагменты из целых операторов верхнего уровня.
+
+    Фрагмент заканчивается на конце строки вне скобок, если строка не
+    заканчивается на ``else`` (после него условное выражение продолжается
+    на следующей строке). Фрагмент может содержать несколько операторов,
+    разделённых ``;``.
+
+    Yields:
+        Текст фрагмента и номер его первой строки
+    """
+    buffer: list[str] = []
+    first = 1
+    depth = 0
+    for number, line in enumerate(lines, start=1):
+        if not buffer:
+            first = number
+        buffer.append(line)
+        code = line
+        for match in _CHUNK_TOKEN.finditer(line):
+            token = match.group()
+            if token == "#":
+                code = line[: match.start()]
+                break
+            if token == "(":
+                depth += 1
+            elif token == ")":
+                depth -= 1
+        if depth <= 0 and not _TRAILING_ELSE.search(code):
+            yield "".join(buffer), first
+            buffer.clear()
+            depth = 0
+    if buffer:
+        yield "".join(buffer), first
+
+
+def _shift_positions(tree: Tree, offset: int) -> None:
+    """Сдвинуть номера строк дерева фрагмента на offset строк."""
+    for node in tree.iter_subtrees():
+        meta = node.meta
+        if not meta.empty:
+            meta.line += offset
+            meta.end_line += offset
+        for child in node.children:
+            if isinstance(child, Token) and child.line is not None:
+                child.line += offset
+                if child.end_line is not None:
+                    child.end_line += offset
+
+
+@functools.lru_cache(maxsize=None)
+def _load_parser() -> Lark:
+    """Построить парсер грамматики DSL (один раз на процесс).
+
+    Парсер не хранит состояния между вызовами parse(), поэтому один
+    экземпляр разделяется всеми интерпретаторами, в том числе из разных потоков.
+    """
+    grammar_path = Path(__file__).with_name("grammar.lark")
+    grammar_text = grammar_path.read_text(encoding="utf-8")
+    return Lark(
+        grammar_text,
+        parser="earley",
+        propagate_positions=True,
+        maybe_placeholders=False,
+    )
 
 
 class Interpreter:
     """Интерпретатор DSL для математических вычислений.
 
     Поддерживает:
-    - Арифметику произвольной точности (Decimal)
+    - Арифметику произвольной точности (Decimal) или другой числовой бэкенд
     - Математические функции (sin, cos, ln, sqrt, nrt и др.)
     - Модульную арифметику с корректной семантикой для отрицательных чисел
     - Циклы for с шагом
@@ -118,38 +308,144 @@ class Interpreter:
     """
 
     def __init__(
-        self, initial_env: Optional[Dict[str, Any]] = None, trace: bool = False
+        self,
+        initial_env: Optional[Dict[str, Any]] = None,
+        trace: bool | TraceSink = False,
+        backend: Optional[NumericBackend] = None,
+        memo_size: int = 0,
+        functions: Optional[FunctionRegistry] = None,
+        state: Optional[ExecutionState] = None,
+        output: Optional[OutputSink] = None,
     ) -> None:
         """Инициализация интерпретатора.
 
         Args:
             initial_env: Начальные значения переменных (словарь имя -> значение)
-            trace: Включить режим трассировки для отладки выполнения
+            trace: Трассировка выполнения: True - текст ``--trace`` в приёмник
+                вывода, приёмник событий (см. модуль ``tracing``) - события
+                в него; False - без трассировки
+            backend: Числовой бэкенд (по умолчанию DecimalBackend с точностью 10).
+                Экземпляр бэкенда хранит точность и не должен разделяться
+                между интерпретаторами.
+            memo_size: Размер кэша результатов чистых встроенных функций
+                (0 - кэш выключен), см. enable_memo()
+            functions: Реестр функций (по умолчанию копия встроенного).
+                Реестр не копируется и может разделяться интерпретаторами.
+            state: Состояние выполнения, с которым работает интерпретатор
+                (по умолчанию новое); несовместимо с backend
+            output: Приёмник вывода print и трассировки (по умолчанию -
+                текущий sys.stdout без буферизации), см. модуль ``output``
         """
-        grammar_path = Path(__file__).with_name("grammar.lark")
-        grammar_text = grammar_path.read_text(encoding="utf-8")
-        self._parser = Lark(
-            grammar_text,
-            parser="earley",
-            propagate_positions=True,
-            maybe_placeholders=False,
-        )
-        self._precision = 10
-        self._env = {
-            "pi": self._round_value(Decimal(str(math.pi))),
-            "e": self._round_value(Decimal(str(math.e))),
-        }
+        if state is None:
+            state = ExecutionState(
+                backend=backend if backend is not None else DecimalBackend()
+            )
+        elif backend is not None:
+            raise ValueError("backend cannot be combined with state")
+        self._parser = _load_parser()
+        self._state = state
+        # Псевдонимы полей состояния (горячий путь вычислителя)
+        self._backend: NumericBackend = state.backend
+        self._env: Dict[str, Any] = state.env
         if initial_env:
             for name, value in initial_env.items():
                 self._env[name] = value
-        self._trace = trace
+        self._out: OutputSink = output if output is not None else stdout_sink()
+        self._tracer: Optional[TraceSink] = None
+        if trace is True:
+            self._tracer = TextTraceSink(self._out)
+        elif trace is not False:
+            self._tracer = trace
         self._source_lines: list[str] = []
-        self._loop_stack: list[str] = []  # стек активных переменных циклов
+        self._loop_stack: list[str] = state.loop_stack  # стек активных переменных циклов
+        self._memo: Optional[CallMemo] = CallMemo(memo_size) if memo_size else None
+        self._functions = functions if functions is not None else BUILTINS.copy()
+        # Вызывается на каждой итерации цикла и операторе верхнего уровня
+        # (кооперативное выполнение, см. execute_async)
+        self._step_hook: Optional[StepHook] = None
+        # Контрольная точка для reset(): переменные, точность и имена,
+        # изменённые после неё (None - учёт выключен)
+        self._checkpoint: Optional[tuple[Dict[str, Any], int]] = None
+        self._touched: Optional[set[str]] = None
+        # Путь выполняемого скрипта (относительно него ищутся модули)
+        # и цепочка импортирующих его модулей (для обнаружения циклов)
+        self._script_path: Optional[Path] = None
+        self._import_chain: tuple[Path, ...] = ()
 
     @property
     def precision(self) -> int:
         """Текущая точность вычислений (количество знаков после запятой)."""
-        return self._precision
+        return self._backend.precision
+
+    @property
+    def backend(self) -> NumericBackend:
+        """Числовой бэкенд интерпретатора."""
+        return self._backend
+
+    @property
+    def state(self) -> ExecutionState:
+        """Состояние выполнения: переменные, бэкенд и стек циклов."""
+        return self._state
+
+    @property
+    def output(self) -> OutputSink:
+        """Приёмник вывода print и трассировки."""
+        return self._out
+
+    @property
+    def functions(self) -> FunctionRegistry:
+        """Реестр функций, доступных программам интерпретатора."""
+        return self._functions
+
+    def register_function(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        arity: int,
+        pure: bool = True,
+        domain: str = DOMAIN_FLOAT,
+    ) -> FunctionSpec:
+        """Зарегистрировать функцию хоста, вызываемую из DSL.
+
+        Регистрация действует на программы, выполняемые после неё.
+
+        Args:
+            name: Имя функции в DSL (может заменить встроенную)
+            func: Реализация ``func(*args)`` на Python или NumPy
+            arity: Число аргументов
+            pure: Функция детерминирована: вызовы можно кэшировать и
+                сворачивать для константных аргументов
+            domain: ``"float"`` - аргументы передаются как float,
+                ``"backend"`` - числами бэкенда
+
+        Returns:
+            Спецификация зарегистрированной функции
+        """
+        return self._functions.register(name, func, arity, pure=pure, domain=domain)
+
+    def enable_memo(self, maxsize: int = 1024) -> None:
+        """Включить кэш результатов чистых функций.
+
+        Результаты встроенных ln, log2, log10, sin, cos, tg, ctg, sqrt, nrt
+        и функций хоста с ``pure=True`` запоминаются по ключу (функция,
+        аргументы, точность); при переполнении вытесняются давно не
+        использованные записи. Повторный вызов сбрасывает кэш.
+
+        Args:
+            maxsize: Наибольшее число записей (больше 0)
+
+        Raises:
+            ValueError: Если ``maxsize`` не положителен
+        """
+        self._memo = CallMemo(maxsize)
+
+    def disable_memo(self) -> None:
+        """Выключить кэш результатов встроенных функций и освободить его."""
+        self._memo = None
+
+    def memo_stats(self) -> Optional[MemoStats]:
+        """Статистика кэша встроенных функций или None, если кэш выключен."""
+        return self._memo.stats() if self._memo is not None else None
 
     def parse(self, text: str) -> Tree:
         """Разобрать исходный код в синтаксическое дерево.
@@ -162,18 +458,368 @@ class Interpreter:
         """
         return self._parser.parse(text)
 
-    def execute(self, text: str) -> Any:
+    def execute(self, text: str, path: Optional[str | Path] = None) -> Any:
         """Выполнить программу на DSL.
 
         Args:
             text: Исходный код программы
+            path: Путь файла программы; ``import`` ищет модули относительно
+                него (по умолчанию - относительно текущего каталога)
+
+        Returns:
+            Результат последнего выражения или None
+        """
+        return self.run(self.compile(text), text, path)
+
+    def execute_iter(
+        self, source: str | Iterable[str], path: Optional[str | Path] = None
+    ) -> Iterator[StatementResult]:
+        """Выполнять программу по операторам верхнего уровня, выдавая их результаты.
+
+        Исходный код разбирается по фрагментам: каждый фрагмент (обычно одна
+        строка) разбирается непосредственно перед выполнением, поэтому первые
+        результаты доступны до разбора остальной программы. Если source -
+        файл или другой итератор строк, в памяти хранится только текущий
+        фрагмент.
+
+        Args:
+            source: Исходный код или итерируемые строки (например, открытый файл)
+            path: Путь файла программы (для ``import``)
+
+        Yields:
+            Результат каждого оператора верхнего уровня после его выполнения
+
+        Raises:
+            DSLError: Ошибка выполнения (результаты предыдущих операторов
+                уже выданы)
+            lark.exceptions.LarkError: Синтаксическая ошибка во фрагменте
+        """
+        lines = source.splitlines(keepends=True) if isinstance(source, str) else source
+        self._script_path = Path(os.path.realpath(path)) if path is not None else None
+        self._source_lines = []
+        for chunk, first in _statement_chunks(lines):
+            if self._tracer is not None:
+                self._source_lines.extend(chunk.splitlines())
+            try:
+                tree = self.parse(chunk)
+            except LarkError:
+                # Повторный разбор со сдвигом - для верных позиций в сообщении
+                self.parse("\n" * (first - 1) + chunk)
+                raise
+            if not isinstance(tree, Tree):
+                continue  # только разделители и комментарии
+            if first > 1:
+                _shift_positions(tree, first - 1)
+            tree = self._compile(tree)
+            statements = tree.children if tree.data == "statement_list" else [tree]
+            for statement in statements:
+                if not isinstance(statement, Tree):
+                    continue
+                if self._tracer is not None:
+                    traced = Tree("traced_statement", [self._instrument(statement)], statement.meta)
+                    try:
+                        value = self._eval(traced)
+                    except DSLError as exc:
+                        self._trace_error(exc)
+                        self._tracer.flush()
+                        raise
+                else:
+                    value = self._eval(statement)
+                kind = _STATEMENT_KINDS.get(statement.data, "expression")
+                if kind == "assignment":
+                    value = self._env.get(statement.children[0])
+                line = statement.meta.line if not statement.meta.empty else first
+                if self._tracer is not None:
+                    self._tracer.flush()
+                self._out.flush()
+                yield StatementResult(line, kind, _plain(value))
+
+    def compile(self, text: str) -> Tree:
+        """Разобрать и подготовить программу для многократного выполнения.
+
+        Дерево можно выполнять через run() этим или другим интерпретатором
+        с тем же реестром функций: имена функций уже разрешены.
+
+        Args:
+            text: Исходный код программы
+
+        Returns:
+            Скомпилированное синтаксическое дерево
+        """
+        return self._compile(self.parse(text))
+
+    def run(self, tree: Tree, text: str = "", path: Optional[str | Path] = None) -> Any:
+        """Выполнить скомпилированную программу в окружении интерпретатора.
+
+        Args:
+            tree: Дерево, полученное из compile()
+            text: Исходный код (для трассировки)
+            path: Путь файла программы (для ``import``)
 
         Returns:
             Результат последнего выражения или None
         """
-        tree = self.parse(text)
+        self._script_path = Path(os.path.realpath(path)) if path is not None else None
         self._source_lines = text.splitlines()
-        return self._eval(tree)
+        if self._tracer is not None:
+            tree = self._instrument(tree)
+        try:
+            return _plain(self._eval_program(tree))
+        except DSLError as exc:
+            self._trace_error(exc)
+            raise
+        finally:
+            if self._tracer is not None:
+                self._tracer.flush()
+            self._out.flush()
+
+    def _compile(self, tree: Tree) -> Tree:
+        """Подготовить дерево к выполнению: вычислить то, что известно статически.
+
+        Заменяет константную точность в ``with precision N (...)`` на
+        готовое целое число, чтобы не вычислять и не проверять её при каждом
+        входе в блок, и разрешает имена функций через реестр: каждое место
+        вызова известной функции превращается в ``resolved_call`` с готовой
+        спецификацией. Вызовы чистых функций с литеральными аргументами
+        вычисляются один раз для каждой точности.
+
+        Args:
+            tree: Синтаксическое дерево после parse()
+
+        Returns:
+            То же дерево (изменяется на месте)
+        """
+        for node in tree.iter_subtrees():
+            if node.data == "precision_block":
+                static = self._static_precision(node.children[0])
+                if static is not None:
+                    node.children[0] = static
+            elif node.data == "func_call":
+                self._resolve_call(node)
+        return tree
+
+    def _resolve_call(self, node: Tree) -> None:
+        """Заменить ``func_call`` известной функции на ``resolved_call``.
+
+        Неизвестные имена остаются как есть: ошибка сообщается при вызове.
+        """
+        token = node.children[0]
+        assert isinstance(token, Token)
+        spec = self._functions.get(token.value)
+        if spec is None:
+            return
+        args = list(node.children[1].children) if len(node.children) > 1 else []
+        literal = all(self._is_number_literal(arg) for arg in args)
+        site = _CallSite(token, spec, args, {} if spec.pure and literal else None)
+        node.data = "resolved_call"
+        node.children = [site]
+
+    @staticmethod
+    def _unwrap_expr(node: Any) -> Any:
+        """Снять обёртки ``conditional_expr`` с единственным потомком."""
+        while isinstance(node, Tree) and node.data == "conditional_expr" and len(node.children) == 1:
+            node = node.children[0]
+        return node
+
+    def _is_number_literal(self, node: Any) -> bool:
+        node = self._unwrap_expr(node)
+        return isinstance(node, Tree) and node.data == "number"
+
+    def _static_precision(self, node: Any) -> Optional[int]:
+        """Вернуть точность, если она задана целым литералом, иначе None."""
+        node = self._unwrap_expr(node)
+        if not (isinstance(node, Tree) and node.data == "number"):
+            return None
+        token = node.children[0]
+        assert isinstance(token, Token)
+        if not token.value.isdigit():
+            return None
+        return int(token.value)
+
+    @classmethod
+    def execute_many(
+        cls,
+        sources: Iterable[str],
+        initial_env: Optional[Dict[str, Any]] = None,
+        max_workers: Optional[int] = None,
+    ) -> list[Any]:
+        """Выполнить несколько программ параллельно в пуле потоков.
+
+        Каждая программа выполняется в собственном интерпретаторе со своим
+        контекстом Decimal, поэтому программы не влияют друг на друга.
+        На сборках CPython без GIL (free-threaded) пропускная способность
+        растёт с числом потоков.
+
+        Args:
+            sources: Исходные коды программ
+            initial_env: Начальные значения переменных для каждой программы
+            max_workers: Число потоков (по умолчанию - как у ThreadPoolExecutor)
+
+        Returns:
+            Результаты программ в порядке исходных текстов
+
+        Raises:
+            DSLError: Первая по порядку ошибка выполнения
+        """
+
+        def run(text: str) -> Any:
+            return cls(initial_env=initial_env).execute(text)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(run, sources))
+
+    async def execute_async(self, text: str, yield_every: int = 1000) -> Any:
+        """Выполнить программу, периодически уступая управление циклу asyncio.
+
+        Программа выполняется порциями по ``yield_every`` шагов (итераций
+        циклов и операторов верхнего уровня); между порциями работают другие
+        корутины. При отмене задачи выполнение прерывается на ближайшем шаге,
+        а переменные, точность и стек циклов восстанавливаются в состояние
+        до вызова.
+
+        Args:
+            text: Исходный код программы
+            yield_every: Число шагов между передачами управления
+
+        Returns:
+            Результат последнего выражения или None
+
+        Raises:
+            asyncio.CancelledError: Задача отменена
+        """
+        return await cooperative.run_sliced(self._stepped(text), yield_every)
+
+    async def execute_in_thread(self, text: str, executor: Optional[Executor] = None) -> Any:
+        """Выполнить программу в потоке, не блокируя цикл asyncio.
+
+        Вариант execute_async для тяжёлых скриптов: цикл событий не ждёт
+        вычислителя, а на free-threaded сборке они работают параллельно.
+        Отмена обрабатывается так же, как в execute_async. Пока программа
+        выполняется, интерпретатор нельзя использовать из других потоков.
+
+        Args:
+            text: Исходный код программы
+            executor: Пул потоков (по умолчанию - временный поток)
+
+        Returns:
+            Результат последнего выражения или None
+
+        Raises:
+            asyncio.CancelledError: Задача отменена
+        """
+        return await cooperative.run_offloaded(self._stepped(text), executor)
+
+    def _stepped(self, text: str) -> Callable[[StepHook], Any]:
+        """Выполнение программы с функцией шага и откатом состояния при отмене."""
+
+        def run(step: StepHook) -> Any:
+            env = dict(self._env)
+            precision = self._backend.precision
+            self._step_hook = step
+            try:
+                return self.execute(text)
+            except ExecutionCancelled:
+                self._env.clear()
+                self._env.update(env)
+                self._backend.precision = precision
+                self._loop_stack.clear()
+                raise
+            finally:
+                self._step_hook = None
+
+        return run
+
+    def evaluate_batch(self, source: str, inputs: Dict[str, Any]) -> BatchResult:
+        """Вычислить программу для каждой строки входных массивов NumPy.
+
+        Программы без циклов, print, управления точностью и функций хоста
+        вычисляются над целыми столбцами (``if/else`` - через ``np.where``)
+        в ``float64`` при точности не больше 15 знаков. Остальные программы
+        выполняются интерпретатором отдельно для каждой строки. Окружение
+        и точность интерпретатора после вызова не меняются.
+
+        Args:
+            source: Исходный код программы
+            inputs: Имя переменной -> одномерный массив значений (все одной длины)
+
+        Returns:
+            BatchResult с результатами по строкам и выбранным путём вычисления
+
+        Raises:
+            ImportError: Если NumPy не установлен
+            ValueError: Если входные массивы некорректны
+            DSLError: Ошибка выполнения программы в одной из строк
+        """
+        np = batch.require_numpy()
+        columns, size = batch.as_columns(np, inputs)
+        tree = self.compile(source)
+        self._source_lines = source.splitlines()
+
+        reason: Optional[str] = None
+        precision = self._backend.precision
+        if self._backend.name != "float" and precision > batch.FLOAT_DIGITS:
+            reason = f"precision {precision} exceeds float64 ({batch.FLOAT_DIGITS} digits)"
+        else:
+            evaluator = batch.VectorEvaluator(
+                np, columns, self._scalar_env(), precision, size,
+                half_up=self._backend.name != "float",
+            )
+            try:
+                values, suspect = evaluator.run(tree)
+            except batch.NotVectorizable as exc:
+                reason = str(exc)
+            else:
+                rows = np.flatnonzero(suspect)
+                for index in rows:
+                    # Пересчёт нужен и без результата: ошибки DSL - как при построчном
+                    value = self._batch_rows(tree, columns, [index])[0]
+                    if values is not None:
+                        values[index] = value
+                if values is None:
+                    values = np.full(size, None, dtype=object)
+                return BatchResult(values, batch.PATH_VECTORIZED, recomputed=len(rows))
+
+        values = np.empty(size, dtype=object)
+        values[:] = self._batch_rows(tree, columns, range(size))
+        return BatchResult(values, batch.PATH_ROWS, reason=reason)
+
+    def _scalar_env(self) -> Dict[str, float]:
+        """Числовые переменные окружения в виде float (для векторизации)."""
+        scalars: Dict[str, float] = {}
+        for name, value in self._env.items():
+            try:
+                scalars[name] = float(self._to_number(value))
+            except (DSLError, TypeError, ValueError):
+                continue
+        return scalars
+
+    def _batch_rows(self, tree: Tree, columns: Dict[str, Any], rows: Iterable[int]) -> list:
+        """Выполнить дерево для строк входных столбцов по одной.
+
+        Каждая строка начинается с исходного окружения и точности.
+        """
+        base_env = self._env
+        precision = self._backend.precision
+        results = []
+        try:
+            for index in rows:
+                self._env = dict(base_env)
+                for name, column in columns.items():
+                    value = self._backend.coerce(column[index].item())
+                    self._env[name] = self._backend.round(value)
+                self._backend.precision = precision
+                try:
+                    results.append(self._eval(tree))
+                except DSLError as exc:
+                    if hasattr(exc, "add_note"):
+                        exc.add_note(f"batch row {index}")
+                    else:  # Python 3.10: заметок у исключений нет
+                        exc.message = f"{exc.message} [batch row {index}]"
+                    raise
+        finally:
+            self._env = base_env
+            self._backend.precision = precision
+        return results
 
     def set_variable(self, name: str, value: Any) -> None:
         """Установить значение переменной в окружении.
@@ -182,8 +828,65 @@ class Interpreter:
             name: Имя переменной
             value: Значение переменной
         """
+        if self._touched is not None:
+            self._touched.add(name)
         self._env[name] = value
 
+    def checkpoint(self) -> None:
+        """Запомнить текущие переменные и точность для reset().
+
+        После вызова интерпретатор учитывает имена переменных, изменённых
+        программами и set_variable(), чтобы reset() работал за время,
+        пропорциональное числу изменённых переменных, а не размеру окружения.
+        """
+        self._checkpoint = (dict(self._env), self._backend.precision)
+        self._touched = set()
+
+    def reset(self) -> int:
+        """Вернуть переменные и точность к последнему checkpoint().
+
+        Изменения окружения в обход интерпретатора (через ``state.env``)
+        не учитываются.
+
+        Returns:
+            Число восстановленных или удалённых переменных
+
+        Raises:
+            RuntimeError: Если checkpoint() не вызывался
+        """
+        if self._checkpoint is None or self._touched is None:
+            raise RuntimeError("reset() requires checkpoint()")
+        base_env, precision = self._checkpoint
+        touched = self._touched
+        for name in touched:
+            if name in base_env:
+                self._env[name] = base_env[name]
+            else:
+                self._env.pop(name, None)
+        count = len(touched)
+        touched.clear()
+        self._backend.precision = precision
+        self._loop_stack.clear()
+        self._source_lines = []
+        self._step_hook = None
+        return count
+
+    def get_variable(self, name: str, default: Any = None) -> Any:
+        """Получить значение переменной окружения.
+
+        Args:
+            name: Имя переменной (``pi`` и ``e`` - с текущей точностью)
+            default: Значение, если переменная не определена
+
+        Returns:
+            Значение переменной или default
+        """
+        if name in self._env:
+            return self._env[name]
+        if name in BUILTIN_CONSTANTS:
+            return self._backend.constant(name)
+        return default
+
     def format_value(self, value: Any) -> str:
         """Форматировать значение в строку с учётом текущей точности.
 
@@ -195,6 +898,28 @@ class Interpreter:
         """
         return self._format_value(value)
 
+    def write_value(self, value: Any, radix: str = "dec") -> None:
+        """Записать значение с переводом строки в приёмник вывода.
+
+        Большие числа записываются частями (``bigformat.format_chunks``) без
+        построения всей строки в памяти. В системах ``hex`` и ``bin``
+        выводятся целые значения ``DecimalBackend``; остальные значения -
+        в десятичной записи.
+
+        Args:
+            value: Значение для вывода
+            radix: Система счисления: ``"dec"``, ``"hex"`` или ``"bin"``
+
+        Raises:
+            ValueError: Неизвестная система счисления
+        """
+        if radix not in bigformat.RADIXES:
+            raise ValueError(f"Unknown radix: {radix}")
+        for chunk in self._value_chunks(value, radix):
+            self._out.write(chunk)
+        self._out.write("\n")
+        self._out.flush()
+
     def _eval(self, node: Any) -> Any:
         """Вычислить узел синтаксического дерева.
 
@@ -211,7 +936,7 @@ class Interpreter:
             return method(node)  # pylint: disable=not-callable
         if isinstance(node, Token):
             if node.type == "NUMBER":
-                return self._to_decimal(node.value)
+                return self._backend.parse_literal(node.value)
             if node.type == "NAME":
                 return self._get_var(node)
             if node.type == "STRING":
@@ -219,6 +944,29 @@ class Interpreter:
             return node.value
         return node
 
+    def _eval_program(self, tree: Any) -> Any:
+        """Выполнить дерево программы, вызывая функцию шага перед каждым
+        оператором верхнего уровня.
+
+        ``?start`` и ``?statement_list`` грамматики встраиваются, поэтому
+        операторы верхнего уровня - это дети корневого ``statement_list``
+        (или сам корень, если оператор один).
+        """
+        if self._step_hook is None:
+            return self._eval(tree)
+        if not (isinstance(tree, Tree) and tree.data == "statement_list"):
+            self._step_hook()
+            return self._eval(tree)
+        result = None
+        for child in tree.children:
+            if isinstance(child, Token) and child.type == "SEP":
+                continue
+            if isinstance(child, Tree) and child.data == "sep":
+                continue
+            self._step_hook()
+            result = self._eval(child)
+        return result
+
     def _eval_start(self, node: Tree) -> Any:
         result = None
         for child in node.children:
@@ -226,9 +974,6 @@ class Interpreter:
                 continue
             if isinstance(child, Tree) and child.data in {"sep", "seps"}:
                 continue
-            # Trace top-level statements (when not already traced via _eval_statement)
-            if self._trace and isinstance(child, Tree) and child.data == "statement":
-                pass  # Will be traced in _eval_statement
             result = self._eval(child)
         return result
 
@@ -239,37 +984,7 @@ class Interpreter:
                 continue
             if isinstance(child, Tree) and child.data == "sep":
                 continue
-
-            # Trace statement before execution
-            if self._trace and isinstance(child, Tree):
-                self._trace_statement(child)
-
             result = self._eval(child)
-
-            # Trace statement output after execution
-            if self._trace and isinstance(child, Tree):
-                if child.data == "assignment":
-                    # Check if assignment is for a for_expr (RHS is for loop)
-                    rhs = child.children[2] if len(child.children) > 2 else None
-                    is_for_assignment = isinstance(rhs, Tree) and rhs.data == "for_expr"
-                    if not is_for_assignment:
-                        # Regular assignment: print '+ var = value'
-                        name_tok = child.children[0]
-                        assert isinstance(name_tok, Token)
-                        print(
-                            f"+ {name_tok.value} = {self._format_value(self._env[name_tok.value])}"
-                        )
-                    else:
-                        # For-assignment: only print after the loop completes
-                        name_tok = child.children[0]
-                        assert isinstance(name_tok, Token)
-                        print(
-                            f"+ {name_tok.value} = {self._format_value(self._env[name_tok.value])}"
-                        )
-                elif child.data not in {"print_call", "for_expr"}:
-                    # Expression (not print, not for): print '+ value'
-                    if result is not None:
-                        print(f"+ {self._format_value(result)}")
         return result
 
     def _eval_statement(self, node: Tree) -> Any:
@@ -301,27 +1016,22 @@ class Interpreter:
                 column=name_token.column,
             )
 
+        if self._touched is not None:
+            self._touched.add(name_token.value)
         if op == "=":
             self._env[name_token.value] = value
             return None
 
-        if name_token.value not in self._env:
-            raise VariableNotFoundError(
-                f"Variable not found: {name_token.value}",
-                line=name_token.line,
-                column=name_token.column,
-            )
-
-        current = self._env[name_token.value]
+        current = self._get_var(name_token)
         if op == "+=":
-            self._env[name_token.value] = self._round_value(
-                self._ensure_numeric(current, "compound assignment") + 
-                self._ensure_numeric(value, "compound assignment")
+            self._env[name_token.value] = self._backend.add(
+                self._ensure_numeric(current, "compound assignment"),
+                self._ensure_numeric(value, "compound assignment"),
             )
         elif op == "-=":
-            self._env[name_token.value] = self._round_value(
-                self._ensure_numeric(current, "compound assignment") - 
-                self._ensure_numeric(value, "compound assignment")
+            self._env[name_token.value] = self._backend.sub(
+                self._ensure_numeric(current, "compound assignment"),
+                self._ensure_numeric(value, "compound assignment"),
             )
         elif op == "/=":
             self._env[name_token.value] = self._div(
@@ -378,6 +1088,65 @@ class Interpreter:
         if self._loop_stack and self._loop_stack[-1] == var:
             self._loop_stack.pop()
 
+    def _eval_import_stmt(self, node: Tree) -> None:
+        """Выполнить ``import "lib.clc"``: скопировать экспорт модуля в окружение.
+
+        Модуль выполняется один раз на процесс для каждой точности (см.
+        ``modules``); путь ищется относительно импортирующего скрипта.
+
+        Raises:
+            DSLError: Модуль не найден, содержит ошибку или импорт циклический
+        """
+        token = node.children[0]
+        assert isinstance(token, Token)
+        name = ast.literal_eval(token.value)
+        path = modules.resolve(name, self._script_path)
+        chain = self._import_chain + ((self._script_path,) if self._script_path else ())
+        if path in chain:
+            cycle = " -> ".join(item.name for item in (*chain[chain.index(path):], path))
+            raise DSLError(f"Import cycle: {cycle}", line=token.line, column=token.column)
+        try:
+            exports = modules.MODULES.load(
+                path,
+                self._backend.name,
+                self._backend.precision,
+                self._functions.version,
+                self._module_runner(chain),
+            )
+        except OSError as exc:
+            raise DSLError(
+                f"Cannot import {name}: {exc.strerror or exc}", line=token.line, column=token.column
+            ) from exc
+        except DSLError as exc:
+            where = f" at line {exc.line}" if exc.line is not None else ""
+            raise DSLError(
+                f"Error in module {name}{where}: {exc.message}",
+                line=token.line,
+                column=token.column,
+            ) from exc
+        except LarkError as exc:
+            raise DSLError(
+                f"Syntax error in module {name}: {str(exc).splitlines()[0]}",
+                line=token.line,
+                column=token.column,
+            ) from exc
+        if self._touched is not None:
+            self._touched.update(exports)
+        self._env.update(exports)
+
+    def _module_runner(self, chain: tuple[Path, ...]) -> modules.ModuleRunner:
+        """Выполнение модуля в отдельном интерпретаторе с той же точностью."""
+
+        def run(source: str, path: Path) -> Dict[str, Any]:
+            module = Interpreter(
+                backend=copy.copy(self._backend), functions=self._functions, output=self._out
+            )
+            module._import_chain = chain  # pylint: disable=protected-access
+            module.execute(source, path)
+            return module._env  # pylint: disable=protected-access
+
+        return run
+
     def _eval_break_stmt(self, node: Tree) -> None:
         """Обработка break конструкции.
 
@@ -502,7 +1271,7 @@ class Interpreter:
             start = self._ensure_numeric(self._eval(node.children[1]), "for loop start")
             end = self._ensure_numeric(self._eval(node.children[2]), "for loop end")
             block = node.children[-1]
-            step = Decimal(1)
+            step = self._backend.coerce(1)
             if len(node.children) == 5:
                 step = self._ensure_numeric(self._eval(node.children[3]), "for loop step")
 
@@ -513,10 +1282,12 @@ class Interpreter:
 
             existed_before = var_name in self._env
             original_value: Any = self._env.get(var_name)
-            self._env[var_name] = self._round_value(start)
+            if self._touched is not None:
+                self._touched.add(var_name)
+            self._env[var_name] = self._backend.round(start)
 
             last_result = None
-            last_valid_value: Optional[Decimal] = None
+            last_valid_value: Any = None
             iterations = 0
 
             if step > 0:
@@ -524,39 +1295,21 @@ class Interpreter:
             else:
                 condition = lambda i: i >= end # pylint: disable=unnecessary-lambda-assignment
 
-            while condition(self._to_decimal(self._env[var_name])):
-                # Trace loop iteration entry
-                if self._trace and iterations == 0:
-                    # First iteration: print loop header with actual values
-                    source = self._get_source_line(node.meta.line)
-                    step_str = (
-                        f" by {self._format_value(step)}" if len(node.children) == 5 else ""
-                    )
-                    print(
-                        f"- {node.meta.line}: for {var_name} in "
-                        f"{self._format_value(start)} .. {self._format_value(end)}{step_str}"
-                    )
-                    print(
-                        f"+ {var_name} = {self._format_value(self._env[var_name])}"
-                    )
-                elif self._trace:
-                    # Subsequent iterations: just print updated loop variable
-                    print(
-                        f"+ {var_name} = {self._format_value(self._env[var_name])}"
-                    )
-
+            while condition(self._to_number(self._env[var_name])):
+                if self._step_hook is not None:
+                    self._step_hook()
                 try:
                     # Выполнить тело цикла
                     last_result = self._eval(block)
                     iterations += 1
-                    last_valid_value = self._to_decimal(self._env[var_name])
+                    last_valid_value = self._to_number(self._env[var_name])
                     
                 except NextException as ne:
                     # Проверить, что это next для нашего цикла
                     if ne.loop_var == var_name:
                         # Next для текущего цикла - переходим к следующей итерации
                         iterations += 1
-                        last_valid_value = self._to_decimal(self._env[var_name])
+                        last_valid_value = self._to_number(self._env[var_name])
                         # Продолжаем выполнение (обновляем переменную цикла ниже)
                     else:
                         # Next для внешнего цикла - пробрасываем исключение дальше
@@ -568,15 +1321,15 @@ class Interpreter:
                         # Break для текущего цикла - выходим с результатом
                         last_result = be.result
                         iterations += 1
-                        last_valid_value = self._to_decimal(self._env[var_name])
+                        last_valid_value = self._to_number(self._env[var_name])
                         break
                     else:
                         # Break для внешнего цикла - пробрасываем исключение дальше
                         raise
                 
                 # Обновить переменную цикла для следующей итерации
-                self._env[var_name] = self._round_value(
-                    self._to_decimal(self._env[var_name]) + step
+                self._env[var_name] = self._backend.add(
+                    self._to_number(self._env[var_name]), step
                 )
 
             # Восстановить или удалить переменную цикла согласно семантике
@@ -608,6 +1361,49 @@ class Interpreter:
             result = self._eval(child)
         return result
 
+    def _eval_precision_block(self, node: Tree) -> Any:
+        """Выполнить блок ``with precision N (...)`` с временной точностью.
+
+        Точность N действует только внутри блока (в том числе при выходе
+        через break/next или ошибку) и затем восстанавливается. Результат
+        блока округляется до внешней точности. Точность больше
+        ``max_precision`` бэкенда - ошибка DSL.
+
+        Args:
+            node: Узел precision_block; первый потомок - выражение точности
+                или уже вычисленное при компиляции целое число
+
+        Returns:
+            Результат последнего выражения блока
+        """
+        precision = node.children[0]
+        if not isinstance(precision, int):
+            value = self._ensure_numeric(self._eval(precision), "precision block")
+            if not self._backend.is_int(value) or value < 0:
+                raise DSLError(
+                    "precision block expects integer >= 0",
+                    line=node.meta.line,
+                    column=node.meta.column,
+                )
+            precision = self._backend.to_int(value)
+        if precision > self._backend.max_precision:
+            raise DSLError(
+                f"precision block expects integer <= {self._backend.max_precision}",
+                line=node.meta.line,
+                column=node.meta.column,
+            )
+
+        outer_precision = self._backend.precision
+        self._backend.precision = precision
+        try:
+            result = self._eval(node.children[1])
+        finally:
+            self._backend.precision = outer_precision
+
+        if result is None or isinstance(result, bool):
+            return result
+        return self._backend.round(self._to_number(result))
+
     def _eval_print_call(self, node: Tree) -> None:
         """Выполнить вызов print() для вывода значений и строк.
 
@@ -622,8 +1418,15 @@ class Interpreter:
             print_args_node = node.children[0]
             assert isinstance(print_args_node, Tree)
             args = list(self._eval_print_args(print_args_node))
-        printable = [self._format_value(arg) for arg in args]
-        print(" ".join(printable))
+        if not any(self._is_large(arg) for arg in args):
+            self._out.write(" ".join(self._format_value(arg) for arg in args) + "\n")
+            return None
+        for index, arg in enumerate(args):
+            if index:
+                self._out.write(" ")
+            for chunk in self._value_chunks(arg):
+                self._out.write(chunk)
+        self._out.write("\n")
         return None
 
     def _eval_print_args(self, node: Tree) -> Iterable[Any]:
@@ -649,9 +1452,9 @@ class Interpreter:
             right = self._eval(node.children[idx + 1])
             right = self._ensure_numeric(right, "arithmetic operation (sum)")
             if op_token.value == "+":
-                value = self._round_value(value + right)
+                value = self._backend.add(value, right)
             else:
-                value = self._round_value(value - right)
+                value = self._backend.sub(value, right)
             idx += 2
         return value
 
@@ -665,7 +1468,7 @@ class Interpreter:
             right = self._eval(node.children[idx + 1])
             right = self._ensure_numeric(right, "arithmetic operation (product)")
             if op_token.value == "*":
-                left = self._round_value(left * right)
+                left = self._backend.mul(left, right)
             elif op_token.value == "/":
                 left = self._div(left, right, node.meta)
             else:
@@ -690,11 +1493,12 @@ class Interpreter:
         if isinstance(left, PowerValue):
             base = left.base
             exp = left.exponent
-            modulus = self._to_decimal(right)
-            if self._is_int(base) and self._is_int(exp) and self._is_int(modulus):
+            modulus = self._to_number(right)
+            is_int = self._backend.is_int
+            if is_int(base) and is_int(exp) and is_int(modulus):
                 return self._mod_pow(base, exp, modulus, meta)
-            return self._mod(left.value, self._to_decimal(right), meta)
-        return self._mod(self._to_decimal(left), self._to_decimal(right), meta)
+            return self._mod(left.value, self._to_number(right), meta)
+        return self._mod(self._to_number(left), self._to_number(right), meta)
 
     def _eval_power(self, node: Tree) -> Any:
         base = self._eval(node.children[0])
@@ -715,7 +1519,7 @@ class Interpreter:
         value = self._ensure_numeric(value, "unary operation")
         if op_token.value == "+":
             return value
-        return self._round_value(-value)
+        return self._backend.neg(value)
 
     def _eval_atom(self, node: Tree) -> Any:
         return self._eval(node.children[0])
@@ -723,15 +1527,33 @@ class Interpreter:
     def _eval_number(self, node: Tree) -> Any:
         token = node.children[0]
         assert isinstance(token, Token)
-        value = self._to_decimal(token.value)
+        value = self._backend.parse_literal(token.value)
         # Apply current precision to the number
-        return self._round_value(value)
+        return self._backend.round(value)
 
     def _eval_var(self, node: Tree) -> Any:
         token = node.children[0]
         assert isinstance(token, Token)
         return self._get_var(token)
 
+    def _eval_resolved_call(self, node: Tree) -> Any:
+        site = node.children[0]
+        assert isinstance(site, _CallSite)
+        bound = site.bound
+        if bound is None or bound[0] is not self._backend:
+            bound = (self._backend, site.spec.bind(self._backend))
+            site.bound = bound
+        if site.folded is None:
+            return self._invoke(
+                site.spec, bound[1], [self._eval(arg) for arg in site.args], site.token
+            )
+        key = (self._backend.name, self._backend.precision)
+        if key not in site.folded:
+            site.folded[key] = self._invoke(
+                site.spec, bound[1], [self._eval(arg) for arg in site.args], site.token
+            )
+        return site.folded[key]
+
     def _eval_func_call(self, node: Tree) -> Any:
         name_token = node.children[0]
         assert isinstance(name_token, Token)
@@ -746,22 +1568,25 @@ class Interpreter:
         return [self._eval(child) for child in node.children]
 
     def _get_var(self, token: Token) -> Any:
-        if token.value not in self._env:
-            raise VariableNotFoundError(
-                f"Variable not found: {token.value}",
-                line=token.line,
-                column=token.column,
-            )
-        return self._env[token.value]
+        """Значение переменной; ``pi`` и ``e`` вычисляются при обращении.
+
+        Встроенные константы не хранятся в окружении: они берутся у бэкенда
+        с текущей точностью, пока не переопределены присваиванием.
+        """
+        if token.value in self._env:
+            return self._env[token.value]
+        if token.value in BUILTIN_CONSTANTS:
+            return self._backend.constant(token.value)
+        raise VariableNotFoundError(
+            f"Variable not found: {token.value}",
+            line=token.line,
+            column=token.column,
+        )
 
     def _call_function(self, token: Token, args: Iterable[Any]) -> Any:
-        """Вызвать встроенную функцию по имени.
+        """Вызвать функцию по имени через реестр функций.
 
-        Поддерживаемые функции:
-        - Управление точностью: set_precision, get_precision
-        - Логарифмы: ln, log2, log10
-        - Тригонометрия: sin, cos, tg, ctg
-        - Корни: sqrt, nrt
+        Используется для мест вызова, не разрешённых при компиляции.
 
         Args:
             token: Токен с именем функции
@@ -770,153 +1595,80 @@ class Interpreter:
         Returns:
             Результат вызова функции
         """
-        name = token.value
-        if name == "set_precision":
-            return self._set_precision(args, token)
-        if name == "get_precision":
-            return self._round_value(Decimal(self._precision))
-
-        if name == "ln":
-            return self._apply_math_1(math.log, args, token)
-        if name == "log2":
-            return self._apply_math_1(math.log2, args, token)
-        if name == "log10":
-            return self._apply_math_1(math.log10, args, token)
-        if name == "sin":
-            return self._apply_math_1(math.sin, args, token)
-        if name == "cos":
-            return self._apply_math_1(math.cos, args, token)
-        if name == "tg":
-            return self._apply_math_1(math.tan, args, token)
-        if name == "ctg":
-            return self._apply_ctg(args, token)
-        if name == "sqrt":
-            return self._apply_sqrt(args, token)
-        if name == "nrt":
-            return self._apply_nrt(args, token)
-
-        raise DSLError(
-            f"Unknown function: {name}", line=token.line, column=token.column
-        )
+        spec = self._functions.get(token.value)
+        if spec is None:
+            raise DSLError(
+                f"Unknown function: {token.value}", line=token.line, column=token.column
+            )
+        return self._invoke(spec, spec.bind(self._backend), list(args), token)
 
-    def _set_precision(self, args: Iterable[Any], token: Token) -> Any:
-        """Установить точность вычислений (количество знаков после запятой).
+    def _invoke(
+        self, spec: FunctionSpec, func: Callable[..., Any], args: list, token: Token
+    ) -> Any:
+        """Проверить аргументы и вызвать функцию (через кэш, если она чистая).
 
         Args:
-            args: Список из одного аргумента - новая точность (целое >= 0)
-            token: Токен для позиции ошибки
+            spec: Спецификация функции
+            func: Реализация, привязанная к бэкенду
+            args: Вычисленные аргументы
+            token: Токен имени функции для позиции ошибки
 
         Returns:
-            Старое значение точности (до изменения)
+            Результат вызова функции
         """
-        args_list = list(args)
-        if len(args_list) != 1:
-            raise DSLError(
-                "set_precision expects 1 argument", line=token.line, column=token.column
-            )
-        value = self._to_decimal(args_list[0])
-        if not self._is_int(value) or value < 0:
+        if len(args) != spec.arity:
+            plural = "" if spec.arity == 1 else "s"
             raise DSLError(
-                "set_precision expects integer >= 0",
+                f"{spec.name} expects {spec.arity} argument{plural}",
                 line=token.line,
                 column=token.column,
             )
-        old_precision = self._precision
-        self._precision = int(value)
-        
-        # Обновить контекст Decimal чтобы поддерживать требуемую точность
-        # Нужно установить prec больше чем количество десятичных знаков
-        # Добавляем запас для целой части и промежуточных вычислений
-        ctx = getcontext()
-        ctx.prec = max(28, self._precision + 10)  # минимум 28, или precision + запас
-        
-        return Decimal(old_precision)
+        values = tuple([self._to_number(arg) for arg in args])
+        if self._memo is None or not spec.pure:
+            return self._numeric_call(func, values, token.line, token.column)
+        # Спецификация, а не имя: после замены функции старые результаты не подходят
+        key = (spec, values, self._backend.precision)
+        return self._memo.call(
+            key, self._numeric_call, (func, values, token.line, token.column)
+        )
 
-    def _apply_math_1(self, func: Any, args: Iterable[Any], token: Token) -> Any:
-        args_list = list(args)
-        if len(args_list) != 1:
-            raise DSLError(
-                f"{token.value} expects 1 argument",
-                line=token.line,
-                column=token.column,
-            )
-        value = float(self._to_decimal(args_list[0]))
-        try:
-            result = func(value)
-        except ValueError as exc:
-            raise DSLError(str(exc), line=token.line, column=token.column) from exc
-        return self._round_value(Decimal(str(result)))
+    def _numeric_call(
+        self, func: Callable[..., Any], args: tuple, line: Optional[int], column: Optional[int]
+    ) -> Any:
+        """Вызвать операцию бэкенда, превращая её исключения в DSLError.
 
-    def _apply_ctg(self, args: Iterable[Any], token: Token) -> Any:
-        args_list = list(args)
-        if len(args_list) != 1:
-            raise DSLError(
-                "ctg expects 1 argument", line=token.line, column=token.column
-            )
-        value = float(self._to_decimal(args_list[0]))
-        tan_value = math.tan(value)
-        if tan_value == 0:
-            raise DivisionByZeroError(
-                "ctg division by zero", line=token.line, column=token.column
-            )
-        return self._round_value(Decimal(str(1 / tan_value)))
+        Args:
+            func: Метод числового бэкенда
+            args: Аргументы операции
+            line: Строка для позиции ошибки
+            column: Столбец для позиции ошибки
 
-    def _apply_sqrt(self, args: Iterable[Any], token: Token) -> Any:
-        args_list = list(args)
-        if len(args_list) != 1:
-            raise DSLError(
-                "sqrt expects 1 argument", line=token.line, column=token.column
-            )
-        value = self._to_decimal(args_list[0])
-        if value < 0:
-            raise DSLError("sqrt domain error", line=token.line, column=token.column)
-        return self._round_value(Decimal(str(math.sqrt(float(value)))))
-
-    def _apply_nrt(self, args: Iterable[Any], token: Token) -> Any:
-        args_list = list(args)
-        if len(args_list) != 2:
-            raise DSLError(
-                "nrt expects 2 arguments", line=token.line, column=token.column
-            )
-        x = self._to_decimal(args_list[0])
-        n = self._to_decimal(args_list[1])
-        if n == 0:
-            raise DivisionByZeroError(
-                "nrt division by zero", line=token.line, column=token.column
-            )
-        if self._is_int(n) and int(n) % 2 == 0 and x < 0:
-            raise DSLError("nrt domain error", line=token.line, column=token.column)
-        result = Decimal(str(float(x) ** (1.0 / float(n))))
-        return self._round_value(result)
+        Returns:
+            Результат операции
 
-    def _pow(self, base: Decimal, exponent: Decimal, meta: Any) -> Decimal:
-        if self._is_int(exponent):
-            try:
-                return self._round_value(base ** int(exponent))
-            except (OverflowError, ValueError) as exc:
-                raise DSLError(str(exc), line=meta.line, column=meta.column) from exc
-        result = Decimal(str(float(base) ** float(exponent)))
-        return self._round_value(result)
-
-    def _mod_pow(
-        self, base: Decimal, exponent: Decimal, modulus: Decimal, meta: Any
-    ) -> Decimal:
-        if modulus == 0:
-            raise DivisionByZeroError(
-                "mod division by zero", line=meta.line, column=meta.column
-            )
-        return self._round_value(
-            Decimal(pow(int(base), int(exponent), int(abs(modulus))))
+        Raises:
+            DivisionByZeroError: Если бэкенд сообщил о делении на ноль
+            DSLError: Если бэкенд сообщил об ошибке области определения
+        """
+        try:
+            return func(*args)
+        except ZeroDivisionError as exc:
+            raise DivisionByZeroError(str(exc), line=line, column=column) from exc
+        except (ValueError, OverflowError) as exc:
+            raise DSLError(str(exc), line=line, column=column) from exc
+
+    def _pow(self, base: Any, exponent: Any, meta: Any) -> Any:
+        return self._numeric_call(self._backend.pow, (base, exponent), meta.line, meta.column)
+
+    def _mod_pow(self, base: Any, exponent: Any, modulus: Any, meta: Any) -> Any:
+        return self._numeric_call(
+            self._backend.mod_pow, (base, exponent, modulus), meta.line, meta.column
         )
 
-    def _div(self, left: Decimal, right: Decimal, meta: Any) -> Decimal:
-        if right == 0:
-            raise DivisionByZeroError(
-                "division by zero", line=meta.line, column=meta.column
-            )
-        return self._round_value(left / right)
+    def _div(self, left: Any, right: Any, meta: Any) -> Any:
+        return self._numeric_call(self._backend.div, (left, right), meta.line, meta.column)
 
-    def _mod(self, left: Decimal, right: Decimal, meta: Any) -> Decimal:
+    def _mod(self, left: Any, right: Any, meta: Any) -> Any:
         """Вычислить модуль с математической семантикой (неотрицательный остаток).
 
         Формула: result = left - floor(left / |right|) * |right|
@@ -934,54 +1686,26 @@ class Interpreter:
         Returns:
             Неотрицательный остаток от деления
         """
-        if right == 0:
-            raise DivisionByZeroError(
-                "mod division by zero", line=meta.line, column=meta.column
-            )
-        modulus = abs(right)
-        quotient = (left / modulus).to_integral_value(rounding=ROUND_FLOOR)
-        result = left - (quotient * modulus)
-        return self._round_value(result)
+        return self._numeric_call(self._backend.mod, (left, right), meta.line, meta.column)
 
-    def _to_decimal(self, value: Any) -> Decimal:
-        """Преобразовать значение в Decimal.
+    def _to_number(self, value: Any) -> Any:
+        """Преобразовать значение в число текущего бэкенда.
 
         Args:
-            value: Значение для преобразования (Decimal, int, float, str, PowerValue)
+            value: Значение для преобразования (число бэкенда, int, float, str, PowerValue)
 
         Returns:
-            Значение типа Decimal
+            Число бэкенда
 
         Raises:
             DSLError: Если тип значения не поддерживается
         """
         if isinstance(value, PowerValue):
             return value.value
-        if isinstance(value, Decimal):
-            return value
-        if isinstance(value, (int, float)):
-            return Decimal(str(value))
-        if isinstance(value, str):
-            return Decimal(value)
-        raise DSLError(f"Expected numeric value, got {type(value).__name__}")
-
-    def _is_int(self, value: Decimal) -> bool:
-        """Проверить, является ли Decimal целым числом."""
-        return value == value.to_integral_value()
-
-    def _round_value(self, value: Decimal) -> Decimal:
-        """Округлить значение до текущей точности.
-
-        Использует ROUND_HALF_UP (математическое округление).
-
-        Args:
-            value: Значение для округления
-
-        Returns:
-            Округлённое значение
-        """
-        quant = Decimal(1).scaleb(-self._precision)
-        return value.quantize(quant, rounding=ROUND_HALF_UP)
+        try:
+            return self._backend.coerce(value)
+        except TypeError as exc:
+            raise DSLError(str(exc)) from exc
 
     def _format_value(self, value: Any) -> str:
         """Форматировать значение в строку с текущей точностью.
@@ -994,18 +1718,32 @@ class Interpreter:
         Returns:
             Строковое представление
         """
-        if isinstance(value, Decimal):
-            quant = Decimal(1).scaleb(-self._precision)
-            fixed = value.quantize(quant, rounding=ROUND_HALF_UP)
-            return format(fixed, f".{self._precision}f")
-        return str(value)
+        return self._backend.format(_plain(value))
+
+    @staticmethod
+    def _is_large(value: Any) -> bool:
+        """Число настолько длинное, что его запись выводится частями."""
+        value = _plain(value)
+        return (
+            isinstance(value, Decimal)
+            and value.is_finite()
+            and value.adjusted() >= bigformat.CHUNK_DIGITS
+        )
+
+    def _value_chunks(self, value: Any, radix: str = "dec") -> Iterable[str]:
+        """Запись значения частями (одной частью для небольших значений)."""
+        value = _plain(value)
+        if isinstance(value, Decimal) and value.is_finite():
+            if radix != "dec" or value.adjusted() >= bigformat.CHUNK_DIGITS:
+                return bigformat.format_chunks(value, self._backend.precision, radix)
+        return (self._format_value(value),)
 
-    def _unwrap_value(self, value: Any) -> Decimal:
+    def _unwrap_value(self, value: Any) -> Any:
         if isinstance(value, PowerValue):
             return value.value
-        return self._to_decimal(value)
+        return self._to_number(value)
 
-    def _ensure_numeric(self, value: Any, context: str = "operation") -> Decimal:
+    def _ensure_numeric(self, value: Any, context: str = "operation") -> Any:
         """Убедиться, что значение - число, не булевское.
 
         Args:
@@ -1013,7 +1751,7 @@ class Interpreter:
             context: Описание контекста (для сообщения об ошибке)
 
         Returns:
-            Числовое значение (Decimal)
+            Числовое значение бэкенда
 
         Raises:
             BooleanError: Если значение - булевское
@@ -1022,7 +1760,7 @@ class Interpreter:
             raise BooleanError(
                 f"Cannot use boolean value in {context}"
             )
-        return self._to_decimal(value)
+        return self._to_number(value)
 
     def _eval_conditional_expr(self, node: Tree) -> Any:
         """Выполнить условное выражение: or_expr if or_expr else conditional_expr.
@@ -1186,8 +1924,8 @@ class Interpreter:
         
         return result
 
-    def _compare(self, left: Decimal, op: str, right: Decimal) -> bool:
-        """Выполнить операцию сравнения.
+    def _compare(self, left: Any, op: str, right: Any) -> bool:
+        """Выполнить операцию сравнения через числовой бэкенд.
 
         Args:
             left: Левый операнд
@@ -1197,19 +1935,10 @@ class Interpreter:
         Returns:
             Результат сравнения
         """
-        if op == "==":
-            return left == right
-        if op == "!=":
-            return left != right
-        if op == "<":
-            return left < right
-        if op == "<=":
-            return left <= right
-        if op == ">":
-            return left > right
-        if op == ">=":
-            return left >= right
-        raise DSLError(f"Unknown comparison operator: {op}")
+        try:
+            return self._backend.compare(left, op, right)
+        except ValueError as exc:
+            raise DSLError(str(exc)) from exc
 
     def _get_source_line(self, line_num: int) -> str:
         """Получить строку исходного кода по номеру (нумерация с 1).
@@ -1224,18 +1953,105 @@ class Interpreter:
             return self._source_lines[line_num - 1].strip()
         return ""
 
-    def _trace_statement(self, node: Tree, prefix: str = "-") -> None:
-        """Напечатать трассировочную строку для отладки.
+    def _instrument(self, node: Any) -> Any:
+        """Копия дерева для трассируемого выполнения.
 
-        Формат: '- номер_строки: текст_инструкции'
-        Работает только если режим трассировки включён.
+        Операторы списков операторов, циклы, тела циклов и break/next
+        оборачиваются узлами ``traced_*``, которые сообщают о себе
+        приёмнику трассировки. Исходное дерево не изменяется.
 
         Args:
-            node: Узел дерева для трассировки
-            prefix: Префикс строки трассировки (по умолчанию '-')
+            node: Скомпилированное дерево или его узел
+
+        Returns:
+            Инструментированная копия (токены и значения - как есть)
         """
-        if not self._trace:
-            return
-        if hasattr(node, "meta") and node.meta.line:
-            source = self._get_source_line(node.meta.line)
-            print(f"{prefix} {node.meta.line}: {source}")
+        if not isinstance(node, Tree):
+            return node
+        if node.data == "resolved_call":
+            site = node.children[0]
+            args = [self._instrument(arg) for arg in site.args]
+            return Tree(node.data, [replace(site, args=args)], node.meta)
+        children = [self._instrument(child) for child in node.children]
+        if node.data == "statement_list":
+            children = [
+                Tree("traced_statement", [child], child.meta)
+                if isinstance(child, Tree) and child.data not in {"sep", "seps"}
+                else child
+                for child in children
+            ]
+        elif node.data == "for_expr":
+            children[-1] = Tree("traced_iteration", [children[0], children[-1]], node.meta)
+            return Tree("traced_for_expr", children, node.meta)
+        elif node.data in {"break_stmt", "next_stmt"}:
+            return Tree("traced_jump", [Tree(node.data, children, node.meta)], node.meta)
+        return Tree(node.data, children, node.meta)
+
+    def _trace_error(self, exc: DSLError) -> None:
+        """Сообщить приёмнику трассировки об ошибке, завершившей программу."""
+        if self._tracer is not None:
+            self._tracer.emit(TraceEvent(tracing.ERROR, exc.line or 0, value=str(exc)))
+
+    def _eval_traced_statement(self, node: Tree) -> Any:
+        tracer = self._tracer
+        assert tracer is not None
+        statement = node.children[0]
+        line = getattr(statement.meta, "line", 0)
+        if line:
+            tracer.emit(TraceEvent(tracing.STATEMENT, line, text=self._get_source_line(line)))
+        result = self._eval(statement)
+        if statement.data == "assignment":
+            name = statement.children[0].value
+            tracer.emit(TraceEvent(tracing.ASSIGN, line, name, self._format_value(self._env[name])))
+        elif statement.data not in {"print_call", "traced_for_expr"} and result is not None:
+            tracer.emit(TraceEvent(tracing.VALUE, line, value=self._format_value(result)))
+        return result
+
+    def _eval_traced_for_expr(self, node: Tree) -> Any:
+        """Цикл с событием входа: границы вычисляются один раз и передаются циклу.
+
+        Границы, как в ``_eval_for_expr``, вычисляются с переменной цикла в
+        стеке циклов (её повторное использование в границах - ошибка), но до
+        события ``loop``: оно содержит их значения. Поэтому события,
+        порождённые границами, намеренно относятся к объемлющему циклу - они
+        происходят один раз, до первой итерации.
+        """
+        assert self._tracer is not None
+        name_token = node.children[0]
+        self._enter_loop(name_token.value, node.meta)
+        try:
+            bounds = [self._eval(child) for child in node.children[1:-1]]
+        finally:
+            self._exit_loop(name_token.value)
+        header = " .. ".join(self._format_value(value) for value in bounds[:2])
+        if len(bounds) == 3:
+            header += f" by {self._format_value(bounds[2])}"
+        self._tracer.emit(TraceEvent(tracing.LOOP, node.meta.line, name_token.value, header))
+        loop = Tree("for_expr", [name_token, *bounds, node.children[-1]], node.meta)
+        end = TraceEvent(tracing.END, node.meta.line, name_token.value)
+        try:
+            result = self._eval_for_expr(loop)
+        except (BreakException, NextException):
+            self._tracer.emit(end)  # break/next внешнего цикла
+            raise
+        self._tracer.emit(end)
+        return result
+
+    def _eval_traced_iteration(self, node: Tree) -> Any:
+        assert self._tracer is not None
+        name = node.children[0].value
+        value = self._format_value(self._env[name])
+        self._tracer.emit(TraceEvent(tracing.ITERATION, node.meta.line, name, value))
+        return self._eval(node.children[1])
+
+    def _eval_traced_jump(self, node: Tree) -> Any:
+        assert self._tracer is not None
+        statement = node.children[0]
+        try:
+            return self._eval(statement)
+        except BreakException as exc:
+            self._tracer.emit(TraceEvent(tracing.BREAK, statement.meta.line, exc.loop_var))
+            raise
+        except NextException as exc:
+            self._tracer.emit(TraceEvent(tracing.NEXT, statement.meta.line, exc.loop_var))
+            raise
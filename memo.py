@@ -0,0 +1,139 @@
+"""Кэш результатов чистых встроенных функций DSL.
+
+Циклы часто вызывают ``sin``, ``ln``, ``sqrt`` и ``nrt`` на небольшом наборе
+повторяющихся аргументов (например, углы на сетке). ``CallMemo`` хранит
+результаты таких вызовов по ключу (функция, аргументы, точность) и вытесняет
+давно не использованные записи, когда размер превышает ``maxsize``.
+
+Функции, меняющие или читающие состояние интерпретатора (``set_precision``,
+``get_precision``), через кэш не проходят.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+
+
+@dataclass(frozen=True)
+class MemoStats:
+    """Статистика кэша вызовов.
+
+    Attributes:
+        hits: Сколько вызовов обслужено из кэша
+        misses: Сколько вызовов пришлось вычислить
+        evictions: Сколько записей вытеснено из-за ограничения размера
+        size: Текущее число записей
+        maxsize: Наибольшее число записей
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+
+class CallMemo:
+    """Ограниченный LRU-кэш результатов вызовов.
+
+    Исключения не кэшируются: вызов с ошибкой повторяется каждый раз.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        """Создать кэш.
+
+        Args:
+            maxsize: Наибольшее число записей (больше 0)
+
+        Raises:
+            ValueError: Если ``maxsize`` не положителен
+        """
+        if maxsize <= 0:
+            raise ValueError("memo size must be positive")
+        self._maxsize = maxsize
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def maxsize(self) -> int:
+        """Наибольшее число записей."""
+        return self._maxsize
+
+    def call(self, key: Hashable, func: Callable[..., Any], args: tuple) -> Any:
+        """Вернуть результат ``func(*args)`` из кэша или вычислить его.
+
+        Args:
+            key: Ключ записи; должен включать всё, от чего зависит результат
+            func: Вычисляемая функция
+            args: Аргументы функции
+
+        Returns:
+            Результат вызова
+        """
+        try:
+            result = self._entries[key]
+        except KeyError:
+            pass
+        else:
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return result
+
+        self._misses += 1
+        result = func(*args)
+        self._entries[key] = result
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+        return result
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Сохранить запись, вычисленную вне кэша (например, без блокировки).
+
+        Args:
+            key: Ключ записи
+            value: Сохраняемый результат
+        """
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Вернуть запись без вычисления (попадание обновляет её позицию).
+
+        Args:
+            key: Ключ записи
+            default: Значение при отсутствии записи
+
+        Returns:
+            Сохранённый результат или default
+        """
+        try:
+            result = self._entries[key]
+        except KeyError:
+            self._misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return result
+
+    def clear(self) -> None:
+        """Удалить все записи и обнулить статистику."""
+        self._entries.clear()
+        self._hits = self._misses = self._evictions = 0
+
+    def stats(self) -> MemoStats:
+        """Текущая статистика кэша."""
+        return MemoStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            size=len(self._entries),
+            maxsize=self._maxsize,
+        )
@@ -0,0 +1,224 @@
+"""Кэш модулей, подключаемых инструкцией ``import "lib.clc"``.
+
+Модуль - обычный скрипт DSL. Он выполняется в собственном окружении
+(не видит переменных импортирующего скрипта), а его переменные верхнего
+уровня, кроме имён, начинающихся с ``_``, становятся экспортом, который
+копируется в окружение импортирующего скрипта.
+
+Результат выполнения модуля зависит только от его файла, файлов, которые он
+импортирует (транзитивно), числового бэкенда, точности и набора функций
+(``register_function`` может заменить и встроенную), поэтому экспорт
+кэшируется на процесс по ключу (путь, бэкенд, точность, метка реестра
+функций). Запись считается
+актуальной, пока не изменились время модификации и размер ни одного из этих
+файлов; если они изменились, но хэш содержимого прежний (файл «тронули»),
+запись тоже используется.
+
+Модули с разными ключами выполняются параллельно: блокировка у каждого
+ключа своя.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import hashlib
+import os
+from pathlib import Path
+import threading
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+# Выполнение модуля: (исходный код, путь) -> переменные после выполнения
+ModuleRunner = Callable[[str, Path], Mapping[str, Any]]
+
+_Key = Tuple[Path, str, int, str]
+
+
+@dataclass(frozen=True)
+class _Stamp:
+    """Состояние файла, от которого зависит запись кэша."""
+
+    path: Path
+    mtime_ns: int
+    size: int
+    digest: str
+
+    @classmethod
+    def read(cls, path: Path) -> Tuple["_Stamp", bytes]:
+        stat = path.stat()
+        data = path.read_bytes()
+        return cls(path, stat.st_mtime_ns, stat.st_size, hashlib.sha256(data).hexdigest()), data
+
+    def current(self) -> Optional["_Stamp"]:
+        """Состояние файла сейчас, если содержимое не изменилось, иначе None."""
+        try:
+            stat = self.path.stat()
+            if (stat.st_mtime_ns, stat.st_size) == (self.mtime_ns, self.size):
+                return self
+            stamp, _ = _Stamp.read(self.path)
+        except OSError:
+            return None
+        return stamp if stamp.digest == self.digest else None
+
+
+@dataclass(frozen=True)
+class _Entry:
+    stamp: _Stamp
+    # Файлы, импортированные модулем (транзитивно)
+    deps: Tuple[_Stamp, ...]
+    exports: Dict[str, Any]
+
+    def current(self) -> Optional["_Entry"]:
+        """Запись с обновлёнными состояниями файлов или None, если какой-то изменился."""
+        stamps = []
+        for stamp in (self.stamp, *self.deps):
+            fresh = stamp.current()
+            if fresh is None:
+                return None
+            stamps.append(fresh)
+        if stamps == [self.stamp, *self.deps]:
+            return self
+        return _Entry(stamps[0], tuple(stamps[1:]), self.exports)
+
+
+def resolve(name: str, base: Optional[Path]) -> Path:
+    """Путь модуля относительно каталога импортирующего скрипта.
+
+    Args:
+        name: Путь из инструкции import
+        base: Путь импортирующего скрипта (None - текущий каталог)
+
+    Returns:
+        Абсолютный путь модуля
+    """
+    directory = base.parent if base is not None else Path.cwd()
+    return Path(os.path.realpath(directory / name))
+
+
+class ModuleCache:
+    """Кэш экспорта модулей на процесс."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[_Key, _Entry] = {}
+        # Защищает словари ниже; модули под ней не выполняются
+        self._lock = threading.Lock()
+        self._key_locks: Dict[_Key, threading.Lock] = {}
+        self._owners: Dict[_Key, int] = {}
+        self._waiting: Dict[int, _Key] = {}
+        # Стек зависимостей модулей, выполняемых в этом потоке
+        self._local = threading.local()
+        self.loads = 0
+
+    def load(
+        self, path: Path, backend: str, precision: int, functions: str, run: ModuleRunner
+    ) -> Dict[str, Any]:
+        """Экспорт модуля из кэша или после выполнения модуля.
+
+        Args:
+            path: Абсолютный путь модуля
+            backend: Имя числового бэкенда
+            precision: Точность, при которой выполняется модуль
+            functions: Метка реестра функций (``FunctionRegistry.version``)
+            run: Выполнение модуля при промахе кэша
+
+        Returns:
+            Переменные, экспортируемые модулем (не изменять)
+
+        Raises:
+            OSError: Файл модуля не читается
+        """
+        key = (path, backend, precision, functions)
+        entry = self._fresh(key)
+        if entry is None:
+            locked = self._acquire(key)
+            try:
+                # Пока ждали блокировку, модуль мог выполнить другой поток
+                entry = self._fresh(key)
+                if entry is None:
+                    entry = self._run(key, run)
+            finally:
+                if locked:
+                    self._release(key)
+        stack = self._stack()
+        if stack:
+            # Импортирующий модуль зависит от этого модуля и его зависимостей
+            for stamp in (entry.stamp, *entry.deps):
+                stack[-1][stamp.path] = stamp
+        return entry.exports
+
+    def _stack(self) -> List[Dict[Path, _Stamp]]:
+        """Зависимости модулей, выполняемых в текущем потоке (по вложенности)."""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _fresh(self, key: _Key) -> Optional[_Entry]:
+        """Актуальная запись кэша или None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        fresh = entry.current()
+        if fresh is not None and fresh is not entry:
+            with self._lock:
+                self._entries[key] = fresh
+        return fresh
+
+    def _run(self, key: _Key, run: ModuleRunner) -> _Entry:
+        """Выполнить модуль, собрав файлы, которые он импортирует."""
+        stamp, data = _Stamp.read(key[0])
+        stack = self._stack()
+        stack.append({})
+        try:
+            variables = run(data.decode("utf-8"), key[0])
+        finally:
+            deps = stack.pop()
+        deps.pop(stamp.path, None)
+        exports = {name: value for name, value in variables.items() if not name.startswith("_")}
+        entry = _Entry(stamp, tuple(deps.values()), exports)
+        with self._lock:
+            self._entries[key] = entry
+            self.loads += 1
+        return entry
+
+    def _acquire(self, key: _Key) -> bool:
+        """Захватить блокировку ключа.
+
+        Returns:
+            False, если ожидание привело бы к взаимной блокировке (потоки
+            импортируют модули циклически с разных концов цикла); тогда
+            модуль выполняется без блокировки и сообщает о цикле сам
+        """
+        me = threading.get_ident()
+        with self._lock:
+            lock = self._key_locks.setdefault(key, threading.Lock())
+            if lock.acquire(blocking=False):
+                self._owners[key] = me
+                return True
+            owner = self._owners.get(key)
+            seen = set()
+            while owner is not None and owner not in seen:
+                if owner == me:
+                    return False
+                seen.add(owner)
+                waits_for = self._waiting.get(owner)
+                owner = self._owners.get(waits_for) if waits_for is not None else None
+            self._waiting[me] = key
+        lock.acquire()
+        with self._lock:
+            del self._waiting[me]
+            self._owners[key] = me
+        return True
+
+    def _release(self, key: _Key) -> None:
+        with self._lock:
+            del self._owners[key]
+            self._key_locks[key].release()
+
+    def clear(self) -> None:
+        """Забыть все модули (следующий import выполнит их заново)."""
+        with self._lock:
+            self._entries.clear()
+            self.loads = 0
+
+
+MODULES = ModuleCache()
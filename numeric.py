@@ -0,0 +1,510 @@
+"""Числовые бэкенды интерпретатора DSL.
+
+Бэкенд инкапсулирует всё, что зависит от представления чисел: разбор
+литералов, арифметику, округление до текущей точности, сравнения,
+математические функции и форматирование. Интерпретатор получает бэкенд
+при создании и обращается к числам только через него.
+
+Ошибки бэкенд сообщает стандартными исключениями Python:
+- ``ZeroDivisionError`` — деление на ноль (в т.ч. mod, ctg, nrt);
+- ``ValueError`` / ``OverflowError`` — ошибки области определения и переполнения;
+- ``TypeError`` — значение нельзя преобразовать в число.
+
+Интерпретатор превращает их в ``DSLError`` с позицией в исходном коде.
+"""
+
+from __future__ import annotations
+
+from decimal import MAX_EMAX, MAX_PREC, MIN_EMIN, Context, Decimal, ROUND_HALF_UP
+import functools
+import math
+from typing import Any, Callable, Dict, Protocol, runtime_checkable
+
+import bigformat
+import decmath
+
+# Наибольшая точность (знаков после запятой), которую принимают бэкенды:
+# при большей точности квантователь и контекст Decimal уже не строятся
+MAX_PRECISION = 1_000_000
+
+
+@runtime_checkable
+class NumericBackend(Protocol):
+    """Протокол числового бэкенда.
+
+    Экземпляр бэкенда хранит текущую точность (количество знаков после
+    запятой) и принадлежит одному интерпретатору.
+    """
+
+    name: str
+    max_precision: int
+
+    @property
+    def precision(self) -> int:
+        """Текущая точность вычислений."""
+        ...
+
+    @precision.setter
+    def precision(self, value: int) -> None: ...
+
+    def parse_literal(self, text: str) -> Any:
+        """Разобрать числовой литерал из исходного кода (без округления)."""
+        ...
+
+    def coerce(self, value: Any) -> Any:
+        """Преобразовать значение Python (int, float, str, число бэкенда) в число."""
+        ...
+
+    def is_int(self, value: Any) -> bool:
+        """Проверить, является ли число целым."""
+        ...
+
+    def to_int(self, value: Any) -> int:
+        """Преобразовать целое число бэкенда в int."""
+        ...
+
+    def round(self, value: Any) -> Any:
+        """Округлить число до текущей точности."""
+        ...
+
+    def add(self, left: Any, right: Any) -> Any: ...
+
+    def sub(self, left: Any, right: Any) -> Any: ...
+
+    def mul(self, left: Any, right: Any) -> Any: ...
+
+    def div(self, left: Any, right: Any) -> Any: ...
+
+    def mod(self, left: Any, right: Any) -> Any: ...
+
+    def neg(self, value: Any) -> Any: ...
+
+    def pow(self, base: Any, exponent: Any) -> Any: ...
+
+    def mod_pow(self, base: Any, exponent: Any, modulus: Any) -> Any: ...
+
+    def compare(self, left: Any, op: str, right: Any) -> bool: ...
+
+    def ln(self, value: Any) -> Any: ...
+
+    def log2(self, value: Any) -> Any: ...
+
+    def log10(self, value: Any) -> Any: ...
+
+    def sin(self, value: Any) -> Any: ...
+
+    def cos(self, value: Any) -> Any: ...
+
+    def tg(self, value: Any) -> Any: ...
+
+    def ctg(self, value: Any) -> Any: ...
+
+    def sqrt(self, value: Any) -> Any: ...
+
+    def nrt(self, value: Any, degree: Any) -> Any: ...
+
+    def constant(self, name: str) -> Any:
+        """Вернуть константу (``pi`` или ``e``) с текущей точностью."""
+        ...
+
+    def format(self, value: Any) -> str:
+        """Форматировать значение для вывода с текущей точностью."""
+        ...
+
+
+def _compare(left: Any, op: str, right: Any) -> bool:
+    """Сравнить два значения оператором DSL."""
+    if op == "==":
+        return left == right
+    if op == "!=":
+        return left != right
+    if op == "<":
+        return left < right
+    if op == "<=":
+        return left <= right
+    if op == ">":
+        return left > right
+    if op == ">=":
+        return left >= right
+    raise ValueError(f"Unknown comparison operator: {op}")
+
+
+@functools.lru_cache(maxsize=None)
+def _quantizer(precision: int) -> Decimal:
+    """Квантователь ``10 ** -precision`` (кэшируется, смена точности дешёвая)."""
+    return Decimal(1).scaleb(-precision)
+
+
+class DecimalBackend:
+    """Бэкенд на основе ``decimal.Decimal`` (используется по умолчанию).
+
+    Каждый результат округляется до ``precision`` знаков после запятой
+    с ``ROUND_HALF_UP``. Трансцендентные функции при точности не больше
+    ``float_digits`` знаков вычисляются через ``float``, а при большей
+    точности - функциями произвольной точности из ``decmath``.
+
+    Все операции выполняются в собственном ``decimal.Context`` бэкенда,
+    а не в контексте потока: интерпретаторы в разных потоках не влияют
+    друг на друга. Сложение, вычитание, умножение и округление точны при
+    любой величине целой части (``3 ** 80``, ``60!``), а для деления и
+    степени точность контекста увеличивается на число знаков целой части
+    результата.
+    """
+
+    name = "decimal"
+    max_precision = MAX_PRECISION
+
+    def __init__(self, precision: int = 10, float_digits: int = 15) -> None:
+        """Создать бэкенд.
+
+        Args:
+            precision: Начальная точность (знаков после запятой)
+            float_digits: Наибольшая точность, при которой трансцендентные
+                функции ещё вычисляются через float
+        """
+        self._precision = precision
+        self._quant = _quantizer(precision)
+        self._context = Context(prec=self._context_prec(precision))
+        self._exact = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)
+        self._float_digits = float_digits
+
+    @property
+    def precision(self) -> int:
+        """Текущая точность вычислений (количество знаков после запятой)."""
+        return self._precision
+
+    @precision.setter
+    def precision(self, value: int) -> None:
+        if value > self.max_precision:
+            # Проверка до изменения состояния: бэкенд остаётся согласованным
+            raise ValueError(f"precision must not exceed {self.max_precision}")
+        self._quant = _quantizer(value)
+        self._precision = value
+        self._context.prec = self._context_prec(value)
+
+    @property
+    def context(self) -> Context:
+        """Контекст Decimal, в котором выполняются все операции бэкенда."""
+        return self._context
+
+    def __copy__(self) -> "DecimalBackend":
+        # Копия - независимый бэкенд: контекст не разделяется
+        return DecimalBackend(self._precision, self._float_digits)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "DecimalBackend":
+        return self.__copy__()
+
+    @staticmethod
+    def _context_prec(precision: int) -> int:
+        # prec должен быть больше количества десятичных знаков:
+        # добавляем запас для целой части и промежуточных вычислений
+        return max(28, precision + 10)
+
+    def parse_literal(self, text: str) -> Decimal:
+        return Decimal(text)
+
+    def coerce(self, value: Any) -> Decimal:
+        if isinstance(value, Decimal):
+            return value
+        if isinstance(value, float):
+            return Decimal(str(value))
+        if isinstance(value, int):
+            return bigformat.int_to_decimal(value)
+        if isinstance(value, str):
+            return Decimal(value)
+        raise TypeError(f"Expected numeric value, got {type(value).__name__}")
+
+    def is_int(self, value: Decimal) -> bool:
+        return value == value.to_integral_value(context=self._context)
+
+    def to_int(self, value: Decimal) -> int:
+        return bigformat.decimal_to_int(value)
+
+    def round(self, value: Decimal) -> Decimal:
+        # Точный контекст: целая часть не ограничена prec рабочего контекста
+        return value.quantize(self._quant, rounding=ROUND_HALF_UP, context=self._exact)
+
+    def add(self, left: Decimal, right: Decimal) -> Decimal:
+        return self.round(self._exact.add(left, right))
+
+    def sub(self, left: Decimal, right: Decimal) -> Decimal:
+        return self.round(self._exact.subtract(left, right))
+
+    def mul(self, left: Decimal, right: Decimal) -> Decimal:
+        return self.round(self._exact.multiply(left, right))
+
+    def div(self, left: Decimal, right: Decimal) -> Decimal:
+        if right == 0:
+            raise ZeroDivisionError("division by zero")
+        digits = left.adjusted() - right.adjusted() + 1 if left else 0
+        return self.round(self._context_for(digits).divide(left, right))
+
+    def mod(self, left: Decimal, right: Decimal) -> Decimal:
+        """Остаток с математической семантикой: результат в ``[0, |right|)``.
+
+        Формула: ``left - floor(left / |right|) * |right|``.
+        """
+        if right == 0:
+            raise ZeroDivisionError("mod division by zero")
+        modulus = right.copy_abs()
+        remainder = self._exact.remainder(left, modulus)
+        if remainder < 0:
+            remainder = self._exact.add(remainder, modulus)
+        return self.round(remainder)
+
+    def neg(self, value: Decimal) -> Decimal:
+        return self.round(value.copy_negate())
+
+    def pow(self, base: Decimal, exponent: Decimal) -> Decimal:
+        if self.is_int(exponent):
+            if base == 0 and exponent < 0:
+                raise ZeroDivisionError("division by zero")
+            power = int(exponent)
+            if power >= 0 and self.is_int(base):
+                return self.round(self._exact.power(base, power))
+            # Оценка сверху числа знаков целой части результата
+            digits = (base.adjusted() + 1) * power if power > 0 else base.adjusted() * power
+            context = self._context_for(digits) if base else self._context
+            return self.round(context.power(base, power))
+        if self._use_float(base, exponent):
+            result = float(base) ** float(exponent)
+            if isinstance(result, complex):
+                raise ValueError("math domain error")
+            return self._from_float(result)
+        return self.round(decmath.power(base, exponent, self._precision))
+
+    def mod_pow(self, base: Decimal, exponent: Decimal, modulus: Decimal) -> Decimal:
+        if modulus == 0:
+            raise ZeroDivisionError("mod division by zero")
+        to_int = bigformat.decimal_to_int
+        result = pow(to_int(base), to_int(exponent), abs(to_int(modulus)))
+        return self.round(bigformat.int_to_decimal(result))
+
+    def compare(self, left: Decimal, op: str, right: Decimal) -> bool:
+        return _compare(left, op, right)
+
+    def ln(self, value: Decimal) -> Decimal:
+        if self._use_float(value):
+            return self._apply_float(math.log, value)
+        return self.round(decmath.ln(value, self._precision))
+
+    def log2(self, value: Decimal) -> Decimal:
+        if self._use_float(value):
+            return self._apply_float(math.log2, value)
+        return self.round(decmath.log2(value, self._precision))
+
+    def log10(self, value: Decimal) -> Decimal:
+        if self._use_float(value):
+            return self._apply_float(math.log10, value)
+        return self.round(decmath.log10(value, self._precision))
+
+    def sin(self, value: Decimal) -> Decimal:
+        if self._use_float(value):
+            return self._apply_float(math.sin, value)
+        return self.round(decmath.sin(value, self._precision))
+
+    def cos(self, value: Decimal) -> Decimal:
+        if self._use_float(value):
+            return self._apply_float(math.cos, value)
+        return self.round(decmath.cos(value, self._precision))
+
+    def tg(self, value: Decimal) -> Decimal:
+        if self._use_float(value):
+            return self._apply_float(math.tan, value)
+        return self.round(decmath.tg(value, self._precision))
+
+    def ctg(self, value: Decimal) -> Decimal:
+        if not self._use_float(value):
+            return self.round(decmath.ctg(value, self._precision))
+        tan_value = math.tan(float(value))
+        if tan_value == 0:
+            raise ZeroDivisionError("ctg division by zero")
+        return self._from_float(1 / tan_value)
+
+    def sqrt(self, value: Decimal) -> Decimal:
+        if value < 0:
+            raise ValueError("sqrt domain error")
+        if self._use_float(value):
+            return self._from_float(math.sqrt(float(value)))
+        return self.round(decmath.sqrt(value, self._precision))
+
+    def nrt(self, value: Decimal, degree: Decimal) -> Decimal:
+        if degree == 0:
+            raise ZeroDivisionError("nrt division by zero")
+        if self.is_int(degree) and int(degree) % 2 == 0 and value < 0:
+            raise ValueError("nrt domain error")
+        if not self._use_float(value, degree):
+            return self.round(decmath.nrt(value, degree, self._precision))
+        if value < 0:
+            if not self.is_int(degree):
+                raise ValueError("nrt domain error")
+            return self._from_float(-((-float(value)) ** (1.0 / float(degree))))
+        return self._from_float(float(value) ** (1.0 / float(degree)))
+
+    def constant(self, name: str) -> Decimal:
+        if name == "pi":
+            return self.round(decmath.pi(self._precision))
+        if name == "e":
+            return self.round(decmath.e(self._precision))
+        raise ValueError(f"Unknown constant: {name}")
+
+    def format(self, value: Any) -> str:
+        """Форматировать значение; при точности 0 — как целое без точки."""
+        if isinstance(value, Decimal):
+            return format(self.round(value), f".{self._precision}f")
+        return str(value)
+
+    def _context_for(self, digits: int) -> Context:
+        """Контекст для результата с ``digits`` знаками целой части.
+
+        Рабочий контекст, если в нём хватает знаков и для целой, и для
+        дробной части; иначе - расширенный на число знаков целой части.
+        """
+        if digits + self._precision < self._context.prec:
+            return self._context
+        return Context(prec=self._context.prec + digits, Emax=MAX_EMAX, Emin=MIN_EMIN)
+
+    def _use_float(self, *values: Decimal) -> bool:
+        """Можно ли считать через float: точность мала и аргументы в диапазоне double."""
+        if self._precision > self._float_digits:
+            return False
+        return all(value.is_zero() or abs(value.adjusted()) < 300 for value in values)
+
+    def _apply_float(self, func: Callable[[float], float], value: Decimal) -> Decimal:
+        return self._from_float(func(float(value)))
+
+    def _from_float(self, value: float) -> Decimal:
+        return self.round(Decimal(str(value)))
+
+
+class FloatBackend:
+    """Бэкенд на основе ``float``: быстрее Decimal, но с точностью double.
+
+    Подходит для сравнения производительности и для скриптов, которым
+    достаточно 15 значащих цифр.
+    """
+
+    name = "float"
+    max_precision = MAX_PRECISION
+
+    def __init__(self, precision: int = 10) -> None:
+        self._precision = precision
+
+    @property
+    def precision(self) -> int:
+        """Текущая точность вычислений (количество знаков после запятой)."""
+        return self._precision
+
+    @precision.setter
+    def precision(self, value: int) -> None:
+        if value > self.max_precision:
+            raise ValueError(f"precision must not exceed {self.max_precision}")
+        self._precision = value
+
+    def parse_literal(self, text: str) -> float:
+        return float(text)
+
+    def coerce(self, value: Any) -> float:
+        if isinstance(value, float):
+            return value
+        if isinstance(value, (int, Decimal, str)):
+            return float(value)
+        raise TypeError(f"Expected numeric value, got {type(value).__name__}")
+
+    def is_int(self, value: float) -> bool:
+        return value.is_integer()
+
+    def to_int(self, value: float) -> int:
+        return int(value)
+
+    def round(self, value: float) -> float:
+        return round(value, self._precision)
+
+    def add(self, left: float, right: float) -> float:
+        return round(left + right, self._precision)
+
+    def sub(self, left: float, right: float) -> float:
+        return round(left - right, self._precision)
+
+    def mul(self, left: float, right: float) -> float:
+        return round(left * right, self._precision)
+
+    def div(self, left: float, right: float) -> float:
+        if right == 0:
+            raise ZeroDivisionError("division by zero")
+        return round(left / right, self._precision)
+
+    def mod(self, left: float, right: float) -> float:
+        if right == 0:
+            raise ZeroDivisionError("mod division by zero")
+        # Для float оператор % уже даёт остаток со знаком делителя
+        return round(left % abs(right), self._precision)
+
+    def neg(self, value: float) -> float:
+        return -value
+
+    def pow(self, base: float, exponent: float) -> float:
+        if base == 0 and exponent < 0:
+            raise ZeroDivisionError("division by zero")
+        result = base ** exponent
+        if isinstance(result, complex):
+            raise ValueError("math domain error")
+        return round(result, self._precision)
+
+    def mod_pow(self, base: float, exponent: float, modulus: float) -> float:
+        if modulus == 0:
+            raise ZeroDivisionError("mod division by zero")
+        return float(pow(int(base), int(exponent), int(abs(modulus))))
+
+    def compare(self, left: float, op: str, right: float) -> bool:
+        return _compare(left, op, right)
+
+    def ln(self, value: float) -> float:
+        return round(math.log(value), self._precision)
+
+    def log2(self, value: float) -> float:
+        return round(math.log2(value), self._precision)
+
+    def log10(self, value: float) -> float:
+        return round(math.log10(value), self._precision)
+
+    def sin(self, value: float) -> float:
+        return round(math.sin(value), self._precision)
+
+    def cos(self, value: float) -> float:
+        return round(math.cos(value), self._precision)
+
+    def tg(self, value: float) -> float:
+        return round(math.tan(value), self._precision)
+
+    def ctg(self, value: float) -> float:
+        tan_value = math.tan(value)
+        if tan_value == 0:
+            raise ZeroDivisionError("ctg division by zero")
+        return round(1 / tan_value, self._precision)
+
+    def sqrt(self, value: float) -> float:
+        if value < 0:
+            raise ValueError("sqrt domain error")
+        return round(math.sqrt(value), self._precision)
+
+    def nrt(self, value: float, degree: float) -> float:
+        if degree == 0:
+            raise ZeroDivisionError("nrt division by zero")
+        if degree.is_integer() and int(degree) % 2 == 0 and value < 0:
+            raise ValueError("nrt domain error")
+        if value < 0:
+            return round(-((-value) ** (1.0 / degree)), self._precision)
+        return round(value ** (1.0 / degree), self._precision)
+
+    def constant(self, name: str) -> float:
+        if name == "pi":
+            return round(math.pi, self._precision)
+        if name == "e":
+            return round(math.e, self._precision)
+        raise ValueError(f"Unknown constant: {name}")
+
+    def format(self, value: Any) -> str:
+        if isinstance(value, float) and not isinstance(value, bool):
+            return format(value, f".{self._precision}f")
+        return str(value)
@@ -0,0 +1,142 @@
+"""Приёмники вывода ``print`` и трассировки.
+
+Интерпретатор пишет строки вывода не через встроенный ``print``, а в
+приёмник (``OutputSink``), переданный при создании:
+
+- ``StreamSink`` - буферизованная запись в поток: строки накапливаются и
+  записываются одной операцией по политике сброса (каждая запись, каждая
+  строка, по заполнению буфера и/или по времени);
+- ``ListSink`` - захват вывода в памяти без подмены ``sys.stdout``
+  (безопасно для потоков: у каждого интерпретатора свой приёмник);
+- ``NullSink`` - вывод отбрасывается.
+
+По умолчанию интерпретатор пишет в текущий ``sys.stdout`` без буферизации,
+как встроенный ``print``.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from typing import Optional, Protocol, TextIO
+
+# Политики сброса StreamSink
+FLUSH_ALWAYS = "always"  # каждая запись сразу уходит в поток
+FLUSH_LINE = "line"  # сброс, когда в буфере есть полная строка
+FLUSH_SIZE = "size"  # сброс при заполнении буфера
+FLUSH_POLICIES = (FLUSH_ALWAYS, FLUSH_LINE, FLUSH_SIZE)
+
+
+class OutputSink(Protocol):
+    """Приёмник вывода интерпретатора."""
+
+    def write(self, text: str) -> None:
+        """Принять текст (одна или несколько строк с завершающим ``\\n``)."""
+
+    def flush(self) -> None:
+        """Передать накопленный вывод дальше (конец выполнения программы)."""
+
+
+class StreamSink:
+    """Буферизованная запись в текстовый поток."""
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        policy: str = FLUSH_SIZE,
+        buffer_size: int = 1 << 16,
+        interval: Optional[float] = None,
+    ) -> None:
+        """Создать приёмник.
+
+        Args:
+            stream: Поток вывода; None - текущий ``sys.stdout`` в момент сброса
+                (работает с ``contextlib.redirect_stdout``)
+            policy: Политика сброса: ``"always"``, ``"line"`` или ``"size"``
+            buffer_size: Размер буфера в символах для политики ``"size"``
+            interval: Дополнительно сбрасывать буфер, если с прошлого сброса
+                прошло больше interval секунд (для долгих программ)
+
+        Raises:
+            ValueError: Неизвестная политика или неположительный размер буфера
+        """
+        if policy not in FLUSH_POLICIES:
+            raise ValueError(f"Unknown flush policy: {policy}")
+        if buffer_size <= 0:
+            raise ValueError("buffer_size must be positive")
+        self._stream = stream
+        self._policy = policy
+        self._buffer_size = buffer_size
+        self._interval = interval
+        self._pending: list[str] = []
+        self._size = 0
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+        self.writes = 0
+
+    def write(self, text: str) -> None:
+        with self._lock:
+            self._pending.append(text)
+            self._size += len(text)
+            if self._policy == FLUSH_ALWAYS:
+                due = True
+            elif self._policy == FLUSH_LINE:
+                due = "\n" in text
+            else:
+                due = self._size >= self._buffer_size
+            if not due and self._interval is not None:
+                due = time.monotonic() - self._flushed_at >= self._interval
+            if due:
+                self._write_pending()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._write_pending()
+            stream = self._stream if self._stream is not None else sys.stdout
+            stream.flush()
+
+    def _write_pending(self) -> None:
+        if self._pending:
+            stream = self._stream if self._stream is not None else sys.stdout
+            stream.write(self._pending[0] if len(self._pending) == 1 else "".join(self._pending))
+            self.writes += 1
+            self._pending.clear()
+            self._size = 0
+        self._flushed_at = time.monotonic()
+
+
+class ListSink:
+    """Захват вывода в памяти."""
+
+    def __init__(self) -> None:
+        self.chunks: list[str] = []
+
+    def write(self, text: str) -> None:
+        self.chunks.append(text)
+
+    def flush(self) -> None:
+        pass
+
+    def getvalue(self) -> str:
+        """Весь захваченный вывод."""
+        return "".join(self.chunks)
+
+    def clear(self) -> None:
+        """Забыть захваченный вывод."""
+        self.chunks.clear()
+
+
+class NullSink:
+    """Приёмник, отбрасывающий вывод."""
+
+    def write(self, text: str) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+
+def stdout_sink() -> StreamSink:
+    """Приёмник по умолчанию: текущий ``sys.stdout`` без буферизации."""
+    return StreamSink(policy=FLUSH_ALWAYS)
@@ -0,0 +1,324 @@
+"""Выполнение одной программы для многих наборов переменных.
+
+Программа компилируется один раз (``ProgramRunner``), после чего каждый набор
+переменных выполняется над той же ``Program`` в новом ``ExecutionState``.
+``run_many`` распределяет наборы по процессам ``ProcessPoolExecutor``
+порциями: каждый процесс компилирует программу один раз при запуске,
+результаты возвращаются в порядке входных наборов, а число порций
+в обработке ограничено, поэтому входные данные можно читать потоково.
+
+``run_files`` выполняет множество файлов-программ в тёплых рабочих процессах:
+парсер строится один раз на процесс, а самые большие файлы запускаются первыми,
+чтобы длинные скрипты не оказались в хвосте расписания.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+import itertools
+import os
+import time
+from typing import (
+    Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple,
+)
+
+from lark.exceptions import LarkError
+
+from interpreter import DSLError, ExecutionState, Interpreter, _load_parser
+from output import ListSink
+from program import Program, Snapshot
+
+
+@dataclass(frozen=True)
+class RunResult:
+    """Результат выполнения программы для одного набора переменных.
+
+    Attributes:
+        value: Отформатированное значение последнего выражения или None
+        error: Сообщение об ошибке (синтаксис, выполнение, значение
+            переменной) или None
+        output: Вывод print() за время выполнения
+        variables: Отформатированные значения выбранных переменных
+            (None - переменная не определена)
+    """
+
+    value: Optional[str]
+    error: Optional[str]
+    output: str
+    variables: Tuple[Optional[str], ...] = ()
+
+
+@dataclass(frozen=True)
+class FileResult:
+    """Результат выполнения одного файла-программы.
+
+    Attributes:
+        path: Путь к файлу
+        value: Отформатированное значение последнего выражения или None
+        error: Сообщение об ошибке (синтаксис, выполнение, чтение файла) или None
+        output: Вывод print() за время выполнения
+        seconds: Время разбора и выполнения в секундах
+    """
+
+    path: str
+    value: Optional[str]
+    error: Optional[str]
+    output: str
+    seconds: float
+
+    @property
+    def ok(self) -> bool:
+        """Файл выполнен без ошибок."""
+        return self.error is None
+
+
+class ProgramRunner:
+    """Программа, скомпилированная один раз, и её выполнение для наборов переменных."""
+
+    def __init__(
+        self,
+        source: str,
+        base_env: Optional[Dict[str, Any]] = None,
+        select: Sequence[str] = (),
+        prelude: Optional[Snapshot] = None,
+        path: Optional[str] = None,
+    ) -> None:
+        """Скомпилировать программу.
+
+        Ошибка компиляции не бросается, а становится результатом каждого
+        запуска: в рабочем процессе она иначе прервала бы весь пакет.
+
+        Args:
+            source: Исходный код программы
+            base_env: Переменные, общие для всех запусков
+            select: Переменные, значения которых возвращаются после запуска
+            prelude: Снимок прелюдии, с которого начинается каждый запуск
+            path: Путь файла программы (для ``import``)
+        """
+        self._prelude = prelude
+        self._base_env = dict(base_env or {})
+        self._select = tuple(select)
+        self._program: Optional[Program] = None
+        self._error: Optional[str] = None
+        try:
+            self._program = Program.compile(source, path=path)
+        except Exception as exc:  # pylint: disable=broad-except
+            self._error = error_message(exc)
+
+    def run(self, overrides: Dict[str, Any]) -> RunResult:
+        """Выполнить программу с переопределёнными переменными.
+
+        Args:
+            overrides: Значения переменных для этого запуска; строки
+                (например, из CSV) разбираются как десятичные числа,
+                пустая строка означает "не переопределять"
+
+        Returns:
+            Результат запуска; ошибки компиляции и выполнения и некорректные
+            значения возвращаются в поле error
+        """
+        if self._program is None:
+            return RunResult(None, self._error, "")
+        env = dict(self._base_env)
+        for name, value in overrides.items():
+            if isinstance(value, str):
+                if not value.strip():
+                    continue
+                try:
+                    value = Decimal(value)
+                except InvalidOperation:
+                    return RunResult(None, f"Invalid numeric value for {name}: {value}", "")
+            env[name] = value
+        state = self._prelude.fork(env) if self._prelude is not None else ExecutionState(env=env)
+        output = ListSink()
+        try:
+            value = self._program.run(state, output=output)
+        except Exception as exc:  # pylint: disable=broad-except
+            return RunResult(None, error_message(exc), output.getvalue())
+        formatted = state.format(value) if value is not None else None
+        variables = []
+        for name in self._select:
+            selected = state.get(name)
+            variables.append(None if selected is None else state.format(selected))
+        return RunResult(formatted, None, output.getvalue(), tuple(variables))
+
+
+# Программа рабочего процесса: компилируется один раз при его запуске
+_WORKER_RUNNER: Optional[ProgramRunner] = None
+
+
+def _init_worker(
+    source: str,
+    base_env: Dict[str, Any],
+    select: Tuple[str, ...],
+    prelude: Optional[Snapshot],
+    path: Optional[str],
+) -> None:
+    global _WORKER_RUNNER  # pylint: disable=global-statement
+    _WORKER_RUNNER = ProgramRunner(source, base_env, select, prelude, path)
+
+
+def _run_chunk(chunk: List[Dict[str, Any]]) -> List[RunResult]:
+    assert _WORKER_RUNNER is not None
+    return [_WORKER_RUNNER.run(overrides) for overrides in chunk]
+
+
+def run_many(
+    source: str,
+    overrides: Iterable[Dict[str, Any]],
+    base_env: Optional[Dict[str, Any]] = None,
+    jobs: int = 1,
+    chunk_size: int = 64,
+    select: Sequence[str] = (),
+    prelude: Optional[Snapshot] = None,
+    path: Optional[str] = None,
+) -> Iterator[RunResult]:
+    """Выполнить программу для каждого набора переменных.
+
+    Args:
+        source: Исходный код программы
+        overrides: Наборы переменных (читаются лениво)
+        base_env: Переменные, общие для всех запусков
+        jobs: Число рабочих процессов (1 - в текущем процессе)
+        chunk_size: Сколько наборов передаётся процессу за раз
+        select: Переменные, значения которых возвращаются в RunResult.variables
+        prelude: Снимок прелюдии (передаётся рабочим процессам один раз)
+        path: Путь файла программы (для ``import``)
+
+    Yields:
+        Результаты в порядке наборов переменных
+    """
+    if jobs <= 1:
+        runner = ProgramRunner(source, base_env, select, prelude, path)
+        for item in overrides:
+            yield runner.run(item)
+        return
+    chunks = _chunked(overrides, chunk_size)
+    initargs = (source, dict(base_env or {}), tuple(select), prelude, path)
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=initargs
+    ) as executor:
+        for results in ordered_map(executor, _run_chunk, chunks, window=2 * jobs):
+            yield from results
+
+
+def run_file(path: str) -> FileResult:
+    """Разобрать и выполнить файл-программу в свежем интерпретаторе.
+
+    Args:
+        path: Путь к файлу ``.clc``
+
+    Returns:
+        Результат; ошибки разбора, выполнения и чтения возвращаются в поле error
+    """
+    started = time.perf_counter()
+    output = ListSink()
+    try:
+        with open(path, encoding="utf-8") as stream:
+            source = stream.read()
+        interpreter = Interpreter(output=output)
+        value = interpreter.execute(source, path)
+        formatted = interpreter.format_value(value) if value is not None else None
+        error = None
+    except (OSError, UnicodeDecodeError) as exc:
+        formatted, error = None, f"Cannot read script: {exc}"
+    except Exception as exc:  # pylint: disable=broad-except
+        formatted, error = None, error_message(exc)
+    return FileResult(path, formatted, error, output.getvalue(), time.perf_counter() - started)
+
+
+def error_message(exc: BaseException) -> str:
+    """Сообщение об ошибке запуска для поля error результата.
+
+    Args:
+        exc: Исключение компиляции или выполнения программы
+
+    Returns:
+        Текст ошибки DSL, первая строка синтаксической ошибки или тип и
+        текст прочего исключения
+    """
+    if isinstance(exc, DSLError):
+        return str(exc)
+    if isinstance(exc, LarkError):
+        return f"Syntax error: {str(exc).splitlines()[0]}"
+    return f"{type(exc).__name__}: {exc}"
+
+
+def _warm_worker() -> None:
+    _load_parser()
+
+
+def run_files(paths: Iterable[str], jobs: int = 1) -> Iterator[FileResult]:
+    """Выполнить каждый файл-программу; самые большие файлы - первыми.
+
+    Размер файла служит оценкой времени выполнения: длинные скрипты
+    запускаются в начале, чтобы не задерживать завершение всего пакета.
+    Рабочие процессы строят парсер один раз при запуске.
+
+    Args:
+        paths: Пути к файлам
+        jobs: Число рабочих процессов (1 - в текущем процессе)
+
+    Yields:
+        Результаты в порядке завершения
+    """
+    ordered = sorted(paths, key=_file_size, reverse=True)
+    if jobs <= 1:
+        for path in ordered:
+            yield run_file(path)
+        return
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_warm_worker) as executor:
+        futures = {executor.submit(run_file, path): path for path in ordered}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except BrokenProcessPool as exc:
+                # Рабочий процесс аварийно завершился (например, нехватка памяти)
+                yield FileResult(futures[future], None, f"Worker failed: {exc}", "", 0.0)
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def ordered_map(
+    executor: Executor, func: Callable[[Any], Any], items: Iterable[Any], window: int
+) -> Iterator[Any]:
+    """Как ``executor.map``, но с ограниченным числом задач в обработке.
+
+    ``Executor.map`` сразу ставит в очередь все элементы; здесь входные
+    элементы читаются по мере освобождения места, поэтому память ограничена
+    ``window`` задачами.
+
+    Args:
+        executor: Пул потоков или процессов
+        func: Вызываемая функция (для процессов - уровня модуля)
+        items: Аргументы вызовов
+        window: Наибольшее число задач в обработке
+
+    Yields:
+        Результаты в порядке входных элементов
+    """
+    pending: Deque[Future] = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,218 @@
+"""Потоковый режим JSON Lines: запросы из stdin, результаты в stdout.
+
+Каждая строка входа - JSON-объект запроса::
+
+    {"source": "x * 2", "vars": {"x": "21"}, "precision": 10, "id": 1}
+    {"path": "scripts/area.clc", "vars": {"r": 2}}
+
+На каждый запрос выводится одна строка результата::
+
+    {"id": 1, "value": "42.0000000000", "output": "", "error": null,
+     "timings": {"compile": 0.0, "run": 0.0001}}
+
+Ошибка - объект ``{"type", "message", "line", "column"}``, где type -
+``"request"``, ``"syntax"`` или ``"runtime"`` (в том числе исключения, не
+относящиеся к DSL, например ``RecursionError`` или ошибка функции хоста:
+сообщение - тип и текст исключения). Парсер строится один раз на
+процесс, скомпилированные программы хранятся в LRU-кэше по исходному коду.
+Ввод читается блоками; результаты всех строк блока записываются одной
+операцией, поэтому интерактивный клиент получает ответ сразу, а при
+потоке из миллионов строк запись не становится узким местом.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal, InvalidOperation
+import json
+import time
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+
+from lark.exceptions import LarkError, UnexpectedInput
+
+from interpreter import DSLError, ExecutionState
+from memo import CallMemo
+from numeric import DecimalBackend
+from output import ListSink
+from program import Program, Snapshot
+
+# Размер блока чтения входа
+_READ_SIZE = 1 << 16
+
+
+class _RequestError(ValueError):
+    """Некорректный запрос."""
+
+
+class JsonlSession:
+    """Обработка запросов JSON Lines с кэшем скомпилированных программ."""
+
+    def __init__(
+        self,
+        cache_size: int = 256,
+        base_env: Optional[Dict[str, Any]] = None,
+        prelude: Optional[Snapshot] = None,
+    ) -> None:
+        """Создать сессию.
+
+        Args:
+            cache_size: Размер LRU-кэша скомпилированных программ
+            base_env: Переменные, общие для всех запросов
+            prelude: Снимок прелюдии, с которого начинается каждый запрос
+        """
+        self._programs = CallMemo(cache_size)
+        self._prelude = prelude
+        self._base_env = dict(base_env or {})
+
+    def handle(self, request: Any) -> Dict[str, Any]:
+        """Выполнить один запрос.
+
+        Args:
+            request: Разобранный JSON запроса
+
+        Returns:
+            Результат в виде JSON-объекта
+        """
+        response: Dict[str, Any] = {}
+        if isinstance(request, dict) and "id" in request:
+            response["id"] = request["id"]
+        response.update(value=None, output="", error=None)
+        timings = {"compile": 0.0, "run": 0.0}
+        try:
+            source, path, env, precision = self._parse_request(request)
+            started = time.perf_counter()
+            program = self._programs.call((source, path), Program.compile, (source, None, path))
+            timings["compile"] = round(time.perf_counter() - started, 6)
+        except _RequestError as exc:
+            response["error"] = _error("request", str(exc))
+        except UnexpectedInput as exc:
+            message = str(exc).splitlines()[0]
+            response["error"] = _error("syntax", message, exc.line, exc.column)
+        except LarkError as exc:
+            response["error"] = _error("syntax", str(exc).splitlines()[0])
+        except Exception as exc:  # pylint: disable=broad-except
+            # Например, RecursionError для слишком глубокой вложенности
+            response["error"] = _error("syntax", f"{type(exc).__name__}: {exc}")
+        else:
+            if self._prelude is not None:
+                state = self._prelude.fork(env)
+                if precision is not None:
+                    state.backend.precision = precision
+            else:
+                backend = DecimalBackend(precision) if precision is not None else DecimalBackend()
+                state = ExecutionState(env=env, backend=backend)
+            output = ListSink()
+            started = time.perf_counter()
+            try:
+                value = program.run(state, output=output)
+                if value is not None:
+                    response["value"] = state.format(value)
+            except DSLError as exc:
+                response["error"] = _error("runtime", exc.message, exc.line, exc.column)
+            except Exception as exc:  # pylint: disable=broad-except
+                # Одна ошибка не должна обрывать поток остальных запросов
+                response["error"] = _error("runtime", f"{type(exc).__name__}: {exc}")
+            timings["run"] = round(time.perf_counter() - started, 6)
+            response["output"] = output.getvalue()
+        response["timings"] = timings
+        return response
+
+    def _parse_request(
+        self, request: Any
+    ) -> tuple[str, Optional[str], Dict[str, Any], Optional[int]]:
+        if not isinstance(request, dict):
+            raise _RequestError("Request must be a JSON object")
+        path = None
+        if isinstance(request.get("source"), str):
+            source = request["source"]
+        elif isinstance(request.get("path"), str):
+            path = request["path"]
+            try:
+                with open(path, encoding="utf-8") as stream:
+                    source = stream.read()
+            except (OSError, UnicodeDecodeError) as exc:
+                raise _RequestError(f"Cannot read script: {exc}") from exc
+        else:
+            raise _RequestError("Request needs source or path")
+
+        env = dict(self._base_env)
+        variables = request.get("vars") or {}
+        if not isinstance(variables, dict):
+            raise _RequestError("vars must be an object")
+        for name, raw in variables.items():
+            if isinstance(raw, bool) or not isinstance(raw, (str, int, float)):
+                raise _RequestError(f"Invalid numeric value for {name}: {raw!r}")
+            try:
+                env[name] = Decimal(str(raw))
+            except InvalidOperation as exc:
+                raise _RequestError(f"Invalid numeric value for {name}: {raw}") from exc
+
+        precision = request.get("precision")
+        if precision is not None and (
+            isinstance(precision, bool) or not isinstance(precision, int) or precision < 0
+        ):
+            raise _RequestError("precision must be an integer >= 0")
+        return source, path, env, precision
+
+    def handle_line(self, line: bytes) -> Dict[str, Any]:
+        """Разобрать строку входа и выполнить запрос."""
+        try:
+            request = json.loads(line)
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            return {
+                "value": None,
+                "output": "",
+                "error": _error("request", f"Invalid JSON: {exc}"),
+                "timings": {"compile": 0.0, "run": 0.0},
+            }
+        return self.handle(request)
+
+    def serve(self, source: BinaryIO, sink: BinaryIO) -> int:
+        """Обработать все запросы входного потока.
+
+        Args:
+            source: Двоичный поток запросов (например, ``sys.stdin.buffer``)
+            sink: Двоичный поток результатов (например, ``sys.stdout.buffer``)
+
+        Returns:
+            Число запросов, завершившихся ошибкой
+        """
+        errors = 0
+        for lines in _read_blocks(source):
+            results = []
+            for line in lines:
+                if not line.strip():
+                    continue
+                response = self.handle_line(line)
+                if response["error"] is not None:
+                    errors += 1
+                results.append(json.dumps(response, ensure_ascii=False).encode("utf-8"))
+            if results:
+                results.append(b"")
+                sink.write(b"\n".join(results))
+                sink.flush()
+        return errors
+
+
+def _error(
+    kind: str, message: str, line: Optional[int] = None, column: Optional[int] = None
+) -> Dict[str, Any]:
+    return {"type": kind, "message": message, "line": line, "column": column}
+
+
+def _read_blocks(source: BinaryIO) -> Iterator[list[bytes]]:
+    """Читать вход блоками; выдавать полные строки каждого блока.
+
+    ``read1`` возвращает то, что уже доступно, не дожидаясь заполнения
+    блока, поэтому одиночный запрос обрабатывается без задержки.
+    """
+    read = getattr(source, "read1", source.read)
+    tail = b""
+    while True:
+        block = read(_READ_SIZE)
+        if not block:
+            break
+        lines = (tail + block).split(b"\n")
+        tail = lines.pop()
+        yield lines
+    if tail.strip():
+        yield [tail]
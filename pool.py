@@ -0,0 +1,210 @@
+"""Пул заранее созданных интерпретаторов.
+
+Интерпретатор нельзя просто переиспользовать между запросами: переменные,
+точность и стек циклов одного запроса видны следующему. ``InterpreterPool``
+создаёт интерпретаторы заранее, выдаёт их по одному и при возврате
+восстанавливает состояние через ``Interpreter.reset()`` - за время,
+пропорциональное числу изменённых переменных.
+
+Пример:
+    pool = InterpreterPool(size=4, initial_env={"rate": Decimal("0.2")})
+    with pool.lease(timeout=1.0) as interp:
+        interp.set_variable("x", Decimal(10))
+        interp.execute("x * rate")
+"""
+
+from __future__ import annotations
+
+import contextlib
+from dataclasses import dataclass
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from interpreter import Interpreter
+
+
+class PoolTimeout(TimeoutError):
+    """Свободный интерпретатор не появился за отведённое время."""
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """Метрики пула.
+
+    Attributes:
+        size: Число интерпретаторов в пуле
+        in_use: Сколько выдано сейчас
+        acquired: Сколько раз интерпретатор был выдан
+        timeouts: Сколько запросов не дождались интерпретатора
+        wait_total: Суммарное время ожидания (секунды)
+        wait_max: Наибольшее время ожидания (секунды)
+        busy_time: Суммарное время, пока интерпретаторы были выданы (секунды)
+        uptime: Время с создания пула (секунды)
+    """
+
+    size: int
+    in_use: int
+    acquired: int
+    timeouts: int
+    wait_total: float
+    wait_max: float
+    busy_time: float
+    uptime: float
+
+    @property
+    def utilization(self) -> float:
+        """Доля времени, когда интерпретаторы пула были заняты (0..1)."""
+        capacity = self.size * self.uptime
+        return self.busy_time / capacity if capacity > 0 else 0.0
+
+    @property
+    def wait_mean(self) -> float:
+        """Среднее время ожидания интерпретатора (секунды)."""
+        return self.wait_total / self.acquired if self.acquired else 0.0
+
+
+class InterpreterPool:
+    """Ограниченный пул интерпретаторов с дешёвым сбросом состояния."""
+
+    def __init__(
+        self,
+        size: int = 4,
+        initial_env: Optional[Dict[str, Any]] = None,
+        factory: Optional[Callable[[], Interpreter]] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Создать пул и все его интерпретаторы.
+
+        Args:
+            size: Число интерпретаторов (больше 0)
+            initial_env: Переменные, с которых начинается каждый запрос
+            factory: Создание интерпретатора (по умолчанию ``Interpreter``
+                с initial_env); состояние после создания - базовое для сброса
+            timeout: Время ожидания acquire() по умолчанию (None - без ограничения)
+
+        Raises:
+            ValueError: Если size не положителен
+        """
+        if size <= 0:
+            raise ValueError("pool size must be positive")
+        if factory is None:
+            factory = functools.partial(Interpreter, initial_env=dict(initial_env or {}))
+        self._size = size
+        self._timeout = timeout
+        self._idle: list[Interpreter] = []
+        for _ in range(size):
+            interpreter = factory()
+            interpreter.checkpoint()
+            self._idle.append(interpreter)
+        self._leased: Dict[int, float] = {}  # id(интерпретатора) -> время выдачи
+        self._available = threading.Condition()
+        self._created = time.monotonic()
+        self._acquired = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._busy_time = 0.0
+
+    @property
+    def size(self) -> int:
+        """Число интерпретаторов в пуле."""
+        return self._size
+
+    def acquire(self, timeout: Optional[float] = None) -> Interpreter:
+        """Получить свободный интерпретатор.
+
+        Args:
+            timeout: Наибольшее время ожидания (по умолчанию - таймаут пула)
+
+        Returns:
+            Интерпретатор в базовом состоянии
+
+        Raises:
+            PoolTimeout: Если за timeout ни один интерпретатор не освободился
+        """
+        if timeout is None:
+            timeout = self._timeout
+        started = time.monotonic()
+        with self._available:
+            if not self._available.wait_for(lambda: self._idle, timeout):
+                self._timeouts += 1
+                raise PoolTimeout(f"No interpreter available within {timeout:g}s")
+            interpreter = self._idle.pop()
+            now = time.monotonic()
+            waited = now - started
+            self._acquired += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            self._leased[id(interpreter)] = now
+        return interpreter
+
+    def release(self, interpreter: Interpreter) -> None:
+        """Вернуть интерпретатор в пул, сбросив его состояние.
+
+        Args:
+            interpreter: Интерпретатор, полученный из acquire()
+
+        Raises:
+            ValueError: Если интерпретатор не выдан этим пулом
+        """
+        with self._available:
+            leased_at = self._leased.pop(id(interpreter), None)
+            if leased_at is None:
+                raise ValueError("interpreter does not belong to this pool")
+        interpreter.reset()
+        with self._available:
+            self._busy_time += time.monotonic() - leased_at
+            self._idle.append(interpreter)
+            self._available.notify()
+
+    @contextlib.contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[Interpreter]:
+        """Выдать интерпретатор на время блока ``with`` и затем вернуть его."""
+        interpreter = self.acquire(timeout)
+        try:
+            yield interpreter
+        finally:
+            self.release(interpreter)
+
+    def execute(
+        self,
+        text: str,
+        env: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """Выполнить программу на свободном интерпретаторе пула.
+
+        Args:
+            text: Исходный код программы
+            env: Переменные этого запроса
+            timeout: Наибольшее время ожидания интерпретатора
+
+        Returns:
+            Результат последнего выражения или None
+
+        Raises:
+            PoolTimeout: Если свободный интерпретатор не появился за timeout
+            DSLError: Ошибка выполнения программы
+        """
+        with self.lease(timeout) as interpreter:
+            for name, value in (env or {}).items():
+                interpreter.set_variable(name, value)
+            return interpreter.execute(text)
+
+    def stats(self) -> PoolStats:
+        """Текущие метрики пула."""
+        with self._available:
+            now = time.monotonic()
+            busy = self._busy_time + sum(now - leased_at for leased_at in self._leased.values())
+            return PoolStats(
+                size=self._size,
+                in_use=len(self._leased),
+                acquired=self._acquired,
+                timeouts=self._timeouts,
+                wait_total=self._wait_total,
+                wait_max=self._wait_max,
+                busy_time=busy,
+                uptime=now - self._created,
+            )
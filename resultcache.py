@@ -0,0 +1,250 @@
+"""Дисковый кэш результатов детерминированных скриптов.
+
+Результат скрипта без ``import`` и функций хоста зависит только от исходного
+кода, переменных запуска и начальной точности. ``ResultCache`` хранит
+итоговое значение (уже отформатированное) и вывод ``print`` в каталоге на
+диске, по одному JSON-файлу на запуск. Ключ - хэш исходного кода,
+нормализованных переменных, точности и «версии» интерпретатора (хэш
+грамматики и модулей вычислителя), поэтому после изменения интерпретатора
+старые записи просто перестают находиться.
+
+Запись атомарна (временный файл и ``os.replace``), поэтому несколько
+процессов могут одновременно читать и писать один каталог: читатель видит
+либо старую запись, либо новую целиком. Повреждённые записи считаются
+промахом. Размер каталога ограничен: при превышении удаляются записи,
+к которым дольше всего не обращались (время изменения файла обновляется
+при каждом попадании).
+
+Пример:
+    cache = ResultCache(".calc-cache")
+    result = cache.execute("x * 2", {"x": Decimal(21)})
+    result.value, result.hit       # ('42.0000000000', False)
+"""
+
+from __future__ import annotations
+
+import contextlib
+from dataclasses import dataclass
+import functools
+import hashlib
+import json
+import os
+import random
+from pathlib import Path
+import re
+import tempfile
+from typing import Any, Mapping, Optional
+
+from interpreter import Interpreter
+from numeric import DecimalBackend
+from output import ListSink
+
+# Формат записи; меняется при несовместимом изменении структуры файла
+CACHE_FORMAT = 1
+# Размер кэша по умолчанию
+DEFAULT_MAX_BYTES = 64 << 20
+# Переменная окружения с каталогом кэша для cli.py
+CACHE_DIR_ENV = "CALC_DSL_CACHE_DIR"
+
+# Файлы, от которых зависит результат выполнения программы
+# (в том числе форматирование и вывод print: bigformat.py, output.py)
+_ENGINE_FILES = (
+    "grammar.lark",
+    "interpreter.py",
+    "numeric.py",
+    "decmath.py",
+    "functions.py",
+    "bigformat.py",
+    "output.py",
+)
+# Скрипт с import зависит от файлов модулей: такие результаты не кэшируются
+_IMPORT_RE = re.compile(r'\bimport\s*"')
+# Как часто (в записях) проверять размер каталога
+_EVICT_EVERY = 64
+
+
+@dataclass(frozen=True)
+class CachedResult:
+    """Результат запуска из кэша или после выполнения.
+
+    Attributes:
+        value: Отформатированный результат последнего выражения или None
+        output: Вывод print
+        hit: Результат взят из кэша
+    """
+
+    value: Optional[str]
+    output: str
+    hit: bool
+
+
+@functools.lru_cache(maxsize=None)
+def engine_version() -> str:
+    """Хэш грамматики и модулей вычислителя (версия интерпретатора для ключа)."""
+    digest = hashlib.sha256(str(CACHE_FORMAT).encode())
+    root = Path(__file__).resolve().parent
+    for name in _ENGINE_FILES:
+        digest.update(name.encode())
+        digest.update((root / name).read_bytes())
+    return digest.hexdigest()
+
+
+def cacheable(source: str) -> bool:
+    """Результат программы определяется исходным кодом, переменными и точностью."""
+    return _IMPORT_RE.search(source) is None
+
+
+class ResultCache:
+    """Каталог с результатами запусков, ограниченный по размеру."""
+
+    def __init__(self, directory: str | Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """Открыть (или создать) каталог кэша.
+
+        Args:
+            directory: Каталог кэша
+            max_bytes: Наибольший суммарный размер записей
+
+        Raises:
+            ValueError: Если max_bytes не положителен
+        """
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self._directory = Path(directory)
+        self._max_bytes = max_bytes
+        # Случайный сдвиг: процесс CLI обычно пишет одну запись, и каталог
+        # просматривается в среднем раз в _EVICT_EVERY записей всех процессов
+        self._writes = random.randrange(_EVICT_EVERY)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def directory(self) -> Path:
+        """Каталог кэша."""
+        return self._directory
+
+    def key(self, source: str, env: Optional[Mapping[str, Any]], precision: int) -> str:
+        """Ключ запуска.
+
+        Args:
+            source: Исходный код
+            env: Переменные запуска (порядок не важен)
+            precision: Начальная точность
+
+        Returns:
+            Шестнадцатеричный хэш
+        """
+        # Тип - часть ключа: Decimal("1.0") и 1.0 интерпретатор выводит по-разному
+        variables = sorted(
+            (name, type(value).__name__, str(value)) for name, value in (env or {}).items()
+        )
+        source_hash = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        payload = json.dumps(
+            [engine_version(), source_hash, variables, precision], separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self._directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        """Запись по ключу или None (нет записи или она повреждена)."""
+        path = self._path(key)
+        try:
+            data = json.loads(path.read_bytes())
+            result = CachedResult(data["value"], data["output"], hit=True)
+        except (OSError, ValueError, KeyError, TypeError):
+            self.misses += 1
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(path)  # отметка использования для вытеснения
+        self.hits += 1
+        return result
+
+    def put(self, key: str, value: Optional[str], output: str) -> None:
+        """Атомарно записать результат; ошибки файловой системы игнорируются."""
+        path = self._path(key)
+        data = json.dumps({"value": value, "output": output}, ensure_ascii=False)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            descriptor, temporary = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(descriptor, "w", encoding="utf-8") as stream:
+                    stream.write(data)
+                os.replace(temporary, path)
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    os.unlink(temporary)
+                raise
+        except OSError:
+            return
+        self._writes += 1
+        if self._writes % _EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self) -> int:
+        """Удалить давно не использованные записи сверх max_bytes.
+
+        Returns:
+            Число удалённых записей
+        """
+        entries = []
+        total = 0
+        for path in self._directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # удалена другим процессом
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+            total += stat.st_size
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self._max_bytes:
+                break
+            with contextlib.suppress(OSError):
+                path.unlink()
+                removed += 1
+            total -= size
+        return removed
+
+    def clear(self) -> None:
+        """Удалить все записи."""
+        for path in self._directory.glob("*/*.json"):
+            with contextlib.suppress(OSError):
+                path.unlink()
+
+    def execute(
+        self,
+        source: str,
+        env: Optional[Mapping[str, Any]] = None,
+        precision: Optional[int] = None,
+    ) -> CachedResult:
+        """Результат программы из кэша или после выполнения.
+
+        Ошибки не кэшируются; программы с ``import`` выполняются всегда.
+
+        Args:
+            source: Исходный код
+            env: Переменные запуска
+            precision: Начальная точность (по умолчанию - точность DecimalBackend)
+
+        Returns:
+            Отформатированный результат и вывод print
+
+        Raises:
+            DSLError: Ошибка выполнения
+            lark.exceptions.LarkError: Синтаксическая ошибка
+        """
+        backend = DecimalBackend(precision) if precision is not None else DecimalBackend()
+        key = self.key(source, env, backend.precision) if cacheable(source) else None
+        if key is not None:
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+        output = ListSink()
+        interpreter = Interpreter(initial_env=dict(env or {}), backend=backend, output=output)
+        value = interpreter.execute(source)
+        formatted = interpreter.format_value(value) if value is not None else None
+        if key is not None:
+            self.put(key, formatted, output.getvalue())
+        return CachedResult(formatted, output.getvalue(), hit=False)
@@ -0,0 +1,414 @@
+"""Сервер вычислений с тёплыми скомпилированными программами.
+
+Запрос - JSON-объект::
+
+    {"script": "x * 2", "overrides": {"x": "21"}, "precision": 10}
+    {"script_id": "5f1c...", "overrides": {"x": 3}}
+
+Программа компилируется один раз и хранится в LRU-кэше по ``script_id``
+(хэш исходного кода); следующие запросы могут передавать только
+``script_id``. Запросы выполняются в пуле рабочих процессов, каждый из
+которых держит свой кэш десериализованных программ; сериализованная
+программа передаётся процессу, только если её нет в его кэше. Время выполнения
+ограничено: программа прерывается на ближайшей итерации цикла после
+истечения ``timeout``. Если рабочий процесс не ответил и после этого
+(долгое вычисление без циклов), пул процессов заменяется новым, а старые
+процессы завершаются: иначе зависший процесс занимал бы место в пуле.
+
+Ответ::
+
+    {"script_id": "...", "result": "42.0000000000", "error": null,
+     "output": "", "seconds": 0.0004}
+
+Транспорт - HTTP на localhost (``POST /eval``, ``GET /health``) или
+Unix-сокет (по одному JSON-объекту на строку в обе стороны).
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from decimal import Decimal, InvalidOperation
+import hashlib
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import pickle
+import socketserver
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from lark.exceptions import LarkError
+
+from interpreter import DSLError, ExecutionState
+from memo import CallMemo
+from numeric import DecimalBackend
+from output import ListSink
+from program import Program
+
+# Запас времени сверх timeout на передачу запроса и ответа между процессами
+_TIMEOUT_GRACE = 1.0
+# Наибольший размер тела HTTP-запроса
+_MAX_BODY = 1 << 20
+# Наибольшая точность, которую можно запросить
+MAX_PRECISION = 1000
+
+
+class EvaluationTimeout(DSLError):
+    """Выполнение программы превысило отведённое время."""
+
+
+class RequestError(ValueError):
+    """Некорректный запрос к серверу.
+
+    Attributes:
+        status: HTTP-статус ответа
+    """
+
+    def __init__(self, message: str, status: HTTPStatus = HTTPStatus.BAD_REQUEST) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+# Кэш программ рабочего процесса: script_id -> Program
+_WORKER_PROGRAMS: Optional[CallMemo] = None
+
+
+class _ProgramMissing(Exception):
+    """Рабочему процессу нужна сериализованная программа: её нет в его кэше."""
+
+
+def _init_worker(cache_size: int) -> None:
+    global _WORKER_PROGRAMS  # pylint: disable=global-statement
+    _WORKER_PROGRAMS = CallMemo(cache_size)
+
+
+def _evaluate(
+    script_id: str,
+    blob: Optional[bytes],
+    overrides: Dict[str, Decimal],
+    precision: Optional[int],
+    timeout: float,
+) -> Tuple[HTTPStatus, Dict[str, Any]]:
+    """Выполнить программу в рабочем процессе.
+
+    Raises:
+        _ProgramMissing: blob не передан, а программы нет в кэше процесса
+    """
+    assert _WORKER_PROGRAMS is not None
+    program: Optional[Program] = _WORKER_PROGRAMS.get(script_id)
+    if program is None:
+        if blob is None:
+            raise _ProgramMissing(script_id)
+        program = pickle.loads(blob)
+        _WORKER_PROGRAMS.put(script_id, program)
+    started = time.perf_counter()
+    deadline = time.monotonic() + timeout
+
+    def step() -> None:
+        if time.monotonic() > deadline:
+            raise EvaluationTimeout(f"Evaluation timed out after {timeout:g}s")
+
+    backend = DecimalBackend(precision) if precision is not None else DecimalBackend()
+    state = ExecutionState(env=dict(overrides), backend=backend)
+    output = ListSink()
+    status = HTTPStatus.OK
+    result: Optional[str] = None
+    error: Optional[str] = None
+    try:
+        value = program.run(state, step=step, output=output)
+        result = state.format(value) if value is not None else None
+    except EvaluationTimeout as exc:
+        status, error = HTTPStatus.GATEWAY_TIMEOUT, str(exc)
+    except DSLError as exc:
+        error = str(exc)
+    except Exception as exc:  # pylint: disable=broad-except
+        # RecursionError, ошибки функций хоста и т.п.: ответ нужен всё равно
+        status, error = HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(exc).__name__}: {exc}"
+    return status, {
+        "script_id": script_id,
+        "result": result,
+        "error": error,
+        "output": output.getvalue(),
+        "seconds": round(time.perf_counter() - started, 6),
+    }
+
+
+def script_id_for(source: str) -> str:
+    """Идентификатор программы: хэш исходного кода."""
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:32]
+
+
+class EvaluationService:
+    """Кэш программ и пул процессов, обслуживающие запросы."""
+
+    def __init__(self, jobs: int = 1, cache_size: int = 128, timeout: float = 5.0) -> None:
+        """Создать сервис и запустить рабочие процессы.
+
+        Args:
+            jobs: Число рабочих процессов
+            cache_size: Размер LRU-кэша скомпилированных программ
+            timeout: Время выполнения запроса по умолчанию (секунды)
+        """
+        self._timeout = timeout
+        self._jobs = jobs
+        self._cache_size = cache_size
+        self._programs = CallMemo(cache_size)
+        self._lock = threading.Lock()
+        self._pool_lock = threading.Lock()
+        self._executor = self._start_pool()
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self._jobs, initializer=_init_worker, initargs=(self._cache_size,)
+        )
+
+    def _recycle(self, executor: ProcessPoolExecutor) -> None:
+        """Заменить пул, в котором процесс не уложился во время, и завершить его процессы.
+
+        ``Future.cancel`` не останавливает уже выполняющуюся задачу. Другие
+        запросы, выполнявшиеся в старом пуле, получают ``BrokenProcessPool``
+        и повторяются в новом.
+        """
+        with self._pool_lock:
+            if self._executor is not executor:
+                return  # пул уже заменён из-за другого запроса
+            self._executor = self._start_pool()
+        processes = executor._processes or {}  # pylint: disable=protected-access
+        for process in list(processes.values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def close(self) -> None:
+        """Остановить рабочие процессы."""
+        with self._pool_lock:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "EvaluationService":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def handle(self, request: Any) -> Tuple[HTTPStatus, Dict[str, Any]]:
+        """Обработать запрос.
+
+        Args:
+            request: Разобранный JSON запроса
+
+        Returns:
+            HTTP-статус и JSON ответа; ошибки DSL возвращаются со статусом 200
+            в поле error, ошибки запроса - с кодом 4xx, превышение времени - 504,
+            повторная потеря пула из-за чужих зависших запросов - 503, прочие
+            исключения - 500
+        """
+        try:
+            script_id, blob, overrides, precision, timeout = self._prepare(request)
+        except RequestError as exc:
+            return exc.status, {"error": str(exc)}
+        except Exception as exc:  # pylint: disable=broad-except
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(exc).__name__}: {exc}"}
+        try:
+            return self._submit(script_id, blob, overrides, precision, timeout)
+        except Exception as exc:  # pylint: disable=broad-except
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {
+                "script_id": script_id,
+                "error": f"{type(exc).__name__}: {exc}",
+            }
+
+    def _submit(
+        self,
+        script_id: str,
+        blob: bytes,
+        overrides: Dict[str, Decimal],
+        precision: Optional[int],
+        timeout: float,
+    ) -> Tuple[HTTPStatus, Dict[str, Any]]:
+        # Сначала без программы: обычно она уже в кэше рабочего процесса
+        send: Optional[bytes] = None
+        attempts = 2
+        while attempts:
+            with self._pool_lock:
+                executor = self._executor
+                future = executor.submit(
+                    _evaluate, script_id, send, overrides, precision, timeout
+                )
+            try:
+                return future.result(timeout=timeout + _TIMEOUT_GRACE)
+            except _ProgramMissing:
+                send = blob
+            except FutureTimeout:
+                self._recycle(executor)
+                return HTTPStatus.GATEWAY_TIMEOUT, {
+                    "script_id": script_id,
+                    "error": f"Evaluation timed out after {timeout:g}s",
+                }
+            except (BrokenProcessPool, CancelledError):
+                attempts -= 1  # пул заменён из-за другого запроса: повторить в новом
+        return HTTPStatus.SERVICE_UNAVAILABLE, {
+            "script_id": script_id,
+            "error": "Worker pool restarted, retry the request",
+        }
+
+    def _prepare(self, request: Any) -> Tuple[str, bytes, Dict[str, Decimal], Optional[int], float]:
+        if not isinstance(request, dict):
+            raise RequestError("Request must be a JSON object")
+        if "script" in request:
+            source = request["script"]
+            if not isinstance(source, str):
+                raise RequestError("script must be a string")
+            script_id = script_id_for(source)
+            with self._lock:
+                blob = self._programs.get(script_id)
+            if blob is None:
+                # Компиляция - без блокировки: медленная программа не задерживает другие запросы
+                blob = _compile(source)
+                with self._lock:
+                    self._programs.put(script_id, blob)
+        elif "script_id" in request:
+            script_id = str(request["script_id"])
+            with self._lock:
+                blob = self._programs.get(script_id)
+            if blob is None:
+                raise RequestError(f"Unknown script_id: {script_id}", HTTPStatus.NOT_FOUND)
+        else:
+            raise RequestError("Request needs script or script_id")
+
+        raw_overrides = request.get("overrides") or {}
+        if not isinstance(raw_overrides, dict):
+            raise RequestError("overrides must be an object")
+        overrides: Dict[str, Decimal] = {}
+        for name, raw in raw_overrides.items():
+            if isinstance(raw, bool) or not isinstance(raw, (str, int, float)):
+                raise RequestError(f"Invalid numeric value for {name}: {raw!r}")
+            try:
+                overrides[name] = Decimal(str(raw))
+            except InvalidOperation as exc:
+                raise RequestError(f"Invalid numeric value for {name}: {raw}") from exc
+
+        precision = request.get("precision")
+        if precision is not None and (
+            isinstance(precision, bool)
+            or not isinstance(precision, int)
+            or not 0 <= precision <= MAX_PRECISION
+        ):
+            raise RequestError(f"precision must be an integer from 0 to {MAX_PRECISION}")
+        timeout = request.get("timeout", self._timeout)
+        if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+            raise RequestError("timeout must be a positive number")
+        return script_id, blob, overrides, precision, min(float(timeout), self._timeout)
+
+
+def _compile(source: str) -> bytes:
+    """Скомпилировать программу и сериализовать её для рабочих процессов."""
+    try:
+        program = Program.compile(source)
+        return pickle.dumps(program, protocol=pickle.HIGHEST_PROTOCOL)
+    except LarkError as exc:
+        raise RequestError(f"Syntax error: {str(exc).splitlines()[0]}") from exc
+    except RecursionError as exc:
+        raise RequestError("Program is too deeply nested") from exc
+
+
+def _parse_json(data: bytes) -> Any:
+    try:
+        return json.loads(data)
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise RequestError(f"Invalid JSON: {exc}") from exc
+
+
+class _HTTPHandler(BaseHTTPRequestHandler):
+    server: "_HTTPServer"
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        if self.path == "/health":
+            self._reply(HTTPStatus.OK, {"status": "ok"})
+        else:
+            self._reply(HTTPStatus.NOT_FOUND, {"error": f"Not found: {self.path}"})
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        if self.path != "/eval":
+            self._reply(HTTPStatus.NOT_FOUND, {"error": f"Not found: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._reply(HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length"})
+            return
+        if length > _MAX_BODY:
+            self._reply(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Request too large"})
+            return
+        try:
+            request = _parse_json(self.rfile.read(length))
+        except RequestError as exc:
+            self._reply(exc.status, {"error": str(exc)})
+            return
+        self._reply(*self.server.service.handle(request))
+
+    def _reply(self, status: HTTPStatus, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=redefined-builtin
+        pass  # журнал запросов не нужен: сервер работает под нагрузкой
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: EvaluationService) -> None:
+        super().__init__(address, _HTTPHandler)
+        self.service = service
+
+
+class _UnixHandler(socketserver.StreamRequestHandler):
+    server: "_UnixServer"
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                status, payload = self.server.service.handle(_parse_json(line))
+            except RequestError as exc:
+                status, payload = exc.status, {"error": str(exc)}
+            payload = {"status": int(status), **payload}
+            self.wfile.write(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, service: EvaluationService) -> None:
+        super().__init__(path, _UnixHandler)
+        self.service = service
+
+
+def make_server(
+    service: EvaluationService,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    unix_path: Optional[str] = None,
+) -> socketserver.BaseServer:
+    """Создать HTTP-сервер на localhost или сервер на Unix-сокете.
+
+    Args:
+        service: Сервис, обрабатывающий запросы
+        host: Адрес HTTP-сервера
+        port: Порт HTTP-сервера (0 - любой свободный)
+        unix_path: Путь Unix-сокета; если задан, HTTP не используется
+
+    Returns:
+        Сервер; запуск - ``serve_forever()``
+    """
+    if unix_path is not None:
+        return _UnixServer(unix_path, service)
+    return _HTTPServer((host, port), service)
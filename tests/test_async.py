@@ -0,0 +1,112 @@
+"""Тесты для кооперативного выполнения в asyncio."""
+
+import asyncio
+from decimal import Decimal
+import time
+
+import pytest
+
+from interpreter import DivisionByZeroError, Interpreter
+from program import Program
+
+LONG = "s = 0\nfor i in 1 .. 100000 (s += i)\ns"
+
+
+def test_execute_async_result():
+    """Результат совпадает с синхронным выполнением; состояние сохраняется."""
+    interp = Interpreter()
+    result = asyncio.run(interp.execute_async("x = 0\nfor i in 1 .. 50 (x += i)\nx", yield_every=7))
+    assert result == Decimal(1275)
+    assert interp.execute("x") == Decimal(1275)
+    assert interp._step_hook is None
+
+
+def test_execute_async_errors():
+    """Ошибки DSL пробрасываются как при синхронном выполнении."""
+    with pytest.raises(DivisionByZeroError):
+        asyncio.run(Interpreter().execute_async("for i in 1 .. 10 (1 / (i - 5))", yield_every=2))
+    with pytest.raises(ValueError):
+        asyncio.run(Interpreter().execute_async("1", yield_every=0))
+
+
+def test_other_coroutines_keep_running():
+    """Пока выполняется длинный цикл, другие корутины получают управление."""
+
+    async def main():
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        await Interpreter().execute_async("s = 0\nfor i in 1 .. 3000 (s += i)\ns", yield_every=100)
+        task.cancel()
+        return ticks
+
+    ticks = asyncio.run(main())
+    assert len(ticks) >= 30
+
+
+def test_yields_between_top_level_statements():
+    """Программа без циклов уступает управление перед каждым оператором верхнего уровня."""
+    source = "\n".join(f"x{i} = sqrt({i} + 2)" for i in range(40))
+
+    async def main():
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(None)
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        result = await Interpreter().execute_async(source + "\nx39 * 0", yield_every=1)
+        task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(main())
+    assert result == 0
+    assert len(ticks) >= 40
+
+    steps = []
+    Program.compile("a = 1\nb = a + 1\nb * 3").run(step=lambda: steps.append(None))
+    assert len(steps) == 3
+    Program.compile("2 + 2").run(step=lambda: steps.append(None))
+    assert len(steps) == 4
+
+
+@pytest.mark.parametrize("method", ["execute_async", "execute_in_thread"])
+def test_cancellation_restores_state(method):
+    """Отмена прерывает выполнение и возвращает состояние к исходному."""
+    interp = Interpreter(initial_env={"s": Decimal(7)})
+
+    async def main():
+        task = asyncio.create_task(
+            getattr(interp, method)("set_precision(3)\n" + LONG.replace("s = 0\n", ""))
+        )
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert interp._loop_stack == []
+    assert interp._step_hook is None
+    assert interp.precision == 10
+    assert interp.execute("s") == Decimal(7)
+    with pytest.raises(Exception, match="Variable not found: i"):
+        interp.execute("i")
+
+
+def test_execute_in_thread_result():
+    """Вариант с потоком возвращает результат, не блокируя цикл событий."""
+
+    async def main():
+        return await asyncio.gather(
+            Interpreter().execute_in_thread("2 * 512"),
+            Interpreter().execute_in_thread("sqrt(16)"),
+        )
+
+    assert asyncio.run(main()) == [Decimal(1024), Decimal(4)]
@@ -0,0 +1,177 @@
+"""Тесты для пакетного вычисления над массивами NumPy."""
+
+from decimal import ROUND_HALF_UP, Decimal
+
+import pytest
+
+from interpreter import DivisionByZeroError, DSLError, Interpreter
+from numeric import FloatBackend
+
+np = pytest.importorskip("numpy")
+
+
+def rows_reference(source, inputs):
+    """Результаты построчного вычисления отдельными интерпретаторами."""
+    size = len(next(iter(inputs.values())))
+    results = []
+    for index in range(size):
+        env = {name: Decimal(str(values[index])) for name, values in inputs.items()}
+        results.append(Interpreter(initial_env=env).execute(source))
+    return results
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "x * 2 + 1",
+        "x ** 2 - 3 * x mod 4",
+        "y = x * x\ny + 1 if x > 0 else -y",
+        "sin(x) + cos(x) * tg(x / 3) - sqrt(x * x + 1)",
+        "nrt(x, 3) + log2(x * x + 1) + log10(x * x + 2)",
+        "1 if x > 0 and not x > 2 or x < -2 else 0",
+        "(a = x + pi; a += e; a / 2)",
+    ],
+)
+def test_vectorized_matches_rows(source):
+    """Векторизованный путь совпадает с построчным вычислением."""
+    inputs = {"x": np.linspace(-3, 3, 13)}
+    result = Interpreter().evaluate_batch(source, inputs)
+    assert result.path == "vectorized"
+    assert result.reason is None
+    expected = rows_reference(source, inputs)
+    assert result.values == pytest.approx([float(v) for v in expected], abs=1e-9)
+
+
+@pytest.mark.parametrize(
+    "source, reason",
+    [
+        ("s = 0\nfor i in 1 .. 3 (s += x)\ns", "for_expr is not vectorizable"),
+        ("with precision 2 (x / 3)", "precision_block is not vectorizable"),
+        ("set_precision(3)\nx / 3", "function set_precision is not vectorizable"),
+    ],
+)
+def test_fallback_to_rows(source, reason):
+    """Невекторизуемые программы выполняются построчно; причина сообщается."""
+    inputs = {"x": np.array([1.0, 2.0, 4.0])}
+    interp = Interpreter()
+    result = interp.evaluate_batch(source, inputs)
+    assert result.path == "rows"
+    assert result.reason == reason
+    assert list(result.values) == rows_reference(source, inputs)
+    # Точность интерпретатора не изменилась
+    assert interp.precision == 10
+
+
+def test_fallback_for_host_function():
+    """Функции хоста не векторизуются."""
+    interp = Interpreter()
+    interp.register_function("twice", lambda v: 2 * v, arity=1)
+    result = interp.evaluate_batch("twice(x)", {"x": np.arange(3)})
+    assert result.path == "rows"
+    assert list(result.values) == [Decimal(0), Decimal(2), Decimal(4)]
+
+
+def test_fallback_at_high_precision():
+    """При точности больше 15 знаков float64 недостаточно."""
+    interp = Interpreter()
+    interp.execute("set_precision(20)")
+    result = interp.evaluate_batch("x / 3", {"x": np.array([1])})
+    assert result.path == "rows"
+    assert result.values[0] == Decimal("0.33333333333333333333")
+
+
+@pytest.mark.parametrize(
+    "precision, source, column",
+    [
+        (0, "x / 2", [5, 7, 1, -3, -5]),
+        (1, "x * 3", [0.05, 0.15, 0.35, -0.25]),
+        (2, "x + 0", [1.005, 2.675, -1.005, 0.125]),
+    ],
+)
+def test_rounding_half_up_matches_rows(precision, source, column):
+    """На границах .5 векторизованный путь округляет половину вверх, как бэкенд."""
+    interp = Interpreter()
+    interp.execute(f"set_precision({precision})")
+    inputs = {"x": np.array(column, dtype=float)}
+    result = interp.evaluate_batch(source, inputs)
+    assert result.path == "vectorized"
+    expected = []
+    quantum = Decimal(1).scaleb(-precision)
+    for value in column:
+        # построчный путь округляет входные значения до текущей точности
+        x = Decimal(str(value)).quantize(quantum, rounding=ROUND_HALF_UP)
+        row = Interpreter(initial_env={"x": x})
+        row.execute(f"set_precision({precision})")
+        expected.append(float(row.execute(source)))
+    assert list(result.values) == expected
+
+
+def test_suspect_rows_are_recomputed():
+    """Строки с inf/nan в невыбранной ветке пересчитываются построчно."""
+    inputs = {"x": np.array([-1.0, 0.0, 1.0, np.e])}
+    result = Interpreter().evaluate_batch("ln(x) if x > 0 else 0", inputs)
+    assert result.path == "vectorized"
+    assert result.recomputed == 2
+    assert result.values == pytest.approx([0, 0, 0, 1])
+
+
+def test_large_values_are_recomputed():
+    """Значения, для которых float64 теряет знаки, считаются построчно."""
+    inputs = {"x": np.array([2.0, 3.0])}
+    result = Interpreter().evaluate_batch("3 ** (10 * x) mod 7", inputs)
+    assert result.recomputed == 2
+    assert list(result.values) == [float(pow(3, 20, 7)), float(pow(3, 30, 7))]
+
+
+@pytest.mark.parametrize(
+    "source, error",
+    [("1 / (x - 1)", DivisionByZeroError), ("sqrt(x - 2)", DSLError)],
+)
+def test_errors_are_reported_per_row(source, error):
+    """Ошибка в одной строке сообщается как при обычном выполнении."""
+    with pytest.raises(error) as exc_info:
+        Interpreter().evaluate_batch(source, {"x": np.array([3.0, 1.0])})
+    assert "batch row 1" in exc_info.value.__notes__
+
+
+def test_suspect_row_without_value_raises():
+    """Строка с ошибкой пересчитывается, даже если программа не возвращает значение."""
+    with pytest.raises(DivisionByZeroError):
+        Interpreter().evaluate_batch("y = 1 / x", {"x": np.array([0.0, 1.0])})
+    result = Interpreter().evaluate_batch("y = 1 / x", {"x": np.array([2.0, 1.0])})
+    assert result.path == "vectorized"
+    assert list(result.values) == [None, None]
+
+
+def test_interpreter_env_is_used_and_preserved():
+    """Переменные интерпретатора доступны программе и не меняются."""
+    interp = Interpreter(initial_env={"k": Decimal(10)})
+    result = interp.evaluate_batch("k = k * x\nk", {"x": np.array([1, 2])})
+    assert list(result.values) == [10.0, 20.0]
+    assert interp.execute("k") == Decimal(10)
+
+
+def test_float_backend():
+    """С FloatBackend векторизация работает при любой точности."""
+    interp = Interpreter(backend=FloatBackend())
+    interp.execute("set_precision(17)")
+    result = interp.evaluate_batch("x / 4", {"x": np.array([1.0, 2.0])})
+    assert result.path == "vectorized"
+    assert list(result.values) == [0.25, 0.5]
+
+
+def test_boolean_result():
+    """Результат-сравнение возвращается как массив bool."""
+    result = Interpreter().evaluate_batch("x > 1", {"x": np.array([0, 2])})
+    assert result.values.dtype == bool
+    assert list(result.values) == [False, True]
+
+
+@pytest.mark.parametrize(
+    "inputs",
+    [{}, {"x": np.zeros((2, 2))}, {"x": np.zeros(2), "y": np.zeros(3)}],
+)
+def test_invalid_inputs(inputs):
+    """Некорректные входные массивы отклоняются."""
+    with pytest.raises(ValueError):
+        Interpreter().evaluate_batch("1", inputs)
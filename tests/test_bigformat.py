@@ -0,0 +1,109 @@
+"""Тесты для вычислений с большими числами и их вывода частями."""
+
+from decimal import MAX_EMAX, MAX_PREC, Context, Decimal, ROUND_HALF_UP
+import math
+import random
+
+import pytest
+
+import cli
+from bigformat import decimal_to_int, format_chunks, int_to_decimal
+from interpreter import Interpreter
+from numeric import DecimalBackend
+from output import ListSink
+
+_EXACT = Context(prec=MAX_PREC, Emax=MAX_EMAX)
+
+
+def _reference(value, places):
+    quantum = Decimal(1).scaleb(-places)
+    return format(value.quantize(quantum, rounding=ROUND_HALF_UP, context=_EXACT), f".{places}f")
+
+
+def test_chunks_match_format():
+    """Объединённые части совпадают с format для разных знаков и точностей."""
+    rng = random.Random(7)
+    for _ in range(200):
+        number = rng.randint(-(10 ** rng.randint(0, 500)), 10 ** rng.randint(0, 500))
+        value = Decimal(number).scaleb(-rng.randint(0, 30))
+        places = rng.randint(0, 20)
+        chunks = list(format_chunks(value, places, chunk=16))
+        assert "".join(chunks) == _reference(value, places)
+        assert max(map(len, chunks)) <= 16
+
+
+@pytest.mark.parametrize("text", ["0", "-0.0000000001", "0.5", "-2.5", "1E+5"])
+def test_chunks_edge_values(text):
+    """Ноль, отрицательный ноль, округление и положительный порядок."""
+    for places in (0, 3):
+        assert "".join(format_chunks(Decimal(text), places)) == _reference(Decimal(text), places)
+
+
+def test_conversions_beyond_int_str_limit():
+    """Переводы int <-> Decimal не ограничены sys.set_int_max_str_digits."""
+    number = -(3**40000)  # ~19 тысяч цифр, больше лимита str(int) по умолчанию
+    value = int_to_decimal(number)
+    assert value == Decimal(number)
+    assert decimal_to_int(value) == number
+    assert decimal_to_int(Decimal("-12.9")) == -12
+    backend = DecimalBackend()
+    assert backend.coerce(number) == value
+    assert backend.to_int(value) == number
+
+
+@pytest.mark.parametrize("radix, convert", [("hex", hex), ("bin", bin)])
+def test_radix_output(radix, convert):
+    """Целые значения выводятся в шестнадцатеричной и двоичной записи."""
+    for number in (0, 1, 255, -4096, 7**500):
+        chunks = list(format_chunks(Decimal(number), 10, radix, chunk=8))
+        assert "".join(chunks) == convert(number)
+    assert "".join(format_chunks(Decimal("2.5"), 2, radix)) == "2.50"
+
+
+def test_unknown_radix():
+    """Неизвестная система счисления отвергается."""
+    with pytest.raises(ValueError):
+        list(format_chunks(Decimal(1), 0, "oct"))
+    with pytest.raises(ValueError):
+        Interpreter().write_value(Decimal(1), "oct")
+
+
+def test_big_values_are_exact():
+    """Целая часть не ограничена точностью контекста бэкенда."""
+    interpreter = Interpreter()
+    assert interpreter.execute("3 ** 80") == 3**80
+    assert interpreter.execute("f = 1\nfor k in 1 .. 60 (f = f * k)\nf") == math.factorial(60)
+    assert interpreter.execute("(10 ** 40 + 1) / 3") == Decimal(
+        "3333333333333333333333333333333333333333.6666666667"
+    )
+    assert interpreter.execute("(10 ** 40 + 7) mod 10") == 7
+    exact = _EXACT.power(Decimal("1.5"), 300)
+    assert str(interpreter.execute("1.5 ** 300")) == _reference(exact, 10)
+    assert interpreter.execute("0.001 ** -20") == Decimal(10) ** 60
+
+
+def test_power_result_is_plain_number():
+    """Результат степени - число бэкенда, а не служебная обёртка."""
+    assert type(Interpreter().execute("2 ** 10")) is Decimal
+    sink = ListSink()
+    Interpreter(output=sink).execute("x = 2 ** 10\nprint(x)")
+    assert sink.getvalue() == "1024.0000000000\n"
+
+
+def test_print_streams_large_values():
+    """print выводит очень длинное число частями."""
+    sink = ListSink()
+    Interpreter(output=sink).execute('set_precision(0)\nprint("n", 7 ** 30000, 1)')
+    assert len(sink.chunks) > 3
+    digits = format(_EXACT.power(Decimal(7), 30000), "f")
+    assert sink.getvalue() == f"n {digits} 1\n"
+
+
+def test_cli_radix(tmp_path, capsys):
+    """--radix выводит целый результат в шестнадцатеричной или двоичной записи."""
+    script = tmp_path / "f.clc"
+    script.write_text("f = 1\nfor k in 1 .. n (f = f * k)\nf", encoding="utf-8")
+    assert cli.main([str(script), "n=20", "--radix", "hex"]) == 0
+    assert capsys.readouterr().out == hex(math.factorial(20)) + "\n"
+    assert cli.main([str(script), "n=5", "--radix", "bin"]) == 0
+    assert capsys.readouterr().out == "0b1111000\n"
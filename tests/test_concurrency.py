@@ -0,0 +1,61 @@
+"""Тесты изоляции контекста Decimal и параллельного выполнения."""
+
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, getcontext, localcontext
+
+from interpreter import Interpreter
+
+
+HIGH_PRECISION_SCRIPT = """
+set_precision(40)
+x = 1 / 3
+for i in 1 .. 20 (x = x * 3 / 3)
+x
+"""
+
+DEFAULT_PRECISION_SCRIPT = """
+y = 1 / 7
+for i in 1 .. 20 (y = y * 7 / 7)
+y
+"""
+
+
+def test_set_precision_does_not_touch_thread_context():
+    """set_precision не изменяет контекст Decimal текущего потока."""
+    before = getcontext().prec
+    interp = Interpreter()
+    interp.execute("set_precision(60)")
+    assert getcontext().prec == before
+    assert interp.backend.context.prec >= 60
+
+
+def test_thread_context_does_not_affect_interpreter():
+    """Изменённый контекст потока не влияет на вычисления интерпретатора."""
+    with localcontext() as ctx:
+        ctx.prec = 3
+        result = Interpreter().execute("1 / 7")
+    assert result == Decimal("0.1428571429")
+
+
+def test_interpreters_are_isolated_between_threads():
+    """Скрипты с разной точностью в пуле потоков не влияют друг на друга."""
+    scripts = [HIGH_PRECISION_SCRIPT, DEFAULT_PRECISION_SCRIPT] * 16
+
+    def run(text):
+        return Interpreter().execute(text)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(run, scripts))
+
+    high = Decimal("0." + "3" * 40)
+    default = Decimal("0.1428571429")
+    for text, result in zip(scripts, results):
+        expected = high if text is HIGH_PRECISION_SCRIPT else default
+        assert result == expected
+
+
+def test_execute_many_preserves_order():
+    """execute_many возвращает результаты в порядке исходных программ."""
+    sources = [f"n * {k}" for k in range(20)]
+    results = Interpreter.execute_many(sources, initial_env={"n": Decimal(2)}, max_workers=4)
+    assert results == [Decimal(2 * k) for k in range(20)]
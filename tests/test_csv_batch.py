@@ -0,0 +1,112 @@
+"""Тесты для потоковой обработки CSV в режиме --input командной строки."""
+
+import csv
+import io
+import json
+
+import pytest
+
+import cli
+
+
+SCRIPT = 'z = x * y\nprint("z", z)\nz / (x - 2)\n'
+
+
+@pytest.fixture
+def script(tmp_path):
+    path = tmp_path / "rows.clc"
+    path.write_text(SCRIPT, encoding="utf-8")
+    return str(path)
+
+
+def write_input(tmp_path, text):
+    path = tmp_path / "rows.csv"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def read_rows(path):
+    with open(path, newline="", encoding="utf-8") as stream:
+        return list(csv.reader(stream))
+
+
+def test_input_to_output_file(script, tmp_path):
+    """Каждая строка входа - отдельный запуск; столбцы - переменные."""
+    rows_csv = write_input(tmp_path, "x,y\n3,1\n4,2.5\n")
+    out = tmp_path / "out.csv"
+    assert cli.main([script, "--input", rows_csv, "--output", str(out), "--jobs", "1"]) == 0
+    rows = read_rows(out)
+    assert rows[0] == ["x", "y", "result", "error", "output"]
+    assert rows[1] == ["3", "1", "3.0000000000", "", "z 3.0000000000\n"]
+    assert rows[2][:3] == ["4", "2.5", "5.0000000000"]
+
+
+def test_selected_variables(script, tmp_path, capsys):
+    """Значения выбранных переменных записываются после результата."""
+    rows_csv = write_input(tmp_path, "x,y\n3,2\n")
+    assert cli.main([script, "--input", rows_csv, "--select", "z,w", "--jobs", "1"]) == 0
+    rows = list(csv.reader(io.StringIO(capsys.readouterr().out)))
+    assert rows[0] == ["x", "y", "result", "z", "w", "error", "output"]
+    assert rows[1][:5] == ["3", "2", "6.0000000000", "6.0000000000", ""]
+
+
+def test_selected_input_column_is_prefixed(script, tmp_path, capsys):
+    """Выбранная переменная с именем входного столбца не дублирует заголовок."""
+    rows_csv = write_input(tmp_path, "x,y\n3,2\n")
+    argv = [script, "--input", rows_csv, "--select", "x,z,z", "--jobs", "1"]
+    assert cli.main(argv) == 0
+    rows = list(csv.reader(io.StringIO(capsys.readouterr().out)))
+    assert rows[0] == ["x", "y", "result", "final_x", "z", "final_z", "error", "output"]
+    assert rows[1][:6] == ["3", "2", "6.0000000000", "3.0000000000", "6.0000000000", "6.0000000000"]
+    argv += ["--format", "jsonl"]
+    assert cli.main(argv) == 0
+    record = json.loads(capsys.readouterr().out)
+    assert record["x"] == "3"
+    assert record["final_x"] == "3.0000000000"
+
+
+def test_row_errors_are_reported(script, tmp_path, capsys):
+    """Ошибки строки не прерывают обработку; код возврата ненулевой."""
+    rows_csv = write_input(tmp_path, "x,y\n3,abc\n2,5\n3,\n4,1\n")
+    code = cli.main([script, "--input", rows_csv, "--format", "jsonl", "--jobs", "1"])
+    assert code == 1
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert records[0]["error"] == "Invalid numeric value for y: abc"
+    assert records[1]["error"] == "division by zero (line 3, column 1)"
+    # Пустая ячейка не переопределяет переменную
+    assert records[2]["error"] == "Variable not found: y (line 1, column 9)"
+    assert records[3]["result"] == "2.0000000000"
+
+
+def test_worker_processes_preserve_order(script, tmp_path):
+    """Результаты пула процессов совпадают с последовательными."""
+    lines = ["x,y"] + [f"{i},{i % 7}" for i in range(3, 200)]
+    rows_csv = write_input(tmp_path, "\n".join(lines) + "\n")
+    outputs = []
+    for jobs in ("1", "2"):
+        out = tmp_path / f"out{jobs}.csv"
+        args = [script, "--input", rows_csv, "--output", str(out), "--chunk-size", "16"]
+        assert cli.main([*args, "--jobs", jobs]) == 0
+        outputs.append(read_rows(out))
+    assert outputs[0] == outputs[1]
+    assert len(outputs[0]) == 198
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [("", "Input has no header"), ("x,1y\n1,2\n", "Invalid variable name")],
+)
+def test_invalid_input(script, tmp_path, capsys, text, message):
+    """Пустой файл и некорректные заголовки отклоняются."""
+    rows_csv = write_input(tmp_path, text)
+    assert cli.main([script, "--input", rows_csv]) == 2
+    assert message in capsys.readouterr().err
+
+
+def test_input_rejects_sweep(script, tmp_path):
+    """--input несовместим с --sweep и --trace."""
+    rows_csv = write_input(tmp_path, "x\n1\n")
+    with pytest.raises(SystemExit):
+        cli.main([script, "--input", rows_csv, "--sweep", "y=1..2"])
+    with pytest.raises(SystemExit):
+        cli.main([script, "--input", rows_csv, "--trace"])
@@ -0,0 +1,183 @@
+"""Тесты для математических функций произвольной точности (decmath)."""
+
+from decimal import Decimal, localcontext
+
+import pytest
+
+import decmath
+from interpreter import DSLError, DivisionByZeroError, Interpreter
+from numeric import DecimalBackend
+
+
+PI_50 = "3.14159265358979323846264338327950288419716939937511"
+SQRT2_50 = "1.41421356237309504880168872420969807856967187537695"
+LN2_50 = "0.69314718055994530941723212145817656807550013436026"
+SIN1_50 = "0.84147098480789650665250232163029899962256306079837"
+E_50 = "2.71828182845904523536028747135266249775724709369996"
+COS1_50 = "0.54030230586813971740093660744297660373231042061792"
+
+
+def _backend(precision: int) -> DecimalBackend:
+    backend = DecimalBackend()
+    backend.precision = precision
+    return backend
+
+
+@pytest.mark.parametrize(
+    "method, argument, expected",
+    [
+        ("sqrt", "2", SQRT2_50),
+        ("ln", "2", LN2_50),
+        ("sin", "1", SIN1_50),
+        ("cos", "1", COS1_50),
+    ],
+)
+def test_high_precision_values(method, argument, expected):
+    """На 50 знаках результаты совпадают с эталонными значениями."""
+    backend = _backend(50)
+    result = getattr(backend, method)(Decimal(argument))
+    assert result == Decimal(expected)
+
+
+def test_pi_places():
+    """decmath.pi возвращает pi с нужным числом верных знаков."""
+    with localcontext() as ctx:
+        ctx.prec = 60
+        assert round(decmath.pi(50), 50) == Decimal(PI_50)
+
+
+@pytest.mark.parametrize(
+    "method, args, expected",
+    [
+        ("log2", ("8",), "3"),
+        ("log10", ("1000",), "3"),
+        ("nrt", ("27", "3"), "3"),
+        ("nrt", ("-8", "3"), "-2"),
+        ("pow", ("16", "0.25"), "2"),
+    ],
+)
+def test_exact_results(method, args, expected):
+    """Точные значения не теряются при высокой точности."""
+    backend = _backend(40)
+    result = getattr(backend, method)(*(Decimal(arg) for arg in args))
+    assert result == Decimal(expected)
+
+
+def test_float_path_at_low_precision(monkeypatch):
+    """При точности до 15 знаков decmath не вызывается."""
+    def fail(*args):
+        raise AssertionError("decmath must not be used")
+
+    monkeypatch.setattr(decmath, "sin", fail)
+    assert _backend(15).sin(Decimal(1)) == Decimal("0.841470984807897")
+    with pytest.raises(AssertionError):
+        _backend(16).sin(Decimal(1))
+
+
+def test_fast_path_matches_builtin():
+    """Выше FAST_DIGITS ln и sqrt совпадают со встроенными Decimal.ln/sqrt."""
+    places = decmath.FAST_DIGITS + 100
+    backend = _backend(places)
+    with localcontext() as ctx:
+        ctx.prec = places + 20
+        expected_ln = Decimal(3).ln()
+        expected_sqrt = Decimal(3).sqrt()
+        assert backend.ln(Decimal(3)) == round(expected_ln, places)
+        assert backend.sqrt(Decimal(3)) == round(expected_sqrt, places)
+
+
+def test_reduction_constants_are_cached():
+    """Константы приведения вычисляются один раз для каждой точности."""
+    decmath._ln2.cache_clear()
+    backend = _backend(60)
+    backend.log2(Decimal(3))
+    backend.log2(Decimal(5))
+    info = decmath._ln2.cache_info()
+    assert info.misses == 1
+    assert info.hits >= 1
+
+
+def test_e_places():
+    """decmath.e возвращает e с нужным числом верных знаков."""
+    with localcontext() as ctx:
+        ctx.prec = 60
+        assert round(decmath.e(50), 50) == Decimal(E_50)
+
+
+def test_constant_cache_serves_lower_precision(monkeypatch):
+    """Значение pi с большей точностью обслуживает запросы с меньшей."""
+    calls = []
+    chudnovsky = decmath._chudnovsky
+
+    def counting(digits):
+        calls.append(digits)
+        return chudnovsky(digits)
+
+    monkeypatch.setattr(decmath, "_CONSTANTS", {})
+    monkeypatch.setattr(decmath, "_chudnovsky", counting)
+    with localcontext() as ctx:
+        ctx.prec = 60
+        high = decmath.pi(100)
+        low = decmath.pi(50)
+        assert round(low, 50) == round(high, 50) == Decimal(PI_50)
+    assert len(calls) == 1
+    decmath.pi(200)
+    assert len(calls) == 2
+
+
+def test_constants_are_lazy(monkeypatch):
+    """pi и e не вычисляются при создании интерпретатора."""
+    monkeypatch.setattr(decmath, "_CONSTANTS", {})
+    interp = Interpreter()
+    assert decmath._CONSTANTS == {}
+    interp.execute("x = 1")
+    assert decmath._CONSTANTS == {}
+    interp.execute("pi")
+    assert "pi" in decmath._CONSTANTS
+    assert "e" not in decmath._CONSTANTS
+
+
+def test_constants_follow_precision():
+    """pi и e берутся с текущей точностью и могут быть переопределены."""
+    interp = Interpreter()
+    assert interp.execute("pi") == Decimal("3.1415926536")
+    interp.execute("set_precision(50)")
+    assert interp.execute("pi") == Decimal(PI_50)
+    assert interp.execute("e") == Decimal(E_50)
+    interp.execute("set_precision(3)")
+    assert interp.execute("e += 1\ne") == Decimal("3.718")
+    assert interp.execute("pi = 3\npi") == Decimal(3)
+
+
+def test_large_argument_reduction():
+    """Приведение аргумента работает и для больших значений."""
+    backend = _backend(30)
+    # sin(10**6) = -0.34999350217129295211765248678077146...
+    assert backend.sin(Decimal(10**6)) == Decimal("-0.349993502171292952117652486781")
+
+
+@pytest.mark.parametrize(
+    "code, error",
+    [
+        ("ln(0)", DSLError),
+        ("log2(-1)", DSLError),
+        ("sqrt(-2)", DSLError),
+        ("nrt(-8, 2)", DSLError),
+        ("(-8) ** 0.5", DSLError),
+        ("ctg(0)", DivisionByZeroError),
+        ("0 ** -0.5", DivisionByZeroError),
+    ],
+)
+def test_domain_errors(code, error):
+    """Ошибки области определения на высокой точности такие же, как на низкой."""
+    interp = Interpreter()
+    interp.execute("set_precision(30)")
+    with pytest.raises(error):
+        interp.execute(code)
+
+
+def test_interpreter_high_precision():
+    """set_precision влияет на точность трансцендентных функций в DSL."""
+    interp = Interpreter()
+    interp.execute("set_precision(50)")
+    assert interp.execute("sqrt(2)") == Decimal(SQRT2_50)
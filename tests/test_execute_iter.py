@@ -0,0 +1,103 @@
+"""Тесты для потоковой выдачи результатов операторов (execute_iter)."""
+
+from decimal import Decimal
+
+from lark.exceptions import LarkError
+import pytest
+
+from interpreter import DSLError, Interpreter, StatementResult
+
+SOURCE = """\
+x = 2; y = x * 3
+print("y =", y)
+z = 1 if y > 100 else
+    7
+for i in 1 .. 3 (
+    x += i
+)
+# комментарий
+with precision 2 (1 / 3)
+x + z
+"""
+
+
+def test_results_per_statement(capsys):
+    """Каждый оператор верхнего уровня выдаёт строку, вид и значение."""
+    results = list(Interpreter().execute_iter(SOURCE))
+    assert [(r.line, r.kind) for r in results] == [
+        (1, "assignment"),
+        (1, "assignment"),
+        (2, "print"),
+        (3, "assignment"),
+        (5, "for"),
+        (9, "precision"),
+        (10, "expression"),
+    ]
+    assert results[1].value == Decimal(6)
+    assert results[3].value == Decimal(7)
+    assert results[-1] == StatementResult(10, "expression", Decimal(15))
+    assert capsys.readouterr().out == "y = 6.0000000000\n"
+
+
+def test_same_result_as_execute():
+    """Последний результат и переменные совпадают с execute."""
+    streamed = Interpreter()
+    last = list(streamed.execute_iter(SOURCE))[-1].value
+    full = Interpreter()
+    assert full.execute(SOURCE) == last
+    assert streamed.state.env == full.state.env
+
+
+def test_lazy_parsing():
+    """Результаты выдаются до того, как прочитан остаток программы."""
+    consumed = []
+
+    def lines():
+        for index in range(1, 1000):
+            consumed.append(index)
+            yield f"x{index} = {index}\n"
+
+    results = Interpreter().execute_iter(lines())
+    first = next(results)
+    assert first == StatementResult(1, "assignment", Decimal(1))
+    assert consumed == [1]
+
+
+def test_file_source(tmp_path):
+    """Источник может быть открытым файлом."""
+    script = tmp_path / "s.clc"
+    script.write_text("a = 1\nb = a + 1\n", encoding="utf-8")
+    with script.open(encoding="utf-8") as stream:
+        values = [r.value for r in Interpreter().execute_iter(stream)]
+    assert values == [Decimal(1), Decimal(2)]
+
+
+def test_runtime_error_after_results():
+    """Ошибка выполнения сообщается с верной строкой после предыдущих результатов."""
+    results = Interpreter().execute_iter("a = 1\n\nb = a / 0\n")
+    assert next(results).value == Decimal(1)
+    with pytest.raises(DSLError) as info:
+        next(results)
+    assert (info.value.line, info.value.column) == (3, 5)
+
+
+def test_syntax_error_position():
+    """Синтаксическая ошибка фрагмента указывает строку в исходной программе."""
+    results = Interpreter().execute_iter("a = 1\nb = 2\nc = 1 $ 2\n")
+    assert len([next(results), next(results)]) == 2
+    with pytest.raises(LarkError) as info:
+        next(results)
+    assert info.value.line == 3
+
+
+def test_multiline_block_is_one_statement():
+    """Оператор, занимающий несколько строк в скобках, выполняется целиком."""
+    source = "total = (\n  a = 2\n  a * 5\n)\ntotal"
+    assert [r.value for r in Interpreter().execute_iter(source)] == [Decimal(10), Decimal(10)]
+
+
+def test_parentheses_in_strings_and_comments():
+    """Скобки в строках и комментариях не влияют на границы операторов."""
+    source = 'print("(")  # )\nx = 1\n'
+    results = list(Interpreter().execute_iter(source))
+    assert [r.kind for r in results] == ["print", "assignment"]
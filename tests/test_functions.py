@@ -0,0 +1,163 @@
+"""Тесты для реестра функций и функций хоста."""
+
+from decimal import Decimal
+import math
+
+import pytest
+
+from functions import BUILTINS, FunctionRegistry
+from interpreter import DSLError, DivisionByZeroError, Interpreter
+from numeric import FloatBackend
+
+
+def test_builtins_registered():
+    """Все встроенные функции есть в реестре с метаданными."""
+    for name in ("ln", "log2", "log10", "sin", "cos", "tg", "ctg", "sqrt", "nrt"):
+        assert BUILTINS.get(name).pure
+    assert BUILTINS.get("nrt").arity == 2
+    assert not BUILTINS.get("set_precision").pure
+    assert BUILTINS.get("get_precision").arity == 0
+
+
+def test_calls_resolved_at_compile_time():
+    """Места вызова известных функций разрешаются при компиляции."""
+    interp = Interpreter()
+    tree = interp._compile(interp.parse("sqrt(x) + foo(1)"))
+    kinds = {node.data for node in tree.iter_subtrees()}
+    assert "resolved_call" in kinds
+    # Неизвестная функция остаётся обычным вызовом
+    assert "func_call" in kinds
+
+
+@pytest.mark.parametrize(
+    "code, message",
+    [
+        ("sin(1, 2)", "sin expects 1 argument"),
+        ("nrt(8)", "nrt expects 2 arguments"),
+        ("get_precision(1)", "get_precision expects 0 arguments"),
+        ("set_precision(-1)", "set_precision expects integer >= 0"),
+        ("foo(1)", "Unknown function: foo"),
+    ],
+)
+def test_call_errors(code, message):
+    """Ошибки вызова сообщаются с позицией."""
+    with pytest.raises(DSLError, match=message) as exc_info:
+        Interpreter().execute(code)
+    assert exc_info.value.line == 1
+
+
+def test_register_float_function():
+    """Функция хоста в домене float получает float и возвращает число бэкенда."""
+    seen = []
+
+    def hypot(x, y):
+        seen.append((type(x), type(y)))
+        return math.hypot(x, y)
+
+    interp = Interpreter()
+    interp.register_function("hypot", hypot, arity=2)
+    assert interp.execute("hypot(3, 4) + 1") == Decimal(6)
+    assert interp.execute("hypot(1, 1)") == Decimal("1.4142135624")
+    assert seen[0] == (float, float)
+
+
+def test_register_backend_function():
+    """Функция хоста в домене backend получает числа бэкенда."""
+    interp = Interpreter()
+    interp.register_function("half", lambda x: x / 2, arity=1, domain="backend")
+    interp.execute("set_precision(2)")
+    assert interp.execute("half(1)") == Decimal("0.50")
+
+
+def test_register_function_with_float_backend():
+    """Функции хоста работают и с FloatBackend."""
+    interp = Interpreter(backend=FloatBackend())
+    interp.register_function("double", lambda x: 2 * x, arity=1)
+    assert interp.execute("double(1.5)") == 3.0
+
+
+def test_register_numpy_function():
+    """Функция на NumPy: скаляры NumPy преобразуются в числа бэкенда."""
+    np = pytest.importorskip("numpy")
+    interp = Interpreter()
+    interp.register_function("expm1", np.expm1, arity=1)
+    assert interp.execute("expm1(0)") == Decimal(0)
+    interp.register_function("count", lambda x: np.int64(x) + 1, arity=1)
+    assert interp.execute("count(2)") == Decimal(3)
+
+
+def test_host_function_errors():
+    """Исключения функции хоста превращаются в ошибки DSL."""
+    interp = Interpreter()
+    interp.register_function("inv", lambda x: 1 / x, arity=1)
+    interp.register_function("bad", lambda x: None, arity=1)
+    with pytest.raises(DivisionByZeroError):
+        interp.execute("inv(0)")
+    with pytest.raises(DSLError, match="bad returned non-numeric value"):
+        interp.execute("bad(1)")
+
+
+def test_register_validates_arguments():
+    """Неизвестный домен и отрицательная arity отклоняются."""
+    registry = FunctionRegistry()
+    with pytest.raises(ValueError):
+        registry.register("f", abs, arity=1, domain="complex")
+    with pytest.raises(ValueError):
+        registry.register("f", abs, arity=-1)
+
+
+def test_pure_literal_call_is_folded():
+    """Чистая функция с литеральными аргументами вычисляется один раз на точность."""
+    calls = []
+
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    interp = Interpreter()
+    interp.register_function("square", square, arity=1)
+    result = interp.execute("s = 0\nfor i in 1 .. 5 (s += square(3))\ns")
+    assert result == Decimal(45)
+    assert len(calls) == 1
+    interp.execute("with precision 3 (for i in 1 .. 5 (square(3)))")
+    assert len(calls) == 2
+
+
+def test_impure_function_is_not_folded():
+    """Нечистая функция вызывается каждый раз."""
+    counter = iter(range(100))
+    interp = Interpreter(memo_size=16)
+    interp.register_function("tick", lambda x: next(counter), arity=1, pure=False)
+    assert interp.execute("s = 0\nfor i in 1 .. 4 (s += tick(0))\ns") == Decimal(6)
+    assert interp.memo_stats().size == 0
+
+
+def test_pure_host_function_is_memoized():
+    """Чистая функция хоста с переменными аргументами проходит через кэш."""
+    calls = []
+
+    def cube(x):
+        calls.append(x)
+        return x ** 3
+
+    interp = Interpreter(memo_size=16)
+    interp.register_function("cube", cube, arity=1)
+    assert interp.execute("s = 0\nfor i in 1 .. 6 (s += cube(i mod 2))\ns") == Decimal(3)
+    assert len(calls) == 2
+
+
+def test_registry_per_interpreter():
+    """Регистрация в одном интерпретаторе не влияет на другие."""
+    first = Interpreter()
+    first.register_function("sin", lambda x: 0.5, arity=1)
+    assert first.execute("sin(1)") == Decimal("0.5")
+    assert Interpreter().execute("sin(1)") == Decimal("0.8414709848")
+    assert "sin" in BUILTINS
+
+
+def test_shared_registry():
+    """Реестр можно передать нескольким интерпретаторам."""
+    registry = BUILTINS.copy()
+    registry.register("twice", lambda x: 2 * x, arity=1)
+    assert Interpreter(functions=registry).execute("twice(2)") == Decimal(4)
+    assert Interpreter(functions=registry).execute("twice(3)") == Decimal(6)
@@ -0,0 +1,130 @@
+"""Тесты для инкрементального повторного выполнения."""
+
+import contextlib
+from decimal import Decimal
+import io
+import itertools
+
+import pytest
+
+from functions import BUILTINS
+from incremental import IncrementalRunner, IncrementalStats
+from interpreter import DSLError, Interpreter
+
+SOURCE = """\
+area = w * h
+print("area", area)
+cost = area * price
+total = for i in 1 .. n (cost += i)
+with precision 2 (share = cost / 3)
+cost + share
+"""
+
+
+def _full(source, env):
+    """Результат, переменные и вывод полного выполнения."""
+    output = io.StringIO()
+    interp = Interpreter(initial_env=dict(env))
+    with contextlib.redirect_stdout(output):
+        result = interp.execute(source)
+    return result, dict(interp.state.env), output.getvalue()
+
+
+def _incremental(runner, env):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result = runner.run(env)
+    return result, dict(runner.state.env), output.getvalue()
+
+
+def test_only_downstream_statements_rerun():
+    """Изменение price пересчитывает только операторы, зависящие от него."""
+    runner = IncrementalRunner(SOURCE)
+    env = {"w": Decimal(3), "h": Decimal(4), "price": Decimal(10), "n": Decimal(3)}
+    _incremental(runner, env)
+    assert runner.stats == IncrementalStats(executed=6, reused=0)
+    _incremental(runner, {**env, "price": Decimal(11)})
+    assert runner.stats == IncrementalStats(executed=4, reused=2)
+    _incremental(runner, {**env, "price": Decimal(11)})
+    assert runner.stats == IncrementalStats(executed=0, reused=6)
+
+
+def test_matches_full_execution():
+    """Результат, переменные и вывод совпадают с полным выполнением."""
+    runner = IncrementalRunner(SOURCE)
+    grid = itertools.product([Decimal(2), Decimal(3)], [Decimal(10), Decimal("10.5")], [0, 2])
+    for w, price, n in grid:
+        env = {"w": w, "h": Decimal(4), "price": price, "n": Decimal(n)}
+        assert _incremental(runner, env) == _full(SOURCE, env)
+
+
+def test_unchanged_value_stops_propagation():
+    """Пересчитанный оператор с прежним значением не пересчитывает зависимые."""
+    runner = IncrementalRunner("sign = 1 if x > 0 else -1\ny = sign * 100\ny")
+    assert runner.run({"x": Decimal(5)}) == Decimal(100)
+    assert runner.run({"x": Decimal(7)}) == Decimal(100)
+    assert runner.stats == IncrementalStats(executed=1, reused=2)
+
+
+def test_loop_variable_visibility():
+    """Переменная цикла после цикла - как при полном выполнении."""
+    source = "for i in 1 .. 3 (s = i)\ns"
+    runner = IncrementalRunner(source)
+    runner.run({})
+    assert "i" not in runner.state.env
+    assert runner.run({"i": Decimal(7)}) == Decimal(3)
+    assert runner.state.env["i"] == Decimal(3)
+    assert runner.stats.executed == 1
+    runner.run({})
+    assert "i" not in runner.state.env
+
+
+def test_precision_change():
+    """set_precision - вход всех следующих операторов."""
+    runner = IncrementalRunner("set_precision(p)\nthird = 1 / 3\nthird + x")
+    assert runner.run({"p": Decimal(2), "x": Decimal(0)}) == Decimal("0.33")
+    assert runner.run({"p": Decimal(2), "x": Decimal(1)}) == Decimal("1.33")
+    assert runner.stats == IncrementalStats(executed=1, reused=2)
+    assert runner.run({"p": Decimal(4), "x": Decimal(1)}) == Decimal("1.3333")
+    assert runner.stats == IncrementalStats(executed=3, reused=0)
+    assert runner.state.precision == 4
+
+
+def test_impure_function_always_runs():
+    """Оператор с нечистой функцией хоста выполняется при каждом запуске."""
+    calls = []
+    registry = BUILTINS.copy()
+    registry.register("tick", lambda: calls.append(1) or len(calls), arity=0, pure=False)
+    runner = IncrementalRunner("t = tick()\nx * 2", functions=registry)
+    runner.run({"x": Decimal(1)})
+    runner.run({"x": Decimal(1)})
+    assert len(calls) == 2
+    assert runner.stats == IncrementalStats(executed=1, reused=1)
+
+
+def test_different_exponents_differ():
+    """Равные значения с разной экспонентой считаются изменением."""
+    runner = IncrementalRunner("y = x * 1\ny")
+    runner.run({"x": Decimal("1")})
+    runner.run({"x": Decimal("1.0")})
+    assert runner.stats.executed == 1
+
+
+def test_error_keeps_previous_statements():
+    """Ошибка прерывает запуск, а результаты до неё переиспользуются."""
+    runner = IncrementalRunner("a = x * 2\nb = 1 / y\na + b")
+    with pytest.raises(DSLError):
+        runner.run({"x": Decimal(1), "y": Decimal(0)})
+    assert runner.stats == IncrementalStats(executed=1, reused=0)
+    assert runner.run({"x": Decimal(1), "y": Decimal(1)}) == Decimal(3)
+    assert runner.stats == IncrementalStats(executed=2, reused=1)
+
+
+def test_dependencies():
+    """Граф зависимостей: что читает и пишет каждый оператор."""
+    runner = IncrementalRunner("a = x + sqrt(y)\nb += a\nfor i in 1 .. a (c = i)")
+    assert runner.dependencies() == [
+        ({"x", "y"}, {"a"}),
+        ({"a", "b"}, {"b"}),
+        ({"a", "i"}, {"c", "i"}),
+    ]
@@ -0,0 +1,102 @@
+"""Тесты для потокового режима JSON Lines (cli.py --jsonl)."""
+
+import io
+import json
+from pathlib import Path
+import subprocess
+import sys
+
+import pytest
+
+import cli
+from pipeline import JsonlSession
+
+CLI = str(Path(__file__).resolve().parent.parent / "cli.py")
+
+
+def run_session(lines, **kwargs):
+    source = io.BytesIO("".join(line + "\n" for line in lines).encode("utf-8"))
+    sink = io.BytesIO()
+    errors = JsonlSession(**kwargs).serve(source, sink)
+    return errors, [json.loads(line) for line in sink.getvalue().splitlines()]
+
+
+def test_results_per_line():
+    """Один результат на строку: значение, вывод, время."""
+    errors, results = run_session([
+        json.dumps({"id": 7, "source": 'print("hi")\nx * 2', "vars": {"x": "21"}}),
+        "",
+        json.dumps({"source": "1 / 3", "precision": 3}),
+    ])
+    assert errors == 0
+    assert len(results) == 2
+    assert results[0]["id"] == 7
+    assert results[0]["value"] == "42.0000000000"
+    assert results[0]["output"] == "hi\n"
+    assert set(results[0]["timings"]) == {"compile", "run"}
+    assert results[1]["value"] == "0.333"
+    assert "id" not in results[1]
+
+
+def test_path_requests(tmp_path):
+    """Скрипт можно передать путём к файлу."""
+    script = tmp_path / "area.clc"
+    script.write_text("r * r * 3", encoding="utf-8")
+    _, results = run_session([json.dumps({"path": str(script), "vars": {"r": 2}})])
+    assert results[0]["value"] == "12.0000000000"
+
+
+@pytest.mark.parametrize(
+    "line, kind, message, position",
+    [
+        ('{"source": "1 / x", "vars": {"x": 0}}', "runtime", "division by zero", (1, 1)),
+        ('{"source": "1 +* 2"}', "syntax", "No terminal matches '*'", (1, 4)),
+        ('{"source": "10 ** (10 ** 20)"}', "runtime", "Overflow: ", None),
+        ('{"source": "x", "vars": {"x": "abc"}}', "request", "Invalid numeric value", None),
+        ('{"path": "/nonexistent.clc"}', "request", "Cannot read script", None),
+        ('{"vars": {}}', "request", "Request needs source or path", None),
+        ("not json", "request", "Invalid JSON", None),
+    ],
+)
+def test_errors(line, kind, message, position):
+    """Ошибки описываются типом, сообщением и позицией; обработка продолжается."""
+    errors, results = run_session([line, '{"source": "1"}'])
+    assert errors == 1
+    error = results[0]["error"]
+    assert error["type"] == kind
+    assert error["message"].startswith(message)
+    if position is not None:
+        assert (error["line"], error["column"]) == position
+    assert results[1]["value"] == "1.0000000000"
+
+
+def test_programs_are_cached():
+    """Повторный запрос того же исходного кода не компилируется заново."""
+    session = JsonlSession(cache_size=4)
+    for value in range(3):
+        session.handle({"source": "x + 1", "vars": {"x": value}})
+    stats = session._programs.stats()
+    assert (stats.hits, stats.misses) == (2, 1)
+
+
+def test_base_env():
+    """Переменные из командной строки общие для всех запросов."""
+    _, results = run_session(['{"source": "k * x", "vars": {"x": 2}}'], base_env={"k": 5})
+    assert results[0]["value"] == "10.0000000000"
+
+
+def test_cli_jsonl_over_pipes():
+    """cli.py --jsonl читает stdin и пишет stdout."""
+    requests = "\n".join(json.dumps({"source": f"{i} * 2"}) for i in range(100)) + "\n"
+    completed = subprocess.run(
+        [sys.executable, CLI, "--jsonl"], input=requests.encode(), capture_output=True, check=False
+    )
+    assert completed.returncode == 0
+    values = [json.loads(line)["value"] for line in completed.stdout.splitlines()]
+    assert values == [f"{2 * i}.0000000000" for i in range(100)]
+
+
+def test_cli_jsonl_rejects_script(tmp_path):
+    """--jsonl несовместим с путём к скрипту."""
+    with pytest.raises(SystemExit):
+        cli.main([str(tmp_path / "a.clc"), "--jsonl"])
@@ -0,0 +1,101 @@
+"""Тесты для кэша результатов встроенных функций."""
+
+from decimal import Decimal
+
+import pytest
+
+from interpreter import DSLError, DivisionByZeroError, Interpreter
+from memo import CallMemo
+
+
+GRID = """
+s = 0
+for i in 1 .. 20 (
+    s += sin(i mod 4) + sqrt(i mod 4)
+)
+s
+"""
+
+
+def test_memo_disabled_by_default():
+    """По умолчанию кэш выключен."""
+    interp = Interpreter()
+    assert interp.memo_stats() is None
+    assert interp.execute("sin(1)") == Decimal("0.8414709848")
+
+
+def test_memo_gives_same_results():
+    """С кэшем результат программы не меняется."""
+    plain = Interpreter().execute(GRID)
+    interp = Interpreter(memo_size=64)
+    assert interp.execute(GRID) == plain
+    stats = interp.memo_stats()
+    # 4 разных аргумента для каждой из двух функций
+    assert stats.misses == 8
+    assert stats.hits == 32
+    assert stats.size == 8
+
+
+def test_memo_key_includes_precision():
+    """Результат, вычисленный на одной точности, не используется на другой."""
+    interp = Interpreter()
+    interp.enable_memo(16)
+    assert interp.execute("sqrt(2)") == Decimal("1.4142135624")
+    assert interp.execute("set_precision(3)\nsqrt(2)") == Decimal("1.414")
+    assert interp.execute("with precision 5 (sqrt(2))") == Decimal("1.414")
+    assert interp.memo_stats().misses == 3
+
+
+def test_memo_key_is_function_not_name():
+    """Замена встроенной функции не возвращает результаты старой из кэша."""
+    interp = Interpreter(memo_size=16)
+    assert interp.execute("sin(1)") == Decimal("0.8414709848")
+    interp.register_function("sin", lambda x: 42, 1)
+    assert interp.execute("sin(1)") == Decimal(42)
+
+
+def test_memo_eviction():
+    """При переполнении вытесняются давно не использованные записи."""
+    interp = Interpreter(memo_size=2)
+    interp.execute("ln(2); ln(3); ln(2); ln(4); ln(2); ln(3)")
+    stats = interp.memo_stats()
+    assert stats.size == 2
+    assert stats.maxsize == 2
+    assert stats.hits == 2
+    assert stats.evictions == 2
+
+
+def test_memo_bypasses_precision_functions():
+    """set_precision и get_precision не кэшируются."""
+    interp = Interpreter(memo_size=8)
+    interp.execute("set_precision(3); get_precision(); set_precision(4); get_precision()")
+    assert interp.memo_stats().size == 0
+    assert interp.execute("get_precision()") == Decimal(4)
+
+
+@pytest.mark.parametrize(
+    "code, error",
+    [("ln(0)", DSLError), ("ctg(0)", DivisionByZeroError), ("nrt(-8, 2)", DSLError)],
+)
+def test_memo_does_not_cache_errors(code, error):
+    """Ошибки не кэшируются и сообщаются при каждом вызове."""
+    interp = Interpreter(memo_size=8)
+    for _ in range(2):
+        with pytest.raises(error):
+            interp.execute(code)
+    assert interp.memo_stats().size == 0
+
+
+def test_disable_memo():
+    """disable_memo выключает кэш."""
+    interp = Interpreter(memo_size=8)
+    interp.execute("cos(1)")
+    interp.disable_memo()
+    assert interp.memo_stats() is None
+    assert interp.execute("cos(1)") == Decimal("0.5403023059")
+
+
+def test_call_memo_rejects_non_positive_size():
+    """Размер кэша должен быть положительным."""
+    with pytest.raises(ValueError):
+        CallMemo(0)
@@ -0,0 +1,250 @@
+"""Тесты для инструкции import и кэша модулей."""
+
+from decimal import Decimal
+import json
+import os
+import threading
+
+import pytest
+
+import cli
+from interpreter import DSLError, Interpreter
+from modules import MODULES
+from pipeline import JsonlSession
+from program import Program
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    MODULES.clear()
+    yield
+    MODULES.clear()
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_import_exports(tmp_path):
+    """Переменные модуля копируются в окружение, кроме имён с ``_``."""
+    _write(tmp_path / "lib.clc", "rate = 0.25\n_scale = 4\nunit = rate * _scale\n")
+    main = _write(tmp_path / "main.clc", 'import "lib.clc"\nrate * 2')
+    interp = Interpreter()
+    assert interp.execute(main.read_text(), main) == Decimal("0.5")
+    assert interp.get_variable("unit") == Decimal(1)
+    assert interp.get_variable("_scale") is None
+
+
+def test_relative_to_importing_script(tmp_path):
+    """Путь модуля считается от каталога импортирующего скрипта, а не от cwd."""
+    _write(tmp_path / "lib" / "util.clc", 'import "consts.clc"\nhalf = k / 2\n')
+    _write(tmp_path / "lib" / "consts.clc", "k = 10\n")
+    main = _write(tmp_path / "app" / "main.clc", 'import "../lib/util.clc"\nhalf + k')
+    assert Interpreter().execute(main.read_text(), main) == Decimal(15)
+
+
+def test_module_runs_once(tmp_path):
+    """Модуль выполняется один раз на процесс, даже при импорте из разных скриптов."""
+    _write(tmp_path / "lib.clc", 'print("loading")\nk = 3\n')
+    first = _write(tmp_path / "a.clc", 'import "lib.clc"\nk')
+    second = _write(tmp_path / "b.clc", 'import "lib.clc"\nimport "lib.clc"\nk * 2')
+    assert Interpreter().execute(first.read_text(), first) == Decimal(3)
+    assert Interpreter().execute(second.read_text(), second) == Decimal(6)
+    assert MODULES.loads == 1
+
+
+def test_cache_keyed_by_precision(tmp_path):
+    """Модуль, выполненный при другой точности, выполняется заново."""
+    _write(tmp_path / "lib.clc", "third = 1 / 3\n")
+    main = _write(tmp_path / "main.clc", 'import "lib.clc"\nthird')
+    assert Interpreter().execute(main.read_text(), main) == Decimal("0.3333333333")
+    low = 'set_precision(2)\nimport "lib.clc"\nthird'
+    assert Interpreter().execute(low, main) == Decimal("0.33")
+    assert MODULES.loads == 2
+
+
+def test_cache_keyed_by_functions(tmp_path):
+    """Модуль, выполненный с другим набором функций, выполняется заново."""
+    _write(tmp_path / "lib.clc", "k = f(2)\n")
+    main = _write(tmp_path / "main.clc", 'import "lib.clc"\nk')
+    first = Interpreter()
+    first.register_function("f", lambda x: x + 1, 1)
+    assert first.execute(main.read_text(), main) == Decimal(3)
+    second = Interpreter()
+    second.register_function("f", lambda x: x * 10, 1)
+    assert second.execute(main.read_text(), main) == Decimal(20)
+    assert first.execute(main.read_text(), main) == Decimal(3)
+    assert MODULES.loads == 2
+
+
+def test_reload_on_change(tmp_path):
+    """Изменённое содержимое перечитывается; изменение только mtime - нет."""
+    lib = _write(tmp_path / "lib.clc", "k = 1\n")
+    main = _write(tmp_path / "main.clc", 'import "lib.clc"\nk')
+    assert Interpreter().execute(main.read_text(), main) == Decimal(1)
+
+    stat = lib.stat()
+    os.utime(lib, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert Interpreter().execute(main.read_text(), main) == Decimal(1)
+    assert MODULES.loads == 1
+
+    lib.write_text("k = 22\n", encoding="utf-8")
+    os.utime(lib, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+    assert Interpreter().execute(main.read_text(), main) == Decimal(22)
+    assert MODULES.loads == 2
+
+
+def test_reload_on_dependency_change(tmp_path):
+    """Изменение модуля, импортированного модулем, перевыполняет и импортирующий."""
+    _write(tmp_path / "consts.clc", "k = 10\n")
+    _write(tmp_path / "util.clc", 'import "consts.clc"\nhalf = k / 2\n')
+    main = _write(tmp_path / "main.clc", 'import "util.clc"\nhalf')
+    assert Interpreter().execute(main.read_text(), main) == Decimal(5)
+    assert MODULES.loads == 2
+
+    consts = tmp_path / "consts.clc"
+    stat = consts.stat()
+    consts.write_text("k = 30\n", encoding="utf-8")
+    os.utime(consts, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert Interpreter().execute(main.read_text(), main) == Decimal(15)
+    assert MODULES.loads == 4
+
+
+def test_modules_load_in_parallel(tmp_path):
+    """Пока один поток выполняет модуль, другой импортирует другой модуль."""
+    release = threading.Event()
+    _write(tmp_path / "slow.clc", "s = hold(1)\n")
+    _write(tmp_path / "fast.clc", "f = 2\n")
+    main = tmp_path / "main.clc"
+
+    def hold(x):
+        assert release.wait(5)
+        return x
+
+    slow = Interpreter()
+    slow.register_function("hold", hold, 1, pure=False)
+    thread = threading.Thread(target=slow.execute, args=('import "slow.clc"', main))
+    thread.start()
+    try:
+        assert Interpreter().execute('import "fast.clc"\nf', main) == Decimal(2)
+        assert thread.is_alive()
+    finally:
+        release.set()
+        thread.join(5)
+    assert slow.get_variable("s") == Decimal(1)
+
+
+def test_import_cycle_across_threads(tmp_path):
+    """Цикл, импортируемый с разных концов в двух потоках, - ошибка, а не взаимная блокировка."""
+    barrier = threading.Barrier(2)
+    _write(tmp_path / "a.clc", 'x = sync(1)\nimport "b.clc"\n')
+    _write(tmp_path / "b.clc", 'y = sync(1)\nimport "a.clc"\n')
+    main = tmp_path / "main.clc"
+    errors = []
+
+    def sync(x):
+        try:
+            barrier.wait(1)
+        except threading.BrokenBarrierError:
+            pass  # второй поток уже упал на цикле
+        return x
+
+    def worker(name):
+        interp = Interpreter()
+        interp.register_function("sync", sync, 1, pure=False)
+        try:
+            interp.execute(f'import "{name}"', main)
+        except DSLError as exc:
+            errors.append(str(exc))
+
+    threads = [threading.Thread(target=worker, args=(name,)) for name in ("a.clc", "b.clc")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert not any(thread.is_alive() for thread in threads)
+    assert len(errors) == 2
+    assert all("Import cycle" in error for error in errors)
+
+
+def test_module_does_not_see_importer(tmp_path):
+    """Модуль выполняется в собственном окружении."""
+    _write(tmp_path / "lib.clc", "y = x + 1\n")
+    main = _write(tmp_path / "main.clc", 'x = 1\nimport "lib.clc"\ny')
+    with pytest.raises(DSLError, match="Error in module lib.clc at line 1: Variable not found: x"):
+        Interpreter().execute(main.read_text(), main)
+
+
+def test_import_cycle(tmp_path):
+    """Циклический импорт обнаруживается и не кэшируется."""
+    _write(tmp_path / "a.clc", 'import "b.clc"\n')
+    _write(tmp_path / "b.clc", 'import "a.clc"\n')
+    main = tmp_path / "a.clc"
+    with pytest.raises(DSLError, match=r"Import cycle: a\.clc -> b\.clc -> a\.clc") as info:
+        Interpreter().execute(main.read_text(), main)
+    assert (info.value.line, info.value.column) == (1, 8)
+    assert MODULES.loads == 0
+
+
+def test_self_import(tmp_path):
+    """Модуль не может импортировать сам себя."""
+    main = _write(tmp_path / "self.clc", 'import "self.clc"\n')
+    with pytest.raises(DSLError, match=r"Import cycle: self\.clc -> self\.clc"):
+        Interpreter().execute(main.read_text(), main)
+
+
+def test_missing_module(tmp_path):
+    """Отсутствующий модуль - ошибка DSL с позицией инструкции import."""
+    main = _write(tmp_path / "main.clc", 'x = 1\nimport "missing.clc"\n')
+    with pytest.raises(DSLError, match="Cannot import missing.clc") as info:
+        Interpreter().execute(main.read_text(), main)
+    assert info.value.line == 2
+
+
+def test_syntax_error_in_module(tmp_path):
+    """Синтаксическая ошибка модуля сообщается от имени import."""
+    _write(tmp_path / "bad.clc", "x = (\n")
+    main = _write(tmp_path / "main.clc", 'import "bad.clc"\n')
+    with pytest.raises(DSLError, match="Syntax error in module bad.clc"):
+        Interpreter().execute(main.read_text(), main)
+
+
+def test_program_path(tmp_path):
+    """Program с путём выполняет import относительно файла программы."""
+    _write(tmp_path / "lib.clc", "k = 7\n")
+    program = Program.compile('import "lib.clc"\nk * x', path=str(tmp_path / "main.clc"))
+    assert program.evaluate({"x": Decimal(2)}) == Decimal(14)
+    assert program.evaluate({"x": Decimal(3)}) == Decimal(21)
+    assert MODULES.loads == 1
+
+
+def test_import_after_reset(tmp_path):
+    """reset() удаляет переменные, пришедшие из модуля."""
+    _write(tmp_path / "lib.clc", "k = 7\n")
+    interp = Interpreter()
+    interp.checkpoint()
+    interp.execute('import "lib.clc"', tmp_path / "main.clc")
+    assert interp.reset() == 1
+    assert interp.get_variable("k") is None
+
+
+def test_jsonl_path_request(tmp_path):
+    """Запрос JSON Lines с path ищет модули рядом со скриптом."""
+    _write(tmp_path / "lib.clc", "k = 5\n")
+    script = _write(tmp_path / "main.clc", 'import "lib.clc"\nk + x')
+    response = JsonlSession().handle_line(
+        json.dumps({"path": str(script), "vars": {"x": 1}}).encode()
+    )
+    assert response["error"] is None
+    assert response["value"] == "6.0000000000"
+
+
+def test_cli_import(tmp_path, monkeypatch, capsys):
+    """CLI выполняет скрипт с import независимо от текущего каталога."""
+    _write(tmp_path / "scripts" / "lib.clc", "k = 4\n")
+    script = _write(tmp_path / "scripts" / "main.clc", 'import "lib.clc"\nk * 2')
+    monkeypatch.chdir(tmp_path)
+    assert cli.main([str(script.relative_to(tmp_path))]) == 0
+    assert capsys.readouterr().out.strip() == "8.0000000000"
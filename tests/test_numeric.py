@@ -0,0 +1,68 @@
+"""Тесты для числовых бэкендов."""
+
+from decimal import Decimal
+
+import pytest
+
+from interpreter import DivisionByZeroError, DSLError, Interpreter
+from numeric import DecimalBackend, FloatBackend, NumericBackend
+
+
+def test_default_backend_is_decimal():
+    """По умолчанию интерпретатор использует DecimalBackend."""
+    interp = Interpreter()
+    assert isinstance(interp.backend, DecimalBackend)
+    assert interp.execute("1 / 3") == Decimal("0.3333333333")
+
+
+@pytest.mark.parametrize("backend_cls", [DecimalBackend, FloatBackend])
+def test_backends_satisfy_protocol(backend_cls):
+    """Оба встроенных бэкенда реализуют протокол NumericBackend."""
+    assert isinstance(backend_cls(), NumericBackend)
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        ("2 + 2 * 2", 6.0),
+        ("-5 mod 3", 1.0),
+        ("5 mod -3", 2.0),
+        ("2 ** 10 mod 7", 2.0),
+        ("sqrt(16)", 4.0),
+        ("nrt(27, 3)", 3.0),
+        ("sum = 0; for i in 1 .. 10 (sum += i); sum", 55.0),
+        ("1 if 2 > 1 else 0", 1.0),
+    ],
+)
+def test_float_backend_results(code, expected):
+    """FloatBackend даёт те же результаты для типичных выражений."""
+    result = Interpreter(backend=FloatBackend()).execute(code)
+    assert isinstance(result, float)
+    assert result == pytest.approx(expected)
+
+
+def test_float_backend_precision_and_format():
+    """FloatBackend округляет и форматирует с текущей точностью."""
+    interp = Interpreter(backend=FloatBackend())
+    interp.execute("set_precision(3)")
+    assert interp.precision == 3
+    assert interp.execute("1 / 3") == pytest.approx(0.333)
+    assert interp.format_value(interp.execute("2 / 3")) == "0.667"
+
+
+def test_backend_errors_keep_position():
+    """Ошибки бэкенда превращаются в DSLError с позицией."""
+    interp = Interpreter(backend=FloatBackend())
+    with pytest.raises(DivisionByZeroError) as exc_info:
+        interp.execute("x = 1\ny = x / 0")
+    assert exc_info.value.line == 2
+    with pytest.raises(DSLError, match="sqrt domain error"):
+        interp.execute("sqrt(-1)")
+    with pytest.raises(DivisionByZeroError, match="ctg division by zero"):
+        Interpreter().execute("ctg(0)")
+
+
+def test_zero_to_negative_power_is_division_by_zero():
+    """0 ** -1 сообщает о делении на ноль, а не о внутренней ошибке Decimal."""
+    with pytest.raises(DivisionByZeroError):
+        Interpreter().execute("0 ** -1")
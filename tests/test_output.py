@@ -0,0 +1,125 @@
+"""Тесты для приёмников вывода print и трассировки."""
+
+from concurrent.futures import ThreadPoolExecutor
+import io
+
+import pytest
+
+import cli
+from interpreter import DSLError, Interpreter
+from output import FLUSH_ALWAYS, FLUSH_LINE, ListSink, NullSink, StreamSink
+
+LOOP = 'for i in 1 .. 5 (print("i", i))'
+
+
+class _CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def write(self, text):
+        self.calls += 1
+        return super().write(text)
+
+
+def test_list_sink_captures_without_stdout(capsys):
+    """ListSink захватывает вывод, sys.stdout не используется."""
+    sink = ListSink()
+    Interpreter(output=sink).execute(LOOP)
+    assert sink.getvalue().splitlines() == [f"i {i}.0000000000" for i in range(1, 6)]
+    assert capsys.readouterr().out == ""
+
+
+def test_null_sink(capsys):
+    """NullSink отбрасывает вывод."""
+    assert Interpreter(output=NullSink()).execute('print("x")\n2 + 2') == 4
+    assert capsys.readouterr().out == ""
+
+
+def test_default_writes_to_current_stdout(capsys):
+    """По умолчанию вывод идёт в текущий sys.stdout, как у print."""
+    Interpreter().execute('print("hello")')
+    assert capsys.readouterr().out == "hello\n"
+
+
+def test_size_policy_batches_writes():
+    """Политика size записывает вывод одной операцией при сбросе."""
+    stream = _CountingStream()
+    Interpreter(output=StreamSink(stream)).execute(LOOP)
+    assert stream.calls == 1
+    assert stream.getvalue().count("\n") == 5
+
+
+def test_size_policy_flushes_when_full():
+    """Заполненный буфер сбрасывается во время выполнения."""
+    stream = _CountingStream()
+    sink = StreamSink(stream, buffer_size=40)
+    sink.write("a" * 30 + "\n")
+    assert stream.calls == 0
+    sink.write("b" * 30 + "\n")
+    assert stream.calls == 1
+    assert stream.getvalue() == "a" * 30 + "\n" + "b" * 30 + "\n"
+
+
+@pytest.mark.parametrize("policy", [FLUSH_ALWAYS, FLUSH_LINE])
+def test_unbuffered_policies(policy):
+    """Политики always и line записывают каждую строку сразу."""
+    stream = _CountingStream()
+    sink = StreamSink(stream, policy=policy)
+    sink.write("one\n")
+    assert stream.getvalue() == "one\n"
+    sink.write("par")
+    assert stream.getvalue() == ("one\npar" if policy == FLUSH_ALWAYS else "one\n")
+    sink.flush()
+    assert stream.getvalue() == "one\npar"
+
+
+def test_interval_policy():
+    """С interval=0 каждая запись сбрасывает буфер, даже если он не заполнен."""
+    stream = _CountingStream()
+    sink = StreamSink(stream, interval=0)
+    sink.write("x\n")
+    sink.write("y\n")
+    assert stream.calls == 2
+
+
+def test_invalid_policy():
+    """Неизвестная политика сброса отвергается."""
+    with pytest.raises(ValueError):
+        StreamSink(policy="never")
+
+
+def test_output_flushed_before_error():
+    """Вывод до ошибки записан к моменту исключения."""
+    stream = io.StringIO()
+    with pytest.raises(DSLError):
+        Interpreter(output=StreamSink(stream)).execute('print("before")\n1 / 0')
+    assert stream.getvalue() == "before\n"
+
+
+def test_trace_goes_to_sink():
+    """Трассировка пишется в тот же приёмник."""
+    sink = ListSink()
+    Interpreter(trace=True, output=sink).execute("x = 2\nx * 3")
+    assert sink.getvalue() == "- 1: x = 2\n+ x = 2.0000000000\n- 2: x * 3\n+ 6.0000000000\n"
+
+
+def test_threads_capture_independently():
+    """Интерпретаторы в разных потоках захватывают свой вывод без redirect_stdout."""
+
+    def run(index):
+        sink = ListSink()
+        Interpreter(output=sink).execute(f'for i in 1 .. 200 (print("t", {index}))')
+        return set(sink.getvalue().splitlines())
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(run, range(4)))
+    assert results == [{f"t {index}.0000000000"} for index in range(4)]
+
+
+def test_cli_flush_option(tmp_path, capsys):
+    """CLI принимает политику сброса вывода."""
+    script = tmp_path / "loop.clc"
+    script.write_text(LOOP, encoding="utf-8")
+    assert cli.main([str(script), "--flush", "line"]) == 0
+    assert capsys.readouterr().out.count("\n") == 5
@@ -0,0 +1,102 @@
+"""Тесты для пула интерпретаторов и сброса состояния."""
+
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+import threading
+
+import pytest
+
+from interpreter import DSLError, Interpreter
+from pool import InterpreterPool, PoolTimeout
+
+
+def test_reset_restores_touched_variables():
+    """reset() возвращает изменённые переменные и точность к контрольной точке."""
+    interp = Interpreter(initial_env={"a": Decimal(1), "b": Decimal(2)})
+    interp.checkpoint()
+    interp.execute("a = 10\nc = 3\nfor i in 1 .. 3 (b += i)\nset_precision(2)")
+    assert interp.reset() == 4  # a, c, i, b
+    assert interp.execute("a + b") == Decimal(3)
+    assert interp.precision == 10
+    with pytest.raises(DSLError, match="Variable not found: c"):
+        interp.execute("c")
+
+
+def test_reset_after_error():
+    """Состояние восстанавливается и после ошибки посреди цикла."""
+    interp = Interpreter()
+    interp.checkpoint()
+    with pytest.raises(DSLError):
+        interp.execute("for i in 1 .. 5 (x = 1 / (i - 3))")
+    interp.reset()
+    assert interp.get_variable("i") is None
+    assert interp.get_variable("x") is None
+    assert interp.state.loop_stack == []
+
+
+def test_reset_requires_checkpoint():
+    """reset() без checkpoint() - ошибка."""
+    with pytest.raises(RuntimeError):
+        Interpreter().reset()
+
+
+def test_pool_isolates_requests():
+    """Переменные одного запроса не видны следующему."""
+    pool = InterpreterPool(size=1, initial_env={"rate": Decimal(2)})
+    assert pool.execute("x * rate", env={"x": Decimal(5)}) == Decimal(10)
+    with pytest.raises(DSLError, match="Variable not found: x"):
+        pool.execute("x")
+    with pool.lease() as interp:
+        assert interp.get_variable("rate") == Decimal(2)
+
+
+def test_acquire_timeout():
+    """Если свободных интерпретаторов нет, acquire() ждёт не дольше timeout."""
+    pool = InterpreterPool(size=1)
+    held = pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire(timeout=0.05)
+    pool.release(held)
+    assert pool.stats().timeouts == 1
+
+
+def test_release_foreign_interpreter():
+    """Чужой интерпретатор вернуть нельзя."""
+    with pytest.raises(ValueError):
+        InterpreterPool(size=1).release(Interpreter())
+
+
+def test_waiters_are_woken():
+    """Освобождение интерпретатора будит ожидающий поток."""
+    pool = InterpreterPool(size=1)
+    held = pool.acquire()
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(pool.execute("1 + 1", timeout=5)))
+    waiter.start()
+    pool.release(held)
+    waiter.join()
+    assert result == [Decimal(2)]
+
+
+def test_concurrent_use_and_metrics():
+    """Пул ограничивает параллельность; метрики отражают нагрузку."""
+    pool = InterpreterPool(size=2)
+
+    def run(x):
+        return pool.execute("s = 0\nfor i in 1 .. 20 (s += x)\ns", env={"x": Decimal(x)})
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        results = list(executor.map(run, range(30)))
+    assert results == [Decimal(20 * x) for x in range(30)]
+    stats = pool.stats()
+    assert stats.size == 2
+    assert stats.in_use == 0
+    assert stats.acquired == 30
+    assert stats.wait_max >= stats.wait_mean >= 0
+    assert 0 < stats.utilization <= 1
+
+
+def test_invalid_size():
+    """Размер пула должен быть положительным."""
+    with pytest.raises(ValueError):
+        InterpreterPool(size=0)
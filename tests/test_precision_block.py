@@ -0,0 +1,105 @@
+"""Тесты для блоков с лексической точностью: with precision N (...)."""
+
+from decimal import Decimal
+
+import pytest
+
+from interpreter import DSLError, Interpreter
+
+
+def eval_code(code: str):
+    """Вспомогательная функция для выполнения кода."""
+    return Interpreter().execute(code)
+
+
+def test_precision_block_result_uses_inner_precision():
+    """Вычисления внутри блока идут с точностью блока."""
+    code = """
+    x = with precision 2 (1 / 3 * 3)
+    x
+    """
+    assert eval_code(code) == Decimal("0.99")
+
+
+def test_precision_block_restores_outer_precision():
+    """После блока восстанавливается внешняя точность."""
+    interp = Interpreter()
+    result = interp.execute("with precision 3 (1 / 3)\n1 / 3")
+    assert result == Decimal("0.3333333333")
+    assert interp.precision == 10
+
+
+def test_precision_block_result_rounded_to_outer_precision():
+    """Результат блока с высокой точностью округляется до внешней точности."""
+    result = eval_code("with precision 30 (1 / 3)")
+    assert result == Decimal("0.3333333333")
+
+
+def test_precision_block_with_dynamic_precision():
+    """Точность может задаваться выражением."""
+    code = """
+    n = 2
+    with precision n + 1 (get_precision())
+    """
+    assert eval_code(code) == Decimal("3")
+
+
+def test_precision_block_restores_after_set_precision_inside():
+    """set_precision внутри блока действует только до конца блока."""
+    interp = Interpreter()
+    interp.execute("with precision 4 (set_precision(1); x = 1 / 3)")
+    assert interp.precision == 10
+    assert interp.execute("x") == Decimal("0.3")
+
+
+def test_precision_block_restores_after_break():
+    """Выход из цикла через break восстанавливает точность."""
+    code = """
+    r = for i in 1 .. 5 (
+        with precision 0 (
+            break when i == 2 with 7 / 2
+        )
+    )
+    p = get_precision()
+    p
+    """
+    interp = Interpreter()
+    assert interp.execute(code) == Decimal("10")
+    assert interp.execute("r") == Decimal("4")
+
+
+def test_precision_block_restores_after_error():
+    """Ошибка внутри блока не оставляет изменённую точность."""
+    interp = Interpreter()
+    with pytest.raises(DSLError):
+        interp.execute("with precision 2 (1 / 0)")
+    assert interp.precision == 10
+
+
+@pytest.mark.parametrize("precision", ["-1", "1.5"])
+def test_precision_block_rejects_invalid_precision(precision):
+    """Точность должна быть целым числом >= 0."""
+    with pytest.raises(DSLError, match="precision block expects integer >= 0"):
+        eval_code(f"with precision {precision} (1)")
+
+
+def test_constant_precision_is_resolved_at_compile_time():
+    """Константная точность вычисляется один раз при компиляции."""
+    interp = Interpreter()
+    tree = interp._compile(interp.parse("with precision 5 (1 / 3)"))
+    block = next(tree.find_data("precision_block"))
+    assert block.children[0] == 5
+
+
+@pytest.mark.parametrize(
+    "code",
+    ["with precision 10 ** 20 (1)", "with precision 2000001 (1)", "set_precision(10 ** 20)"],
+)
+def test_precision_above_maximum_is_dsl_error(code):
+    """Слишком большая точность - ошибка DSL с позицией, точность не меняется."""
+    interp = Interpreter()
+    with pytest.raises(DSLError) as info:
+        interp.execute(code)
+    assert info.value.line == 1
+    assert interp.precision == 10
+    assert interp.execute("1 / 3") == Decimal("0.3333333333")
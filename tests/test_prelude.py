@@ -0,0 +1,119 @@
+"""Тесты для снимков прелюдии и опции --prelude."""
+
+import csv
+import io
+from decimal import Decimal
+import pickle
+
+import pytest
+
+import cli
+from interpreter import DSLError, ExecutionState
+from numeric import FloatBackend
+from parallel import run_many
+from pipeline import JsonlSession
+from program import Program, Snapshot
+
+PRELUDE = "set_precision(4)\nrate = 0.25\nsquares = 0\nfor i in 1 .. 4 (squares += i * i)\n"
+
+
+@pytest.fixture
+def snapshot():
+    return Snapshot.capture(Program.compile(PRELUDE))
+
+
+def test_capture(snapshot):
+    """Снимок содержит переменные и точность после прелюдии."""
+    assert dict(snapshot.env) == {"rate": Decimal("0.25"), "squares": Decimal(30)}
+    assert snapshot.precision == 4
+    with pytest.raises(TypeError):
+        snapshot.env["rate"] = Decimal(1)
+
+
+def test_forks_are_independent(snapshot):
+    """Изменения в ответвлении не видны снимку и другим ответвлениям."""
+    program = Program.compile("rate = rate * 2\nset_precision(1)\nrate + x")
+    first = snapshot.fork({"x": Decimal(1)})
+    assert program.run(first) == Decimal("1.5")
+    second = snapshot.fork({"x": Decimal(0)})
+    assert second.env["rate"] == Decimal("0.25")
+    assert second.precision == 4
+    assert snapshot.env["rate"] == Decimal("0.25")
+    assert snapshot.precision == 4
+
+
+def test_fork_overrides_prelude(snapshot):
+    """Переменные запуска имеют приоритет над переменными прелюдии."""
+    assert Program.compile("rate").run(snapshot.fork({"rate": Decimal(3)})) == Decimal(3)
+
+
+def test_from_state_and_backend():
+    """Снимок можно снять с любого состояния, в том числе с FloatBackend."""
+    state = ExecutionState(env={"a": 1.5}, backend=FloatBackend(3))
+    snapshot = Snapshot.from_state(state)
+    state.env["a"] = 2.0
+    state.backend.precision = 5
+    fork = snapshot.fork()
+    assert fork.env == {"a": 1.5}
+    assert isinstance(fork.backend, FloatBackend)
+    assert fork.precision == 3
+
+
+def test_pickle(snapshot):
+    """Снимок передаётся в другие процессы."""
+    restored = pickle.loads(pickle.dumps(snapshot))
+    assert dict(restored.env) == dict(snapshot.env)
+    assert restored.precision == 4
+
+
+def test_prelude_error():
+    """Ошибка прелюдии сообщается при снятии снимка."""
+    with pytest.raises(DSLError):
+        Snapshot.capture(Program.compile("1 / 0"))
+
+
+def test_run_many_with_prelude(snapshot):
+    """Прелюдия передаётся рабочим процессам один раз."""
+    overrides = ({"x": Decimal(i)} for i in range(20))
+    results = list(run_many("squares + x * rate", overrides, jobs=2, chunk_size=3, prelude=snapshot))
+    assert [r.value for r in results] == [f"{30 + i / 4:.4f}" for i in range(20)]
+
+
+@pytest.fixture
+def files(tmp_path):
+    (tmp_path / "lib.clc").write_text(PRELUDE, encoding="utf-8")
+    (tmp_path / "main.clc").write_text("squares * rate + x", encoding="utf-8")
+    (tmp_path / "rows.csv").write_text("x\n1\n2\n", encoding="utf-8")
+    return tmp_path
+
+
+def test_cli_prelude_single_run(files, capsys):
+    """Одиночный запуск начинается со снимка прелюдии."""
+    assert cli.main([str(files / "main.clc"), "x=1", "--prelude", str(files / "lib.clc")]) == 0
+    assert capsys.readouterr().out == "8.5000\n"
+
+
+def test_cli_prelude_with_input(files, capsys):
+    """--prelude действует в пакетном режиме --input."""
+    args = [str(files / "main.clc"), "--input", str(files / "rows.csv"), "--jobs", "1"]
+    assert cli.main([*args, "--prelude", str(files / "lib.clc")]) == 0
+    rows = list(csv.reader(io.StringIO(capsys.readouterr().out)))
+    assert [row[:2] for row in rows[1:]] == [["1", "8.5000"], ["2", "9.5000"]]
+
+
+def test_cli_prelude_errors(files, capsys):
+    """Отсутствующая или ошибочная прелюдия - ошибка до запуска скрипта."""
+    main = str(files / "main.clc")
+    assert cli.main([main, "--prelude", str(files / "missing.clc")]) == 2
+    (files / "bad.clc").write_text("1 / 0", encoding="utf-8")
+    assert cli.main([main, "--prelude", str(files / "bad.clc")]) == 1
+    assert "Prelude failed: division by zero" in capsys.readouterr().err
+
+
+def test_jsonl_session_with_prelude(snapshot):
+    """Запросы JSON Lines начинаются со снимка; precision запроса применяется."""
+    session = JsonlSession(prelude=snapshot)
+    assert session.handle({"source": "squares"})["value"] == "30.0000"
+    assert session.handle({"source": "rate", "precision": 1})["value"] == "0.3"
+    session.handle({"source": "rate = 1"})
+    assert session.handle({"source": "rate"})["value"] == "0.2500"
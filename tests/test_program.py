@@ -0,0 +1,111 @@
+"""Тесты для скомпилированной программы и состояния выполнения."""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from decimal import Decimal
+import math
+import pickle
+
+import pytest
+
+from functions import BUILTINS
+from interpreter import DSLError, ExecutionState, Interpreter
+from numeric import DecimalBackend, FloatBackend
+from program import Program
+
+SOURCE = "y = x * 2\nfor i in 1 .. 3 (y += sqrt(4))\ny + sin(0)"
+
+
+def test_run_against_state():
+    """Программа выполняется в переданном состоянии; переменные остаются в нём."""
+    program = Program.compile(SOURCE)
+    state = ExecutionState(env={"x": Decimal(3)})
+    assert program.run(state) == Decimal(12)
+    assert state.env["y"] == Decimal(12)
+    assert "i" not in state.env
+    assert state.loop_stack == []
+
+
+def test_runs_are_independent():
+    """Одна программа - много запусков без общего состояния."""
+    program = Program.compile("a = a + x if x > 1 else x\na")
+    assert program.evaluate({"a": Decimal(10), "x": Decimal(2)}) == Decimal(12)
+    env = {"a": Decimal(10), "x": Decimal(3)}
+    assert program.evaluate(env) == Decimal(13)
+    assert env["a"] == Decimal(10)
+
+
+def test_precision_lives_in_state():
+    """Точность - часть состояния, а не программы."""
+    program = Program.compile("1 / 3")
+    assert program.run(ExecutionState(backend=DecimalBackend(3))) == Decimal("0.333")
+    assert program.run(ExecutionState(backend=FloatBackend())) == pytest.approx(1 / 3)
+    state = ExecutionState()
+    Program.compile("set_precision(2)").run(state)
+    assert state.precision == 2
+    assert program.run(state) == Decimal("0.33")
+
+
+def test_state_get_and_format():
+    """ExecutionState даёт доступ к переменным и константам."""
+    state = ExecutionState(env={"x": Decimal("1.5")})
+    assert state.get("x") == Decimal("1.5")
+    assert state.get("pi") == Decimal("3.1415926536")
+    assert state.get("missing", 0) == 0
+    assert state.format(Decimal(2)) == "2.0000000000"
+
+
+def test_errors():
+    """Ошибки выполнения сообщаются как у интерпретатора."""
+    program = Program.compile("1 / x")
+    with pytest.raises(DSLError, match="division by zero"):
+        program.evaluate({"x": Decimal(0)})
+
+
+def test_pickle_roundtrip():
+    """Программа сериализуется без кэшей мест вызова."""
+    program = Program.compile(SOURCE)
+    program.evaluate({"x": Decimal(1)})
+    restored = pickle.loads(pickle.dumps(program))
+    assert restored.source == program.source
+    assert restored.evaluate({"x": Decimal(3)}) == Decimal(12)
+
+
+def _hypot(x, y):
+    return math.hypot(x, y)
+
+
+def test_pickle_with_host_function():
+    """Функции хоста уровня модуля сериализуются вместе с программой."""
+    registry = BUILTINS.copy()
+    registry.register("hypot", _hypot, arity=2)
+    program = pickle.loads(pickle.dumps(Program.compile("hypot(3, x)", registry)))
+    assert program.evaluate({"x": Decimal(4)}) == Decimal(5)
+
+
+def test_shared_between_threads():
+    """Одну программу выполняют несколько потоков одновременно."""
+    program = Program.compile(SOURCE)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(
+            lambda x: program.evaluate({"x": Decimal(x)}), range(40)
+        ))
+    assert results == [Decimal(2 * x + 6) for x in range(40)]
+
+
+def test_shared_with_processes():
+    """Программа передаётся в рабочие процессы без повторной компиляции."""
+    program = Program.compile(SOURCE)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(program.evaluate, [{"x": Decimal(x)} for x in range(4)]))
+    assert results == [Decimal(2 * x + 6) for x in range(4)]
+
+
+def test_interpreter_state():
+    """Интерпретатор работает поверх ExecutionState."""
+    state = ExecutionState(env={"x": Decimal(2)})
+    interp = Interpreter(state=state)
+    interp.execute("z = x + 1")
+    assert interp.state is state
+    assert state.env["z"] == Decimal(3)
+    with pytest.raises(ValueError):
+        Interpreter(state=state, backend=FloatBackend())
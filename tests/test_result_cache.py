@@ -0,0 +1,137 @@
+"""Тесты для дискового кэша результатов."""
+
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+
+import pytest
+
+import cli
+from interpreter import DSLError
+from resultcache import _ENGINE_FILES, _EVICT_EVERY, CACHE_DIR_ENV, ResultCache, cacheable
+
+SOURCE = 'y = x * 2\nprint("y", y)\ny + 1'
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(tmp_path / "cache")
+
+
+def test_hit_after_miss(cache):
+    """Повторный запуск с теми же входами берётся из кэша вместе с выводом."""
+    first = cache.execute(SOURCE, {"x": Decimal(3)})
+    assert (first.value, first.output, first.hit) == ("7.0000000000", "y 6.0000000000\n", False)
+    second = cache.execute(SOURCE, {"x": Decimal(3)})
+    assert (second.value, second.output, second.hit) == (first.value, first.output, True)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_key_inputs(cache):
+    """Ключ зависит от кода, переменных и точности, но не от порядка переменных."""
+    key = cache.key(SOURCE, {"x": Decimal(1), "z": Decimal(2)}, 10)
+    assert key == cache.key(SOURCE, {"z": Decimal(2), "x": Decimal(1)}, 10)
+    assert key != cache.key(SOURCE + "\n", {"x": Decimal(1), "z": Decimal(2)}, 10)
+    assert key != cache.key(SOURCE, {"x": Decimal(1), "z": Decimal(3)}, 10)
+    assert key != cache.key(SOURCE, {"x": Decimal(1), "z": Decimal(2)}, 11)
+
+
+def test_key_keeps_value_type(cache):
+    """Значения с одинаковой записью, но разного типа - разные ключи."""
+    assert cache.key("x", {"x": Decimal("1.0")}, 10) != cache.key("x", {"x": 1.0}, 10)
+    source = "print(x)\nx"
+    decimal = cache.execute(source, {"x": Decimal("1.0")})
+    plain = cache.execute(source, {"x": 1.0})
+    assert not plain.hit
+    assert (decimal.output, plain.output) == ("1.0000000000\n", "1.0\n")
+
+
+def test_engine_version_covers_output_path():
+    """Версия интерпретатора учитывает модули форматирования и вывода print."""
+    assert {"bigformat.py", "output.py", "numeric.py"} <= set(_ENGINE_FILES)
+
+
+def test_precision(cache):
+    """Начальная точность - часть ключа."""
+    assert cache.execute("1 / 3", precision=2).value == "0.33"
+    assert cache.execute("1 / 3", precision=4).value == "0.3333"
+    assert cache.execute("1 / 3", precision=2).hit
+
+
+def test_errors_not_cached(cache):
+    """Ошибки выполнения не кэшируются."""
+    for _ in range(2):
+        with pytest.raises(DSLError):
+            cache.execute("1 / x", {"x": Decimal(0)})
+    assert not list(cache.directory.glob("*/*.json"))
+
+
+def test_import_not_cached():
+    """Программы с import зависят от файлов модулей и выполняются всегда."""
+    assert not cacheable('import "lib.clc"\nk')
+    assert cacheable("important = 1")
+
+
+def test_corrupted_entry_is_miss(cache):
+    """Повреждённая запись считается промахом и перезаписывается."""
+    cache.execute("2 + 2")
+    (entry,) = cache.directory.glob("*/*.json")
+    entry.write_text("{not json", encoding="utf-8")
+    assert not cache.execute("2 + 2").hit
+    assert cache.execute("2 + 2").hit
+
+
+def test_eviction_by_size(tmp_path):
+    """Сверх max_bytes удаляются давно не использованные записи."""
+    cache = ResultCache(tmp_path / "cache", max_bytes=200)
+    for i in range(10):
+        cache.execute(f"{i} + 1")
+    assert cache.evict() > 0
+    entries = list(cache.directory.glob("*/*.json"))
+    assert sum(path.stat().st_size for path in entries) <= 200
+    assert cache.execute("9 + 1").hit
+    assert not cache.execute("0 + 1").hit
+
+
+def test_eviction_is_amortized(cache, monkeypatch):
+    """Каталог просматривается один раз на _EVICT_EVERY записей, а не при каждой."""
+    calls = []
+    monkeypatch.setattr(cache, "evict", lambda: calls.append(None))
+    for i in range(_EVICT_EVERY):
+        cache.put(cache.key(str(i), None, 10), str(i), "")
+    assert len(calls) == 1
+
+
+def _run(directory, x):
+    return ResultCache(directory).execute(SOURCE, {"x": Decimal(x)}).value
+
+
+def test_concurrent_processes(tmp_path):
+    """Процессы одновременно пишут одни и те же записи без повреждений."""
+    directory = str(tmp_path / "cache")
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        values = list(executor.map(_run, [directory] * 8, [1, 2] * 4))
+    assert values == ["3.0000000000", "5.0000000000"] * 4
+    assert len(list((tmp_path / "cache").glob("*/*.json"))) == 2
+    assert not list((tmp_path / "cache").glob("*/*.tmp"))
+
+
+def test_cli_cache(tmp_path, capsys, monkeypatch):
+    """CLI использует кэш из --cache-dir или переменной окружения; --no-cache его обходит."""
+    script = tmp_path / "s.clc"
+    script.write_text(SOURCE, encoding="utf-8")
+    directory = tmp_path / "cache"
+    assert cli.main([str(script), "x=3", "--cache-dir", str(directory)]) == 0
+    assert capsys.readouterr().out == "y 6.0000000000\n7.0000000000\n"
+    assert len(list(directory.glob("*/*.json"))) == 1
+
+    # Подменённая запись показывает, что результат взят из кэша
+    cache = ResultCache(directory)
+    cache.put(cache.key(SOURCE, {"x": Decimal(3)}, 10), "cached", "")
+    monkeypatch.setenv(CACHE_DIR_ENV, str(directory))
+    assert cli.main([str(script), "x=3"]) == 0
+    assert capsys.readouterr().out == "cached\n"
+
+    cache.clear()
+    assert cli.main([str(script), "x=3", "--no-cache"]) == 0
+    assert capsys.readouterr().out == "y 6.0000000000\n7.0000000000\n"
+    assert not list(directory.glob("*/*.json"))
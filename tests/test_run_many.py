@@ -0,0 +1,101 @@
+"""Тесты для подкоманды run-many и parallel.run_files."""
+
+import json
+import os
+
+import pytest
+
+import cli
+from parallel import run_file, run_files
+
+
+@pytest.fixture
+def scripts(tmp_path):
+    files = {
+        "ok.clc": "x = 2\nprint(\"x\", x)\nx * 3\n",
+        "div.clc": "1 / 0\n",
+        "syntax.clc": "1 +* 2\n",
+        "long.clc": "s = 0\nfor i in 1 .. 50 (s += i)\n" + "# padding\n" * 20 + "s\n",
+        "notes.txt": "not a script",
+    }
+    for name, text in files.items():
+        (tmp_path / name).write_text(text, encoding="utf-8")
+    return tmp_path
+
+
+def test_run_file(scripts):
+    """Результат, вывод и время выполнения собираются для файла."""
+    result = run_file(str(scripts / "ok.clc"))
+    assert result.ok
+    assert result.value == "6.0000000000"
+    assert result.output == "x 2.0000000000\n"
+    assert result.seconds >= 0
+
+
+@pytest.mark.parametrize(
+    "name, error",
+    [
+        ("div.clc", "division by zero (line 1, column 1)"),
+        ("syntax.clc", "Syntax error: No terminal matches '*'"),
+        ("missing.clc", "Cannot read script"),
+    ],
+)
+def test_run_file_errors(scripts, name, error):
+    """Ошибки разбора, выполнения и чтения возвращаются в результате."""
+    result = run_file(str(scripts / name))
+    assert not result.ok
+    assert result.error.startswith(error)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_run_files_non_dsl_error(scripts, jobs):
+    """Прочие исключения файла - его ошибка; остальные файлы выполняются."""
+    overflow = scripts / "overflow.clc"
+    overflow.write_text("10 ** (10 ** 20)\n", encoding="utf-8")
+    results = {r.path: r for r in run_files([str(overflow), str(scripts / "ok.clc")], jobs)}
+    assert results[str(overflow)].error.startswith("Overflow: ")
+    assert results[str(scripts / "ok.clc")].value == "6.0000000000"
+
+
+def test_largest_files_first(scripts):
+    """В одном процессе файлы выполняются по убыванию размера."""
+    paths = [str(path) for path in scripts.glob("*.clc")]
+    order = [os.path.basename(result.path) for result in run_files(paths)]
+    assert order[0] == "long.clc"
+    sizes = [os.path.getsize(scripts / name) for name in order]
+    assert sizes == sorted(sizes, reverse=True)
+
+
+def test_run_many_text_report(scripts, capsys):
+    """Отчёт упорядочен по пути; код возврата ненулевой при ошибках."""
+    assert cli.main(["run-many", str(scripts), "--jobs", "1"]) == 1
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split()[0] for line in lines[:4]] == ["FAIL", "ok", "ok", "FAIL"]
+    assert lines[1].endswith("long.clc: 1275.0000000000")
+    assert lines[-1].startswith("4 scripts, 2 ok, 2 failed in")
+
+
+def test_run_many_json_report_in_workers(scripts, tmp_path):
+    """Пул процессов даёт те же результаты; отчёт можно записать в файл."""
+    report = tmp_path / "report.json"
+    args = ["run-many", str(scripts), "--format", "json", "--report", str(report)]
+    assert cli.main([*args, "--jobs", "2"]) == 1
+    data = json.loads(report.read_text(encoding="utf-8"))
+    assert (data["total"], data["failed"]) == (4, 2)
+    by_name = {os.path.basename(item["path"]): item for item in data["scripts"]}
+    assert by_name["ok.clc"]["result"] == "6.0000000000"
+    assert by_name["div.clc"]["error"] == "division by zero (line 1, column 1)"
+
+
+def test_run_many_all_ok(scripts, capsys):
+    """Без ошибок код возврата 0."""
+    assert cli.main(["run-many", str(scripts), "--pattern", "ok.clc", "--jobs", "1"]) == 0
+    assert "1 scripts, 1 ok, 0 failed" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("args", [["missing-dir"], ["{dir}", "--pattern", "*.none"]])
+def test_run_many_nothing_to_run(scripts, capsys, args):
+    """Отсутствующий каталог и пустой набор скриптов - ошибка использования."""
+    argv = [arg.format(dir=scripts) for arg in args]
+    assert cli.main(["run-many", *argv]) == 2
+    assert capsys.readouterr().err
@@ -0,0 +1,168 @@
+"""Тесты для сервера вычислений (cli.py serve)."""
+
+from http import HTTPStatus
+import http.client
+import json
+from decimal import Decimal
+import socket
+import threading
+
+import pytest
+
+from server import (
+    EvaluationService,
+    _ProgramMissing,
+    _compile,
+    _evaluate,
+    _init_worker,
+    make_server,
+    script_id_for,
+)
+
+SCRIPT = 'print("x =", x)\nx * 2'
+
+
+@pytest.fixture(scope="module")
+def service():
+    with EvaluationService(jobs=1, cache_size=2, timeout=2.0) as svc:
+        yield svc
+
+
+def test_script_and_script_id(service):
+    """Программа компилируется один раз; дальше достаточно script_id."""
+    status, payload = service.handle({"script": SCRIPT, "overrides": {"x": "21"}})
+    assert status == HTTPStatus.OK
+    assert payload["result"] == "42.0000000000"
+    assert payload["output"] == "x = 21.0000000000\n"
+    assert payload["script_id"] == script_id_for(SCRIPT)
+    status, payload = service.handle(
+        {"script_id": script_id_for(SCRIPT), "overrides": {"x": 1.5}, "precision": 2}
+    )
+    assert (status, payload["result"]) == (HTTPStatus.OK, "3.00")
+
+
+def test_dsl_error_in_payload(service):
+    """Ошибки DSL возвращаются в поле error."""
+    status, payload = service.handle({"script": "1 / x", "overrides": {"x": 0}})
+    assert status == HTTPStatus.OK
+    assert payload["result"] is None
+    assert payload["error"] == "division by zero (line 1, column 1)"
+
+
+@pytest.mark.parametrize(
+    "request_, status, message",
+    [
+        ([], HTTPStatus.BAD_REQUEST, "Request must be a JSON object"),
+        ({}, HTTPStatus.BAD_REQUEST, "Request needs script or script_id"),
+        ({"script": "1 +* 2"}, HTTPStatus.BAD_REQUEST, "Syntax error"),
+        ({"script_id": "missing"}, HTTPStatus.NOT_FOUND, "Unknown script_id"),
+        ({"script": "x", "overrides": {"x": "abc"}}, HTTPStatus.BAD_REQUEST, "Invalid numeric"),
+        ({"script": "1", "precision": -1}, HTTPStatus.BAD_REQUEST, "precision must be"),
+        ({"script": "1", "precision": 10**6}, HTTPStatus.BAD_REQUEST, "precision must be"),
+        ({"script": "1", "timeout": 0}, HTTPStatus.BAD_REQUEST, "timeout must be"),
+    ],
+)
+def test_bad_requests(service, request_, status, message):
+    """Некорректные запросы отклоняются с кодом 4xx."""
+    got_status, payload = service.handle(request_)
+    assert got_status == status
+    assert payload["error"].startswith(message)
+
+
+def test_non_dsl_errors(service):
+    """Прочие исключения не обрывают соединение, а возвращаются в ответе."""
+    depth = 300
+    status, payload = service.handle({"script": "(" * depth + "1" + ")" * depth})
+    assert (status, payload["error"]) == (HTTPStatus.BAD_REQUEST, "Program is too deeply nested")
+    status, payload = service.handle({"script": "10 ** (10 ** 20)"})
+    assert status == HTTPStatus.INTERNAL_SERVER_ERROR
+    assert payload["error"].startswith("Overflow")
+    assert service.handle({"script": "1 + 1"})[1]["result"] == "2.0000000000"
+
+
+def test_timeout(service):
+    """Долгая программа прерывается по истечении времени."""
+    status, payload = service.handle({"script": "for i in 1 .. 10**9 (i)", "timeout": 0.2})
+    assert status == HTTPStatus.GATEWAY_TIMEOUT
+    assert payload["error"] == "Evaluation timed out after 0.2s"
+    # Рабочий процесс свободен для следующих запросов
+    assert service.handle({"script": "1 + 1"})[1]["result"] == "2.0000000000"
+
+
+def test_timeout_without_loops(service):
+    """Зависший без циклов процесс завершается, следующий запрос обслуживается."""
+    source = "set_precision(20000)\nln(2) + ln(3) + ln(5) + ln(7)"
+    status, _ = service.handle({"script": source, "timeout": 0.1})
+    assert status == HTTPStatus.GATEWAY_TIMEOUT
+    status, payload = service.handle({"script": "1 + 1", "timeout": 0.5})
+    assert (status, payload["result"]) == (HTTPStatus.OK, "2.0000000000")
+
+
+def test_program_sent_to_worker_once():
+    """Программа передаётся рабочему процессу, только если её нет в его кэше."""
+    _init_worker(4)
+    blob = _compile("x + 1")
+    args = ({"x": Decimal(1)}, None, 1.0)
+    with pytest.raises(_ProgramMissing):
+        _evaluate("id", None, *args)
+    assert _evaluate("id", blob, *args)[1]["result"] == "2.0000000000"
+    assert _evaluate("id", None, *args)[1]["result"] == "2.0000000000"
+
+
+def test_lru_eviction(service):
+    """Вытесненную программу нужно передать заново."""
+    for source in ("1", "2", "3"):
+        service.handle({"script": source})
+    status, _ = service.handle({"script_id": script_id_for("1")})
+    assert status == HTTPStatus.NOT_FOUND
+
+
+def serve_in_thread(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_http_roundtrip(service):
+    """HTTP: POST /eval и GET /health."""
+    server = make_server(service, port=0)
+    serve_in_thread(server)
+    try:
+        connection = http.client.HTTPConnection(*server.server_address[:2])
+        connection.request("GET", "/health")
+        assert json.loads(connection.getresponse().read()) == {"status": "ok"}
+        body = json.dumps({"script": SCRIPT, "overrides": {"x": 2}})
+        connection.request("POST", "/eval", body)
+        response = connection.getresponse()
+        assert response.status == 200
+        assert json.loads(response.read())["result"] == "4.0000000000"
+        connection.request("POST", "/eval", "not json")
+        assert connection.getresponse().status == 400
+        connection.request("POST", "/eval", "{}", headers={"Content-Length": "-1"})
+        response = connection.getresponse()
+        assert response.status == 400
+        assert json.loads(response.read()) == {"error": "Invalid Content-Length"}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_unix_socket_roundtrip(service, tmp_path):
+    """Unix-сокет: по одному JSON-объекту на строку."""
+    path = str(tmp_path / "calc.sock")
+    server = make_server(service, unix_path=path)
+    serve_in_thread(server)
+    try:
+        with socket.socket(socket.AF_UNIX) as client:
+            client.connect(path)
+            stream = client.makefile("rwb")
+            stream.write(json.dumps({"script": SCRIPT, "overrides": {"x": 5}}).encode() + b"\n")
+            stream.write(b"{broken\n")
+            stream.flush()
+            first = json.loads(stream.readline())
+            second = json.loads(stream.readline())
+        assert (first["status"], first["result"]) == (200, "10.0000000000")
+        assert second["status"] == 400
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,120 @@
+"""Тесты для режима --sweep командной строки и parallel.run_many."""
+
+import csv
+import io
+import json
+from decimal import Decimal
+
+import pytest
+
+import cli
+from parallel import ProgramRunner, run_many
+
+
+SCRIPT = 'z = x * y\nprint("z", z)\nz / (x - 2)\n'
+
+
+@pytest.fixture
+def script(tmp_path):
+    path = tmp_path / "sweep.clc"
+    path.write_text(SCRIPT, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "spec, expected",
+    [
+        ("x=1..3", ["1", "2", "3"]),
+        ("y=0.1..0.3 by 0.1", ["0.1", "0.2", "0.3"]),
+        ("n=3..1 by -1", ["3", "2", "1"]),
+        ("t=0..1 by 0.4", ["0", "0.4", "0.8"]),
+    ],
+)
+def test_parse_sweep(spec, expected):
+    """Диапазон включает конец; шаг по умолчанию 1."""
+    name, values = cli._parse_sweep(spec)
+    assert name == spec.split("=")[0]
+    assert values == [Decimal(v) for v in expected]
+
+
+@pytest.mark.parametrize("spec", ["x", "1x=1..2", "x=1..2 by 0", "x=3..1", "x=a..b"])
+def test_parse_sweep_errors(spec):
+    """Некорректные диапазоны отклоняются."""
+    with pytest.raises(ValueError):
+        cli._parse_sweep(spec)
+
+
+def test_sweep_csv(script, capsys):
+    """Сетка обходится в детерминированном порядке, результаты пишутся в CSV."""
+    code = cli.main(
+        [script, "--sweep", "x=3..4", "--sweep", "y=1..2", "by", "0.5", "--jobs", "1"]
+    )
+    assert code == 0
+    rows = list(csv.reader(io.StringIO(capsys.readouterr().out)))
+    assert rows[0] == ["x", "y", "result", "error", "output"]
+    assert [row[:3] for row in rows[1:]] == [
+        ["3", "1", "3.0000000000"],
+        ["3", "1.5", "4.5000000000"],
+        ["3", "2.0", "6.0000000000"],
+        ["4", "1", "2.0000000000"],
+        ["4", "1.5", "3.0000000000"],
+        ["4", "2.0", "4.0000000000"],
+    ]
+    assert rows[1][4] == "z 3.0000000000\n"
+
+
+def test_sweep_jsonl_with_errors(script, capsys):
+    """Ошибки точки записываются в результат, код возврата ненулевой."""
+    code = cli.main([script, "--sweep", "x=1..2", "y=2", "--format", "jsonl", "--jobs", "1"])
+    assert code == 1
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert records[0] == {
+        "x": "1",
+        "result": "-2.0000000000",
+        "error": None,
+        "output": "z 2.0000000000\n",
+    }
+    assert records[1]["result"] is None
+    assert records[1]["error"] == "division by zero (line 3, column 1)"
+
+
+def test_sweep_in_worker_processes(script, capsys):
+    """Результаты пула процессов совпадают с последовательными и идут по порядку."""
+    args = [script, "--sweep", "x=3..12", "--sweep", "y=1..3", "--format", "jsonl"]
+    assert cli.main([*args, "--jobs", "1"]) == 0
+    sequential = capsys.readouterr().out
+    assert cli.main([*args, "--jobs", "2"]) == 0
+    assert capsys.readouterr().out == sequential
+
+
+def test_sweep_rejects_trace(script):
+    """--trace несовместим с --sweep."""
+    with pytest.raises(SystemExit):
+        cli.main([script, "--sweep", "x=1..2", "--trace"])
+
+
+def test_program_runner_isolates_runs():
+    """Запуски не видят переменных друг друга."""
+    runner = ProgramRunner("a = a + x if x > 1 else x\na", base_env={"a": Decimal(10)})
+    assert runner.run({"x": Decimal(2)}).value == "12.0000000000"
+    assert runner.run({"x": Decimal(3)}).value == "13.0000000000"
+
+
+def test_run_many_preserves_order():
+    """run_many возвращает результаты в порядке входных наборов."""
+    overrides = ({"x": Decimal(i)} for i in range(50))
+    results = list(run_many("x * x", overrides, jobs=2, chunk_size=7))
+    assert [r.value for r in results] == [f"{i * i}.0000000000" for i in range(50)]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_non_dsl_errors_are_row_errors(jobs):
+    """Синтаксическая ошибка и прочие исключения - ошибки строк, а не всего пакета."""
+    overrides = [{"x": Decimal(0)}, {"x": Decimal(20)}, {"x": Decimal(1)}]
+    results = list(run_many("10 ** (10 ** x)", overrides, jobs=jobs))
+    assert [r.value for r in results] == ["10.0000000000", None, "10000000000.0000000000"]
+    assert results[1].error.startswith("Overflow")
+
+    results = list(run_many("1 +* x", overrides, jobs=jobs))
+    assert [r.value for r in results] == [None] * 3
+    assert all(r.error.startswith("Syntax error: ") for r in results)
@@ -0,0 +1,158 @@
+"""Тесты для кольцевого буфера трассировки и выборки событий."""
+
+import pytest
+
+import cli
+from interpreter import DivisionByZeroError, Interpreter
+from output import NullSink
+from tracing import FilterTraceSink, ListTraceSink, RingTraceSink, TraceEvent
+
+FAILING = """\
+s = 0
+for i in 1 .. 50 (
+    s += i
+    d = 1 / (i - 41)
+)
+"""
+
+NESTED = """\
+for i in 1 .. 4 (
+    for j in 1 .. 2 (
+        j
+    )
+    i
+)
+"""
+
+
+def _run(source, sink):
+    Interpreter(trace=sink, output=NullSink()).execute(source)
+
+
+def test_ring_keeps_last_events():
+    """Буфер хранит последние capacity событий по порядку."""
+    ring = RingTraceSink(3)
+    for line in range(1, 8):
+        ring.emit(TraceEvent("statement", line))
+    assert [event.line for event in ring.events()] == [5, 6, 7]
+    assert (ring.capacity, ring.dropped) == (3, 4)
+    ring.clear()
+    assert ring.events() == []
+
+
+def test_ring_dumps_on_error():
+    """При ошибке последние события и сама ошибка передаются в target."""
+    target = ListTraceSink()
+    ring = RingTraceSink(5, target)
+    with pytest.raises(DivisionByZeroError):
+        _run(FAILING, ring)
+    assert [(e.kind, e.line) for e in target.events] == [
+        ("iteration", 2),
+        ("statement", 3),
+        ("assign", 3),
+        ("statement", 4),
+        ("error", 4),
+    ]
+    assert target.events[0] == TraceEvent("iteration", 2, "i", "41.0000000000")
+    assert target.events[-1].value == "division by zero (line 4, column 9)"
+    assert ring.events() == []
+
+
+def test_ring_silent_on_success():
+    """Без ошибки накопленные события никуда не передаются."""
+    target = ListTraceSink()
+    ring = RingTraceSink(4, target)
+    _run("x = 1\nx + 1", ring)
+    assert target.events == []
+    assert [e.kind for e in ring.events()] == ["statement", "assign", "statement", "value"]
+
+
+def test_every_kth_iteration():
+    """every=3 оставляет 1-ю, 4-ю, 7-ю и 10-ю итерации со всем их содержимым."""
+    sink = ListTraceSink()
+    _run("for i in 1 .. 10 (\n  y = i\n)\ny", FilterTraceSink(sink, every=3))
+    iterations = [e.value for e in sink.events if e.kind == "iteration"]
+    assert iterations == [f"{i}.0000000000" for i in (1, 4, 7, 10)]
+    assert [e.value for e in sink.events if e.kind == "assign"] == iterations
+    assert [e.kind for e in sink.events][-3:] == ["end", "statement", "value"]
+
+
+def test_nested_loops_sampled_with_outer():
+    """Вложенный цикл виден только в выбранных итерациях внешнего."""
+    sink = ListTraceSink()
+    _run(NESTED, FilterTraceSink(sink, every=2))
+    outer = [e.value for e in sink.events if e.kind == "iteration" and e.name == "i"]
+    inner = [e for e in sink.events if e.name == "j"]
+    assert outer == ["1.0000000000", "3.0000000000"]
+    # j = 1 выбрана, j = 2 - нет; по одному входу, итерации и выходу на внешнюю итерацию
+    assert [e.kind for e in inner] == ["loop", "iteration", "end"] * 2
+
+
+def test_line_range_and_loop_filter():
+    """Отбор по диапазону строк и по переменной цикла."""
+    by_lines = ListTraceSink()
+    _run(NESTED, FilterTraceSink(by_lines, lines=(3, 3)))
+    assert {e.line for e in by_lines.events} == {3}
+    assert len(by_lines.events) == 16  # statement и value для каждой из 8 итераций j
+
+    by_loop = ListTraceSink()
+    _run(NESTED, FilterTraceSink(by_loop, loop_vars=["j"]))
+    assert {e.name for e in by_loop.events} <= {"j", ""}
+    assert [e.kind for e in by_loop.events][:3] == ["loop", "iteration", "statement"]
+    assert not any(e.line == 5 for e in by_loop.events)
+
+
+def test_filter_passes_errors_and_resets():
+    """Ошибка проходит через фильтр; следующий запуск начинается с чистого состояния."""
+    sink = ListTraceSink()
+    trace = FilterTraceSink(sink, every=1000, lines=(100, 200))
+    interpreter = Interpreter(trace=trace, output=NullSink())
+    with pytest.raises(DivisionByZeroError):
+        interpreter.execute(FAILING)
+    assert [e.kind for e in sink.events] == ["error"]
+    interpreter.execute("z = 1")
+    assert [e.kind for e in sink.events] == ["error"]
+
+
+@pytest.mark.parametrize("kwargs", [{"every": 0}, {"lines": (5, 2)}])
+def test_filter_rejects_invalid_arguments(kwargs):
+    """Неположительный шаг выборки и пустой диапазон строк отвергаются."""
+    with pytest.raises(ValueError):
+        FilterTraceSink(ListTraceSink(), **kwargs)
+
+
+def test_cli_trace_last(tmp_path, capsys):
+    """--trace-last выводит последние события только при ошибке."""
+    script = tmp_path / "fail.clc"
+    script.write_text(FAILING, encoding="utf-8")
+    assert cli.main([str(script), "--trace-last", "3", "--trace-every", "5"]) == 1
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == [
+        "+ s = 861.0000000000",
+        "- 4: d = 1 / (i - 41)",
+        "! division by zero (line 4, column 9)",
+    ]
+    assert "division by zero" in captured.err
+
+    script.write_text("s = 0\nfor i in 1 .. 5 (s += i)\ns", encoding="utf-8")
+    assert cli.main([str(script), "--trace-last", "3"]) == 0
+    assert capsys.readouterr().out == "15.0000000000\n"
+
+
+def test_plain_trace_has_no_error_line(tmp_path, capsys):
+    """Полная трассировка --trace не выводит строку ошибки: она уже в stderr."""
+    script = tmp_path / "fail.clc"
+    script.write_text("x = 1\n1 / (x - 1)", encoding="utf-8")
+    assert cli.main([str(script), "--trace"]) == 1
+    captured = capsys.readouterr()
+    assert captured.out == "- 1: x = 1\n+ x = 1.0000000000\n- 2: 1 / (x - 1)\n"
+    assert "division by zero" in captured.err
+
+
+def test_cli_rejects_bad_trace_options(tmp_path):
+    """Неверные параметры выборки - ошибка разбора аргументов."""
+    script = tmp_path / "s.clc"
+    script.write_text("1", encoding="utf-8")
+    for options in (["--trace-lines", "5..2"], ["--trace-every", "0"], ["--trace-last", "0"]):
+        with pytest.raises(SystemExit):
+            cli.main([str(script), *options])
@@ -0,0 +1,188 @@
+"""Тесты для структурированной трассировки."""
+
+import io
+import json
+
+import pytest
+
+import cli
+from interpreter import DuplicateLoopVariableError, Interpreter
+from output import ListSink, NullSink
+from program import Program
+from tracing import (
+    BinaryTraceSink,
+    FilterTraceSink,
+    JsonlTraceSink,
+    ListTraceSink,
+    TraceEvent,
+    read_binary,
+)
+
+LOOPS = """\
+r = for i in 1 .. 4 (
+    next when i == 2
+    break when i == 3 with i * 10
+    i
+)
+r
+"""
+
+
+def _events(source, **kwargs):
+    sink = ListTraceSink()
+    Interpreter(trace=sink, output=NullSink(), **kwargs).execute(source)
+    return sink.events
+
+
+def test_event_stream():
+    """Операторы, присваивания, цикл, итерации, next, break и выход - отдельные события."""
+    events = _events(LOOPS)
+    assert [(e.kind, e.line, e.name) for e in events] == [
+        ("statement", 1, ""),
+        ("loop", 1, "i"),
+        ("iteration", 1, "i"),
+        ("statement", 2, ""),
+        ("statement", 3, ""),
+        ("statement", 4, ""),
+        ("value", 4, ""),
+        ("iteration", 1, "i"),
+        ("statement", 2, ""),
+        ("next", 2, "i"),
+        ("iteration", 1, "i"),
+        ("statement", 2, ""),
+        ("statement", 3, ""),
+        ("break", 3, "i"),
+        ("end", 1, "i"),
+        ("assign", 1, "r"),
+        ("statement", 6, ""),
+        ("value", 6, ""),
+    ]
+    assert events[1].value == "1.0000000000 .. 4.0000000000"
+    assert events[0].text == "r = for i in 1 .. 4 ("
+    assert events[-3] == TraceEvent("assign", 1, "r", "30.0000000000")
+
+
+def test_text_format_unchanged():
+    """trace=True пишет прежний текст --trace в приёмник вывода."""
+    sink = ListSink()
+    Interpreter(trace=True, output=sink).execute("s = 0\nfor i in 1 .. 2 by 1 (\n  s += i\n)\ns")
+    assert sink.getvalue() == (
+        "- 1: s = 0\n"
+        "+ s = 0.0000000000\n"
+        "- 2: for i in 1 .. 2 by 1 (\n"
+        "- 2: for i in 1.0000000000 .. 2.0000000000 by 1.0000000000\n"
+        "+ i = 1.0000000000\n"
+        "- 3: s += i\n"
+        "+ s = 1.0000000000\n"
+        "+ i = 2.0000000000\n"
+        "- 3: s += i\n"
+        "+ s = 3.0000000000\n"
+        "- 5: s\n"
+        "+ 3.0000000000\n"
+    )
+
+
+def test_jsonl_sink():
+    """JSONL: одна запись на событие, пустые поля опущены."""
+    output = ListSink()
+    Interpreter(trace=JsonlTraceSink(output), output=NullSink()).execute("x = 2\nx * 3")
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert records == [
+        {"event": "statement", "line": 1, "text": "x = 2"},
+        {"event": "assign", "line": 1, "name": "x", "value": "2.0000000000"},
+        {"event": "statement", "line": 2, "text": "x * 3"},
+        {"event": "value", "line": 2, "value": "6.0000000000"},
+    ]
+
+
+def test_binary_round_trip():
+    """Двоичные записи читаются обратно без потерь, в том числе не-ASCII текст."""
+    stream = io.BytesIO()
+    sink = BinaryTraceSink(stream, buffer_size=16)
+    Interpreter(trace=sink, output=NullSink()).execute(LOOPS + '# комментарий\nprint("ё")')
+    binary = list(read_binary(io.BytesIO(stream.getvalue())))
+    assert binary == _events(LOOPS + '# комментарий\nprint("ё")')
+    assert len(stream.getvalue()) < len(
+        "".join(json.dumps(event.to_dict()) + "\n" for event in binary)
+    )
+
+
+def test_binary_rejects_bad_input():
+    """Чужой или обрезанный поток - ValueError."""
+    with pytest.raises(ValueError):
+        list(read_binary(io.BytesIO(b"not a trace")))
+    stream = io.BytesIO()
+    sink = BinaryTraceSink(stream)
+    Interpreter(trace=sink, output=NullSink()).execute("x = 1\nx")
+    with pytest.raises(ValueError):
+        list(read_binary(io.BytesIO(stream.getvalue()[:-3])))
+
+
+def test_compiled_tree_not_modified():
+    """Трассируемый запуск не меняет скомпилированную программу."""
+    program = Program.compile(LOOPS)
+    before = program.tree.pretty()
+    sink = ListTraceSink()
+    assert program.run(trace=sink, output=NullSink()) == 30
+    assert sink.events
+    assert program.tree.pretty() == before
+    assert "traced" not in before
+
+
+def test_loops_in_function_arguments():
+    """Циклы в аргументах функций тоже трассируются."""
+    events = _events("y = 0\nsqrt(for q in 1 .. 2 (q * 8))")
+    assert [e.kind for e in events if e.name == "q"] == ["loop", "iteration", "iteration", "end"]
+
+
+def test_loop_bounds_belong_to_enclosing_frame():
+    """События из границ цикла идут до события loop и относятся к объемлющему циклу."""
+    source = "n = 2\nfor i in 1 .. (for j in 1 .. n (j)) (\n  i\n)"
+    events = _events(source)[2:]
+    assert [(e.kind, e.name) for e in events[:7]] == [
+        ("statement", ""),
+        ("loop", "j"),
+        ("iteration", "j"),
+        ("iteration", "j"),
+        ("end", "j"),
+        ("loop", "i"),
+        ("iteration", "i"),
+    ]
+    sink = ListTraceSink()
+    Interpreter(trace=FilterTraceSink(sink, loop_vars=["i"]), output=NullSink()).execute(source)
+    assert [e.kind for e in sink.events if e.name] == ["loop", "iteration", "iteration", "end"]
+    assert not any(e.name == "j" for e in sink.events)
+
+
+def test_loop_variable_reused_in_bounds():
+    """Переменная цикла в границах вложенного цикла - ошибка и с трассировкой."""
+    source = "for i in 1 .. (for i in 1 .. 2 (i)) (i)"
+    with pytest.raises(DuplicateLoopVariableError):
+        Interpreter(output=NullSink()).execute(source)
+    with pytest.raises(DuplicateLoopVariableError):
+        _events(source)
+
+
+def test_execute_iter_traces_statements():
+    """execute_iter сообщает о каждом операторе верхнего уровня."""
+    sink = ListTraceSink()
+    results = list(Interpreter(trace=sink).execute_iter("a = 1\na + 1\n"))
+    assert [r.value for r in results] == [1, 2]
+    assert [e.kind for e in sink.events] == ["statement", "assign", "statement", "value"]
+
+
+def test_cli_trace_file(tmp_path, capsys):
+    """--trace-format и --trace-file пишут события в файл, вывод программы - в stdout."""
+    script = tmp_path / "s.clc"
+    script.write_text("x = 2\nprint(x)\nx + 1", encoding="utf-8")
+    trace = tmp_path / "trace.jsonl"
+    assert cli.main([str(script), "--trace-format", "jsonl", "--trace-file", str(trace)]) == 0
+    assert capsys.readouterr().out == "2.0000000000\n3.0000000000\n"
+    lines = trace.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["event"] for line in lines] == [
+        "statement", "assign", "statement", "statement", "value"
+    ]
+    binary = tmp_path / "trace.bin"
+    assert cli.main([str(script), "--trace-format", "binary", "--trace-file", str(binary)]) == 0
+    with binary.open("rb") as stream:
+        assert len(list(read_binary(stream))) == 5
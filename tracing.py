@@ -0,0 +1,409 @@
+"""События трассировки и их приёмники.
+
+При включённой трассировке интерпретатор выполняет инструментированную
+копию дерева программы: операторы, циклы, тела циклов и ``break``/``next``
+обёрнуты узлами, которые сообщают о себе событием (``TraceEvent``).
+Обычное выполнение идёт по исходному дереву и не проверяет, включена ли
+трассировка.
+
+События:
+
+- ``statement`` - начало оператора (строка и её текст);
+- ``assign`` - переменная после присваивания;
+- ``value`` - значение оператора-выражения;
+- ``loop`` - вход в цикл (переменная и вычисленный диапазон);
+- ``iteration`` - начало итерации (значение переменной цикла);
+- ``break`` / ``next`` - выход из цикла и переход к следующей итерации;
+- ``end`` - выход из цикла (после последней итерации или break);
+- ``error`` - ошибка выполнения (``DSLError``), которой завершилась программа.
+
+Приёмники (``TraceSink``):
+
+- ``TextTraceSink`` - привычный текст ``--trace`` (``- 3: x = 1``, ``+ x = ...``;
+  строка ``! сообщение`` для ошибки - только с ``errors=True``);
+- ``JsonlTraceSink`` - одна JSON-запись на событие;
+- ``BinaryTraceSink`` - компактные двоичные записи, читаются ``read_binary``;
+- ``ListTraceSink`` - список событий в памяти;
+- ``RingTraceSink`` - только последние N событий в заранее выделенном
+  кольцевом буфере; при ошибке они передаются в другой приёмник;
+- ``FilterTraceSink`` - выборка: каждая K-я итерация циклов, диапазон строк,
+  события внутри циклов с заданными переменными.
+
+Для долгих программ приёмники комбинируются: ``FilterTraceSink(RingTraceSink(
+1000, TextTraceSink(stderr_sink, errors=True)), every=100)`` - при ошибке будут показаны
+последние 1000 событий из каждой сотой итерации.
+
+Пример:
+    sink = ListTraceSink()
+    Interpreter(trace=sink).execute("x = 1\\nx + 1")
+    [event.kind for event in sink.events]   # ['statement', 'assign', 'statement', 'value']
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import json
+import struct
+from typing import BinaryIO, Iterable, Iterator, Optional, Protocol
+
+from output import OutputSink
+
+# Виды событий
+STATEMENT = "statement"
+ASSIGN = "assign"
+VALUE = "value"
+LOOP = "loop"
+ITERATION = "iteration"
+BREAK = "break"
+NEXT = "next"
+END = "end"
+ERROR = "error"
+EVENT_KINDS = (STATEMENT, ASSIGN, VALUE, LOOP, ITERATION, BREAK, NEXT, END, ERROR)
+
+# Форматы приёмников для cli.py
+TRACE_FORMATS = ("text", "jsonl", "binary")
+
+# Двоичный формат: сигнатура, затем записи "вид, строка, длины трёх полей"
+# и сами поля в UTF-8
+BINARY_MAGIC = b"CLCTRC1\n"
+_RECORD = struct.Struct("<BIIII")
+_KIND_CODES = {kind: code for code, kind in enumerate(EVENT_KINDS)}
+
+
+@dataclass(frozen=True)
+class TraceEvent:
+    """Событие трассировки.
+
+    Attributes:
+        kind: Вид события (см. ``EVENT_KINDS``)
+        line: Строка исходного кода (0 - неизвестна)
+        name: Переменная (assign, loop, iteration, break, next, end)
+        value: Отформатированное значение; для loop - диапазон
+            ``"1.00 .. 5.00"`` или ``"1.00 .. 5.00 by 2.00"``, для error -
+            сообщение об ошибке
+        text: Текст строки исходного кода (statement)
+    """
+
+    kind: str
+    line: int
+    name: str = ""
+    value: str = ""
+    text: str = ""
+
+    def to_dict(self) -> dict:
+        """Словарь для JSON: пустые поля опускаются."""
+        data: dict = {"event": self.kind, "line": self.line}
+        if self.name:
+            data["name"] = self.name
+        if self.value:
+            data["value"] = self.value
+        if self.text:
+            data["text"] = self.text
+        return data
+
+
+class TraceSink(Protocol):
+    """Приёмник событий трассировки."""
+
+    def emit(self, event: TraceEvent) -> None:
+        """Принять событие."""
+
+    def flush(self) -> None:
+        """Передать накопленные события дальше (конец выполнения программы)."""
+
+
+def format_text(event: TraceEvent) -> Optional[str]:
+    """Строка текстовой трассировки для события или None.
+
+    ``break``, ``next`` и ``end`` в текстовой трассировке не показываются:
+    о них видно по следующим строкам; ошибка - строка ``! сообщение``.
+    """
+    kind = event.kind
+    if kind == STATEMENT:
+        return f"- {event.line}: {event.text}\n"
+    if kind in (ASSIGN, ITERATION):
+        return f"+ {event.name} = {event.value}\n"
+    if kind == VALUE:
+        return f"+ {event.value}\n"
+    if kind == LOOP:
+        return f"- {event.line}: for {event.name} in {event.value}\n"
+    if kind == ERROR:
+        return f"! {event.value}\n"
+    return None
+
+
+class TextTraceSink:
+    """Текстовая трассировка в приёмник вывода (формат ``--trace``)."""
+
+    def __init__(self, output: OutputSink, errors: bool = False) -> None:
+        """Создать приёмник.
+
+        Args:
+            output: Приёмник вывода
+            errors: Выводить строку ``! сообщение`` для события ``error``.
+                Полная трассировка её не содержит: сообщение об ошибке и так
+                выводится в stderr; она нужна, когда трассировка показывает
+                только часть событий (``RingTraceSink``, ``FilterTraceSink``)
+        """
+        self._output = output
+        self._errors = errors
+
+    def emit(self, event: TraceEvent) -> None:
+        if event.kind == ERROR and not self._errors:
+            return
+        text = format_text(event)
+        if text is not None:
+            self._output.write(text)
+
+    def flush(self) -> None:
+        self._output.flush()
+
+
+class JsonlTraceSink:
+    """События в формате JSON Lines в приёмник вывода."""
+
+    def __init__(self, output: OutputSink) -> None:
+        self._output = output
+
+    def emit(self, event: TraceEvent) -> None:
+        self._output.write(
+            json.dumps(event.to_dict(), ensure_ascii=False, separators=(",", ":")) + "\n"
+        )
+
+    def flush(self) -> None:
+        self._output.flush()
+
+
+class BinaryTraceSink:
+    """События в компактном двоичном формате (см. ``read_binary``)."""
+
+    def __init__(self, stream: BinaryIO, buffer_size: int = 1 << 16) -> None:
+        """Создать приёмник.
+
+        Args:
+            stream: Двоичный поток
+            buffer_size: Размер буфера в байтах
+
+        Raises:
+            ValueError: Если размер буфера не положителен
+        """
+        if buffer_size <= 0:
+            raise ValueError("buffer_size must be positive")
+        self._stream = stream
+        self._buffer_size = buffer_size
+        self._buffer = bytearray(BINARY_MAGIC)
+
+    def emit(self, event: TraceEvent) -> None:
+        name = event.name.encode("utf-8")
+        value = event.value.encode("utf-8")
+        text = event.text.encode("utf-8")
+        buffer = self._buffer
+        buffer += _RECORD.pack(_KIND_CODES[event.kind], event.line, len(name), len(value), len(text))
+        buffer += name
+        buffer += value
+        buffer += text
+        if len(buffer) >= self._buffer_size:
+            self._write_buffer()
+
+    def flush(self) -> None:
+        self._write_buffer()
+        self._stream.flush()
+
+    def _write_buffer(self) -> None:
+        if self._buffer:
+            self._stream.write(bytes(self._buffer))
+            self._buffer.clear()
+
+
+def read_binary(stream: BinaryIO) -> Iterator[TraceEvent]:
+    """Прочитать события, записанные ``BinaryTraceSink``.
+
+    Args:
+        stream: Двоичный поток с начала записи
+
+    Yields:
+        События в порядке записи
+
+    Raises:
+        ValueError: Поток не является двоичной трассировкой или обрезан
+    """
+    if stream.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+        raise ValueError("Not a binary trace stream")
+    while True:
+        header = stream.read(_RECORD.size)
+        if not header:
+            return
+        if len(header) < _RECORD.size:
+            raise ValueError("Truncated trace record")
+        code, line, *sizes = _RECORD.unpack(header)
+        fields = []
+        for size in sizes:
+            data = stream.read(size)
+            if len(data) < size:
+                raise ValueError("Truncated trace record")
+            fields.append(data.decode("utf-8"))
+        yield TraceEvent(EVENT_KINDS[code], line, *fields)
+
+
+class ListTraceSink:
+    """События в памяти."""
+
+    def __init__(self) -> None:
+        self.events: list[TraceEvent] = []
+
+    def emit(self, event: TraceEvent) -> None:
+        self.events.append(event)
+
+    def flush(self) -> None:
+        pass
+
+
+class RingTraceSink:
+    """Последние ``capacity`` событий в кольцевом буфере.
+
+    Буфер выделяется один раз; новое событие вытесняет самое старое.
+    Получив событие ``error``, приёмник передаёт накопленные события (и
+    само событие ошибки) в ``target``, если он задан.
+    """
+
+    def __init__(self, capacity: int, target: Optional[TraceSink] = None) -> None:
+        """Создать приёмник.
+
+        Args:
+            capacity: Сколько последних событий хранить
+            target: Куда передать события при ошибке (None - только хранить)
+
+        Raises:
+            ValueError: Если capacity не положительна
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self._buffer: list[Optional[TraceEvent]] = [None] * capacity
+        self._next = 0
+        self._count = 0
+        self._target = target
+        self.dropped = 0  # событий вытеснено из буфера
+
+    @property
+    def capacity(self) -> int:
+        """Размер буфера."""
+        return len(self._buffer)
+
+    def emit(self, event: TraceEvent) -> None:
+        buffer = self._buffer
+        position = self._next
+        if self._count == len(buffer):
+            self.dropped += 1
+        else:
+            self._count += 1
+        buffer[position] = event
+        position += 1
+        self._next = 0 if position == len(buffer) else position
+        if event.kind == ERROR and self._target is not None:
+            self.dump(self._target)
+
+    def flush(self) -> None:
+        pass
+
+    def events(self) -> list[TraceEvent]:
+        """Накопленные события от старых к новым."""
+        start = (self._next - self._count) % len(self._buffer)
+        ordered = self._buffer[start:] + self._buffer[:start]
+        return [event for event in ordered[: self._count] if event is not None]
+
+    def dump(self, target: TraceSink) -> None:
+        """Передать накопленные события в target и очистить буфер."""
+        for event in self.events():
+            target.emit(event)
+        target.flush()
+        self.clear()
+
+    def clear(self) -> None:
+        """Забыть накопленные события (буфер остаётся выделенным)."""
+        self._buffer[:] = [None] * len(self._buffer)
+        self._next = 0
+        self._count = 0
+
+
+class FilterTraceSink:
+    """Выборка событий для ``target``.
+
+    - ``every=K`` - из итераций каждого цикла передаются только 1-я,
+      (K+1)-я, (2K+1)-я...: событие итерации и всё, что в ней выполнено
+      (вложенные циклы - только внутри выбранных итераций внешнего);
+    - ``lines=(first, last)`` - только события строк first..last;
+    - ``loop_vars`` - только события внутри циклов с этими переменными
+      (включая события входа и выхода самих циклов).
+
+    Ошибки передаются всегда.
+    """
+
+    def __init__(
+        self,
+        target: TraceSink,
+        every: int = 1,
+        lines: Optional[tuple[int, int]] = None,
+        loop_vars: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Создать фильтр.
+
+        Args:
+            target: Приёмник отобранных событий
+            every: Передавать каждую every-ю итерацию циклов
+            lines: Диапазон строк (включительно) или None
+            loop_vars: Переменные циклов или None (любые события)
+
+        Raises:
+            ValueError: Если every не положительно или диапазон строк пуст
+        """
+        if every <= 0:
+            raise ValueError("every must be positive")
+        if lines is not None and lines[0] > lines[1]:
+            raise ValueError(f"Empty line range: {lines[0]}..{lines[1]}")
+        self._target = target
+        self._every = every
+        self._lines = lines
+        self._loop_vars = frozenset(loop_vars) if loop_vars is not None else None
+        # Активные циклы: [переменная, номер итерации, выбрана ли итерация, внутри loop_vars]
+        self._loops: list[list] = []
+
+    def emit(self, event: TraceEvent) -> None:
+        kind = event.kind
+        if kind == ERROR:
+            self._loops.clear()  # циклы прерваны ошибкой без событий end
+            self._target.emit(event)
+            return
+        loops = self._loops
+        outer = loops[-1] if loops else None
+        if kind == LOOP:
+            selected = outer is None or outer[2]
+            inside = self._loop_vars is None or event.name in self._loop_vars
+            loops.append([event.name, -1, selected, inside or (outer is not None and outer[3])])
+            frame = loops[-1]
+            visible = selected and frame[3]
+        elif kind == END:
+            while loops and loops[-1][0] != event.name:
+                loops.pop()
+            frame = loops.pop() if loops else None
+            parent = loops[-1] if loops else None
+            visible = (parent is None or parent[2]) and (frame is None or frame[3])
+        elif kind == ITERATION and outer is not None:
+            while len(loops) > 1 and loops[-1][0] != event.name:
+                loops.pop()
+            frame = loops[-1]
+            parent = loops[-2] if len(loops) > 1 else None
+            frame[1] += 1
+            frame[2] = (parent is None or parent[2]) and frame[1] % self._every == 0
+            visible = frame[2] and frame[3]
+        else:
+            visible = outer is None or (outer[2] and outer[3])
+            if outer is None and self._loop_vars is not None:
+                visible = False
+        if not visible:
+            return
+        if self._lines is not None and not self._lines[0] <= event.line <= self._lines[1]:
+            return
+        self._target.emit(event)
+
+    def flush(self) -> None:
+        self._target.flush()